@@ -1,12 +1,20 @@
+import time
+# Início da execução antes dos imports pesados: o first paint inclui a importação a frio
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
 from datetime import datetime, timedelta
 import warnings
-import os
+from painel.alertas import AlertTable
+from painel.atualizacao import LoadError
+from painel.dados import LOAD_TIMEOUT, absences, get_store
+from painel.desempenho import RenderTimer
+from painel.kpis import company_kpis, filter_by_date_range, worst_companies
+from painel.orcamento import ChartBudget
+from painel.recursos import image_source, load_asset
+from painel.resultados import insights_for, kpis_for, normalize_companies
+from painel.tabelas import PAGE_SIZES
 warnings.filterwarnings('ignore')
 
 # Configuração da página
@@ -81,211 +89,116 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    """Carrega dados reais dos arquivos Excel"""
-    data = {}
-    
-    # Mapeamento dos arquivos
-    files = {
-        'absenteismo': 'data/Absenteísmo 2025.xlsx',
-        'absenteismo_doenca': 'data/Absenteísmo por Doença.xlsx',
-        'taxa_absenteismo': 'data/Taxa Absenteismo.xlsx',
-        'exames_alterados': 'data/Exames Alterados 2025.xlsx',
-        'aso_validos': 'data/ASO Válidos.xlsx',
-        'perfil_epidemiologico': 'data/Perfil Epidemiológico 2025.xlsx',
-        'visitas_medicas': 'data/Visitas Médicas - Dr. Antonio 2025.xlsx',
-        'consultas_tecnicas': 'data/Consultas Técnicas.xlsx',
-        'controle_documentos': 'data/Controle Documentos.xlsx'
-    }
-    
-    for key, file_path in files.items():
-        try:
-            if os.path.exists(file_path):
-                df = pd.read_excel(file_path)
-                
-                # Processamento específico de datas
-                if key in ['absenteismo', 'absenteismo_doenca', 'taxa_absenteismo']:
-                    # Converter datas importantes
-                    date_columns = ['Data de Nascimento', 'Data de Criação', 'Data da Ficha', 'Início', 'Fim', 'Retorno']
-                    for col in date_columns:
-                        if col in df.columns:
-                            df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                elif key == 'exames_alterados':
-                    if 'Data do Exame' in df.columns:
-                        df['Data do Exame'] = pd.to_datetime(df['Data do Exame'], errors='coerce')
-                
-                elif key == 'aso_validos':
-                    date_cols = ['Dt.Nascimento', 'Data Último Exame', 'Dt.Demissão', 'Validade']
-                    for col in date_cols:
-                        if col in df.columns:
-                            df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                elif key == 'perfil_epidemiologico':
-                    date_cols = ['Data de Nascimento', 'Data de Admissão', 'Data de Demissão', 'Data Ficha Clínica']
-                    for col in date_cols:
-                        if col in df.columns:
-                            df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                elif key in ['visitas_medicas', 'consultas_tecnicas']:
-                    if 'DATA' in df.columns:
-                        df['DATA'] = pd.to_datetime(df['DATA'], errors='coerce')
-                
-                elif key == 'controle_documentos':
-                    if 'Vencimento PCMSO ' in df.columns:
-                        df['Vencimento PCMSO '] = pd.to_datetime(df['Vencimento PCMSO '], errors='coerce')
-                
-                data[key] = df
-            else:
-                st.error(f"Arquivo não encontrado: {file_path}")
-                data[key] = pd.DataFrame()
-                
-        except Exception as e:
-            st.error(f"Erro ao carregar {file_path}: {str(e)}")
-            data[key] = pd.DataFrame()
-    
-    return data
+LOGO_URL = "https://www.syngenta.com/themes/custom/themekit/logo.svg"
 
-def filter_by_date_range(df, date_col, days):
-    """Filtra DataFrame por intervalo de dias"""
-    if df.empty or date_col not in df.columns:
-        return df
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # Filtrar apenas registros válidos
-    df_filtered = df[df[date_col].notna()].copy()
-    mask = (df_filtered[date_col] >= start_date) & (df_filtered[date_col] <= end_date)
-    return df_filtered[mask]
+# Indicadores disponíveis no ranking entre empresas
+RANKING_KPIS = {
+    'taxa_absenteismo': 'Taxa de Absenteísmo (%)',
+    'dias_perdidos': 'Dias Perdidos',
+    'media_dias_afastamento': 'Média de Dias por Afastamento',
+    'taxa_exames_alterados': 'Exames Alterados (%)',
+    'taxa_ocupacionais_alterados': 'Exames Ocupacionais Alterados (%)',
+    'taxa_asos_vencidos': 'ASOs Vencidos (%)',
+    'asos_vencidos': 'ASOs Vencidos',
+}
 
-def calculate_kpis(data, selected_companies, days_filter):
-    """Calcula KPIs principais baseados nos dados reais"""
-    kpis = {}
-    
-    # Dados de absenteísmo
-    abs_df = data['absenteismo'] if not data['absenteismo'].empty else data['taxa_absenteismo']
-    
-    if not abs_df.empty:
-        # Filtrar por empresa
-        if selected_companies and 'Todas' not in selected_companies:
-            abs_df = abs_df[abs_df['Empresa'].isin(selected_companies)]
-        
-        # Filtrar por período
-        abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
-        
-        # KPIs de Absenteísmo
-        kpis['total_funcionarios'] = abs_df['Funcionário'].nunique() if 'Funcionário' in abs_df.columns else 0
-        kpis['total_afastamentos'] = len(abs_df_filtered)
-        kpis['dias_perdidos'] = abs_df_filtered['Dias Afastados'].sum() if 'Dias Afastados' in abs_df_filtered.columns else 0
-        kpis['media_dias_afastamento'] = abs_df_filtered['Dias Afastados'].mean() if 'Dias Afastados' in abs_df_filtered.columns and len(abs_df_filtered) > 0 else 0
-        
-        # Taxa de absenteísmo (%)
-        if kpis['total_funcionarios'] > 0:
-            # Assumindo 22 dias úteis por mês
-            dias_uteis_periodo = (days_filter * 22) / 30
-            kpis['taxa_absenteismo'] = (kpis['dias_perdidos'] / (kpis['total_funcionarios'] * dias_uteis_periodo)) * 100
-        else:
-            kpis['taxa_absenteismo'] = 0
-    
-    # Dados de exames
-    exam_df = data['exames_alterados']
-    if not exam_df.empty:
-        if selected_companies and 'Todas' not in selected_companies:
-            exam_df = exam_df[exam_df['Empresa'].isin(selected_companies)]
-        
-        exam_df_filtered = filter_by_date_range(exam_df, 'Data do Exame', days_filter)
-        
-        kpis['total_exames'] = len(exam_df_filtered)
-        kpis['exames_alterados'] = len(exam_df_filtered[exam_df_filtered['Alterados'] == 'Sim']) if 'Alterados' in exam_df_filtered.columns else 0
-        kpis['exames_ocupacionais_alterados'] = len(exam_df_filtered[exam_df_filtered['Alterados Ocupacionais'] == 'Sim']) if 'Alterados Ocupacionais' in exam_df_filtered.columns else 0
-        
-        # Taxas
-        kpis['taxa_exames_alterados'] = (kpis['exames_alterados'] / kpis['total_exames'] * 100) if kpis['total_exames'] > 0 else 0
-        kpis['taxa_ocupacionais_alterados'] = (kpis['exames_ocupacionais_alterados'] / kpis['total_exames'] * 100) if kpis['total_exames'] > 0 else 0
-    
-    # Dados de ASO
-    aso_df = data['aso_validos']
-    if not aso_df.empty:
-        if selected_companies and 'Todas' not in selected_companies:
-            aso_df = aso_df[aso_df['Empresa'].isin(selected_companies)]
-        
-        kpis['total_asos'] = len(aso_df)
-        kpis['asos_vencidos'] = len(aso_df[aso_df['Status'] == 'Vencido']) if 'Status' in aso_df.columns else 0
-        kpis['asos_pendentes'] = len(aso_df[aso_df['Status'] == 'Pendente']) if 'Status' in aso_df.columns else 0
-        
-        # Taxa de ASOs vencidos
-        kpis['taxa_asos_vencidos'] = (kpis['asos_vencidos'] / kpis['total_asos'] * 100) if kpis['total_asos'] > 0 else 0
-    
-    return kpis
+@st.cache_resource
+def get_data_store():
+    """Armazém compartilhado pelas sessões (mesma camada de dados do parte2/app.py)"""
+    return get_store()
 
-def generate_health_insights(data, kpis):
-    """Gera insights inteligentes de saúde ocupacional"""
-    insights = []
-    warnings = []
-    critical = []
-    
-    # Análise de Absenteísmo
-    if kpis.get('taxa_absenteismo', 0) > 5:
-        critical.append(f"🚨 Taxa de absenteísmo crítica: {kpis['taxa_absenteismo']:.1f}% (Meta: <3%)")
-    elif kpis.get('taxa_absenteismo', 0) > 3:
-        warnings.append(f"⚠️ Taxa de absenteísmo elevada: {kpis['taxa_absenteismo']:.1f}% (Meta: <3%)")
-    else:
-        insights.append(f"✅ Taxa de absenteísmo controlada: {kpis.get('taxa_absenteismo', 0):.1f}%")
-    
-    # Análise de duração de afastamentos
-    if kpis.get('media_dias_afastamento', 0) > 20:
-        critical.append(f"🚨 Duração média de afastamentos crítica: {kpis['media_dias_afastamento']:.1f} dias")
-    elif kpis.get('media_dias_afastamento', 0) > 10:
-        warnings.append(f"⚠️ Duração média de afastamentos elevada: {kpis['media_dias_afastamento']:.1f} dias")
-    
-    # Análise de exames alterados
-    if kpis.get('taxa_ocupacionais_alterados', 0) > 10:
-        critical.append(f"🚨 Taxa de exames ocupacionais alterados: {kpis['taxa_ocupacionais_alterados']:.1f}%")
-    elif kpis.get('taxa_ocupacionais_alterados', 0) > 5:
-        warnings.append(f"⚠️ Taxa de exames ocupacionais alterados: {kpis['taxa_ocupacionais_alterados']:.1f}%")
-    
-    # Análise de ASOs
-    if kpis.get('taxa_asos_vencidos', 0) > 20:
-        critical.append(f"🚨 Taxa de ASOs vencidos crítica: {kpis['taxa_asos_vencidos']:.1f}%")
-    elif kpis.get('taxa_asos_vencidos', 0) > 10:
-        warnings.append(f"⚠️ Taxa de ASOs vencidos: {kpis['taxa_asos_vencidos']:.1f}%")
-    
-    # Análise dos principais diagnósticos
-    abs_df = data['absenteismo'] if not data['absenteismo'].empty else data['taxa_absenteismo']
-    if not abs_df.empty and 'Descrição do Cid Principal' in abs_df.columns:
-        top_diagnoses = abs_df['Descrição do Cid Principal'].value_counts().head(3)
-        
-        # Alertas específicos por tipo de diagnóstico
-        mental_health_terms = ['depressivo', 'ansiedade', 'stress', 'psiquiátric']
-        musculo_terms = ['coluna', 'lombar', 'cervical', 'articular', 'muscular']
-        
-        mental_cases = abs_df[abs_df['Descrição do Cid Principal'].str.contains('|'.join(mental_health_terms), case=False, na=False)]
-        musculo_cases = abs_df[abs_df['Descrição do Cid Principal'].str.contains('|'.join(musculo_terms), case=False, na=False)]
-        
-        if len(mental_cases) / len(abs_df) > 0.3:
-            warnings.append(f"⚠️ Alto índice de problemas de saúde mental: {len(mental_cases)} casos ({len(mental_cases)/len(abs_df)*100:.1f}%)")
-        
-        if len(musculo_cases) / len(abs_df) > 0.4:
-            warnings.append(f"⚠️ Alto índice de problemas musculoesqueléticos: {len(musculo_cases)} casos ({len(musculo_cases)/len(abs_df)*100:.1f}%)")
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=32)
+def get_company_kpis(version, days_filter, aso_horizon):
+    """KPIs de todas as empresas, calculados uma vez por versão dos dados, período e horizonte"""
+    snapshot = get_data_store().get(timeout=LOAD_TIMEOUT)
+    return company_kpis(snapshot.data, days_filter, snapshot.indexes['days_lost'],
+                        snapshot.indexes['aso_expiry'], aso_horizon,
+                        distinct_index=snapshot.indexes.get('distinct_employees'))
+
+@st.cache_data(show_spinner=False, ttl=600)
+def get_alerts(version, day):
+    """Tabela de alertas persistida (todas as empresas e janelas) da versão dos dados"""
+    snapshot = get_data_store().get(timeout=LOAD_TIMEOUT)
+    return AlertTable().current(snapshot.data, snapshot.indexes)
+
+@st.cache_resource
+def load_logo():
+    """Logo lido da cópia local (baixado uma única vez por processo)"""
+    return image_source(load_asset(LOGO_URL))
+
+def render_detail_table(table, key, companies, days_filter):
+    """Tabela paginada, ordenada e filtrada no servidor: só a página atual vai para o navegador"""
+    col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    with col1:
+        sort_by = st.selectbox(
+            "Ordenar por:",
+            options=[''] + table.columns,
+            format_func=lambda x: x or "Ordem original",
+            key=f'{key}_ordem'
+        )
+    with col2:
+        descending = st.checkbox("Decrescente", key=f'{key}_desc')
+    with col3:
+        filter_col = st.selectbox("Filtrar coluna:", options=table.columns, key=f'{key}_coluna')
+    with col4:
+        filter_text = st.text_input("Contém:", key=f'{key}_texto')
     
-    return insights, warnings, critical
+    end_date = datetime.now()
+    selection = dict(companies=normalize_companies(companies), start=end_date - timedelta(days=days_filter),
+                     end=end_date, filters={filter_col: filter_text})
+    page_key = f'{key}_pagina'
+    page_size = st.session_state.get(f'{key}_tamanho') or PAGE_SIZES[1]
+    page = st.session_state.get(page_key, 1)
+    rows, total = table.page(page, page_size, sort_by or None, descending, **selection)
+    n_pages = max(1, -(-total // page_size))
+    if page > n_pages:
+        # Filtro reduziu a seleção: volta para a última página existente
+        page = st.session_state[page_key] = n_pages
+        rows, total = table.page(page, page_size, sort_by or None, descending, **selection)
+    
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    col1, col2, col3 = st.columns([1, 1, 3])
+    with col1:
+        st.number_input("Página:", min_value=1, max_value=n_pages, step=1, key=page_key)
+    with col2:
+        st.selectbox("Linhas por página:", options=PAGE_SIZES, index=1, key=f'{key}_tamanho')
+    with col3:
+        first = (page - 1) * page_size
+        st.caption(f"Linhas {first + 1 if total else 0}–{first + len(rows)} de {total} · página {page} de {n_pages}")
 
 def main():
+    timer = RenderTimer(started=SCRIPT_STARTED)
+    # Bytes da especificação de cada gráfico enviada ao navegador
+    chart_budget = ChartBudget()
+    
     # Header com logo
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        try:
-            st.image("https://www.syngenta.com/themes/custom/themekit/logo.svg", width=200)
-        except:
+        logo = load_logo()
+        if logo is not None:
+            st.image(logo, width=200)
+        else:
             st.markdown("# 🌱 SYNGENTA")
     
     st.markdown('<h1 class="main-header">Dashboard Saúde Ocupacional</h1>', unsafe_allow_html=True)
     
-    # Carregar dados
-    with st.spinner('Carregando dados...'):
-        data = load_data()
+    # Carregar dados: sessões recebem o último snapshot válido sem aguardar a leitura dos Excel
+    store = get_data_store()
+    try:
+        if not store.ready:
+            with st.spinner('Preparando dados pela primeira vez...'):
+                snapshot = store.get(timeout=LOAD_TIMEOUT)
+        else:
+            snapshot = store.get(timeout=LOAD_TIMEOUT)
+    except LoadError as e:
+        st.error(f"❌ {e}")
+        return
+    if snapshot is None:
+        st.error("❌ Os dados ainda estão sendo preparados. Recarregue a página em instantes.")
+        return
+    data = snapshot.data
+    for error in snapshot.errors:
+        st.error(error)
     
     # Verificar se os dados foram carregados
     data_loaded = any(not df.empty for df in data.values())
@@ -297,6 +210,7 @@ def main():
     
     # Sidebar - Filtros
     st.sidebar.header("🔍 Filtros de Análise")
+    st.sidebar.caption(f"🗂️ Dados v{snapshot.version} · atualizados em {snapshot.loaded_at:%d/%m/%Y %H:%M}")
     
     # Filtro de empresa
     all_companies = set()
@@ -324,11 +238,22 @@ def main():
         format_func=lambda x: f"Últimos {x} dias"
     )
     
+    # Horizonte de vencimento dos ASOs
+    aso_horizon = st.sidebar.selectbox(
+        "Horizonte de Vencimento ASO:",
+        options=[30, 60, 90],
+        index=0,
+        format_func=lambda x: f"Próximos {x} dias"
+    )
+    
     # Calcular KPIs
-    kpis = calculate_kpis(data, selected_companies, days_filter)
+    days_index = snapshot.indexes['days_lost']
+    aso_index = snapshot.indexes['aso_expiry']
+    # Mesmo cache de resultados do serviço JSON (por versão dos dados, seleção e período)
+    kpis = kpis_for(snapshot, selected_companies, days_filter, aso_horizon)
     
     # Gerar insights
-    insights, warnings, critical = generate_health_insights(data, kpis)
+    insights, warnings, critical = insights_for(snapshot, selected_companies, days_filter, aso_horizon)
     
     # === SEÇÃO DE ALERTAS ===
     st.header("🚨 Alertas e Insights")
@@ -350,6 +275,17 @@ def main():
             for insight in insights:
                 st.markdown(f'<div class="success-alert">{insight}</div>', unsafe_allow_html=True)
     
+    # Alertas por empresa, avaliados fora da sessão para todas as empresas e janelas
+    company_alerts = get_alerts(snapshot.version, datetime.now().date())
+    company_alerts = company_alerts[company_alerts['Janela'] == days_filter]
+    if selected_companies and 'Todas' not in selected_companies:
+        company_alerts = company_alerts[company_alerts['Empresa'].isin(selected_companies)]
+    with st.expander(f"🏢 Alertas por empresa ({len(company_alerts)}) - últimos {days_filter} dias"):
+        if company_alerts.empty:
+            st.success("Nenhuma empresa ultrapassa os limites de alerta no período")
+        else:
+            st.dataframe(company_alerts[['Empresa', 'Nível', 'Mensagem']], use_container_width=True, hide_index=True)
+    
     # === SEÇÃO DE KPIs PRINCIPAIS ===
     st.header("📊 KPIs Principais")
     
@@ -382,7 +318,7 @@ def main():
     with col4:
         st.markdown(f"""
         <div class="metric-card">
-            <p class="metric-number">{kpis.get('dias_perdidos', 0)}</p>
+            <p class="metric-number">{kpis.get('dias_perdidos', 0):.0f}</p>
             <p class="metric-label">Dias Perdidos</p>
         </div>
         """, unsafe_allow_html=True)
@@ -395,39 +331,31 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
+    timer.mark('first_paint')
+    
+    # Bibliotecas de gráficos carregadas só quando as seções de gráficos são renderizadas
+    from painel import agregados, graficos
+    
     # === ANÁLISES DETALHADAS ===
     st.header("📈 Análises Detalhadas")
     
+    companies = selected_companies if selected_companies and 'Todas' not in selected_companies else None
+    
     # Análise de Absenteísmo
     col1, col2 = st.columns(2)
     
+    abs_df = absences(data)
+    if companies is not None and not abs_df.empty:
+        abs_df = abs_df[abs_df['Empresa'].isin(companies)]
+    abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
+    
     with col1:
         st.subheader("🏥 Principais Diagnósticos")
         
-        abs_df = data['absenteismo'] if not data['absenteismo'].empty else data['taxa_absenteismo']
         if not abs_df.empty and 'Descrição do Cid Principal' in abs_df.columns:
-            # Filtrar por empresa
-            if selected_companies and 'Todas' not in selected_companies:
-                abs_df = abs_df[abs_df['Empresa'].isin(selected_companies)]
-            
-            abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
-            
-            if not abs_df_filtered.empty:
-                diagnoses = abs_df_filtered['Descrição do Cid Principal'].value_counts().head(10)
-                
-                fig = px.bar(
-                    y=diagnoses.index,
-                    x=diagnoses.values,
-                    orientation='h',
-                    title="Top 10 Diagnósticos mais Frequentes",
-                    labels={'x': 'Número de Casos', 'y': 'Diagnóstico'}
-                )
-                fig.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    height=400,
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            fig = graficos.diagnoses_chart(abs_df_filtered)
+            if fig is not None:
+                st.plotly_chart(chart_budget.measure('Diagnósticos', fig), use_container_width=True)
             else:
                 st.info("Nenhum dado de diagnóstico disponível para o período selecionado")
         else:
@@ -437,18 +365,9 @@ def main():
         st.subheader("📊 Distribuição por Especialidade Médica")
         
         if not abs_df.empty and 'Especialidade' in abs_df.columns:
-            abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
-            
-            if not abs_df_filtered.empty:
-                especialidades = abs_df_filtered['Especialidade'].value_counts()
-                
-                fig = px.pie(
-                    values=especialidades.values,
-                    names=especialidades.index,
-                    title="Distribuição por Especialidade"
-                )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+            fig = graficos.specialties_chart(abs_df_filtered)
+            if fig is not None:
+                st.plotly_chart(chart_budget.measure('Especialidades', fig), use_container_width=True)
             else:
                 st.info("Nenhum dado de especialidade disponível")
         else:
@@ -457,190 +376,173 @@ def main():
     # Análise Temporal
     st.subheader("📈 Evolução Temporal do Absenteísmo")
     
-    if not abs_df.empty and 'Início' in abs_df.columns:
-        abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
-        
-        if not abs_df_filtered.empty:
-            # Agrupar por mês
-            abs_df_filtered['Mês'] = abs_df_filtered['Início'].dt.to_period('M')
-            monthly_data = abs_df_filtered.groupby('Mês').agg({
-                'Funcionário': 'count',
-                'Dias Afastados': 'sum'
-            }).reset_index()
-            monthly_data['Mês'] = monthly_data['Mês'].astype(str)
-            
-            # Criar subplot com duas métricas
-            fig = make_subplots(
-                rows=1, cols=2,
-                subplot_titles=('Número de Casos por Mês', 'Dias Perdidos por Mês'),
-                specs=[[{"secondary_y": False}, {"secondary_y": False}]]
-            )
-            
-            # Gráfico de casos
-            fig.add_trace(
-                go.Scatter(
-                    x=monthly_data['Mês'],
-                    y=monthly_data['Funcionário'],
-                    mode='lines+markers',
-                    name='Casos',
-                    line=dict(color='#2E8B57', width=3)
-                ),
-                row=1, col=1
-            )
-            
-            # Gráfico de dias perdidos
-            fig.add_trace(
-                go.Bar(
-                    x=monthly_data['Mês'],
-                    y=monthly_data['Dias Afastados'],
-                    name='Dias Perdidos',
-                    marker_color='#32CD32'
-                ),
-                row=1, col=2
-            )
-            
-            fig.update_layout(
-                height=400,
-                template="plotly_white",
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+    if not abs_df_filtered.empty:
+        # Casos pelo início, dias perdidos recortados pelo índice de intervalos
+        end_date = datetime.now()
+        monthly_data = agregados.monthly_absences(abs_df_filtered, days_index, end_date - timedelta(days=days_filter), end_date, companies)
+        st.plotly_chart(chart_budget.measure('Evolução Mensal', graficos.monthly_absences_chart(monthly_data)),
+                        use_container_width=True)
     
     # Análise de Exames
     st.subheader("🔬 Análise de Exames Ocupacionais")
     
     col1, col2 = st.columns(2)
     
+    exam_df = data['exames_alterados']
+    if companies is not None and not exam_df.empty:
+        exam_df = exam_df[exam_df['Empresa'].isin(companies)]
+    exam_df_filtered = filter_by_date_range(exam_df, 'Data do Exame', days_filter)
+    
     with col1:
-        exam_df = data['exames_alterados']
-        if not exam_df.empty:
-            if selected_companies and 'Todas' not in selected_companies:
-                exam_df = exam_df[exam_df['Empresa'].isin(selected_companies)]
-            
-            exam_df_filtered = filter_by_date_range(exam_df, 'Data do Exame', days_filter)
-            
-            if not exam_df_filtered.empty:
-                # Status dos exames
-                fig = go.Figure()
-                
-                total_exams = len(exam_df_filtered)
-                altered = len(exam_df_filtered[exam_df_filtered['Alterados'] == 'Sim'])
-                normal = total_exams - altered
-                
-                fig.add_trace(go.Bar(
-                    x=['Normal', 'Alterado'],
-                    y=[normal, altered],
-                    marker_color=['#2ecc71', '#e74c3c'],
-                    text=[f'{normal}<br>({normal/total_exams*100:.1f}%)', 
-                          f'{altered}<br>({altered/total_exams*100:.1f}%)'],
-                    textposition='inside'
-                ))
-                
-                fig.update_layout(
-                    title="Status dos Exames Realizados",
-                    yaxis_title="Número de Exames",
-                    template="plotly_white",
-                    height=300
-                )
-                
-                st.plotly_chart(fig, use_container_width=True)
+        fig = graficos.exam_status_chart(exam_df_filtered)
+        if fig is not None:
+            st.plotly_chart(chart_budget.measure('Status dos Exames', fig), use_container_width=True)
     
     with col2:
-        if not exam_df_filtered.empty and 'Tipo' in exam_df_filtered.columns:
-            # Tipos de exame
-            exam_types = exam_df_filtered['Tipo'].value_counts()
-            
-            fig = px.pie(
-                values=exam_types.values,
-                names=exam_types.index,
-                title="Distribuição por Tipo de Exame"
-            )
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+        fig = graficos.exam_types_chart(exam_df_filtered)
+        if fig is not None:
+            st.plotly_chart(chart_budget.measure('Tipos de Exame', fig), use_container_width=True)
     
     # Análise de ASO
     st.subheader("📋 Status dos ASOs")
     
     aso_df = data['aso_validos']
     if not aso_df.empty:
-        if selected_companies and 'Todas' not in selected_companies:
-            aso_df = aso_df[aso_df['Empresa'].isin(selected_companies)]
+        if companies is not None:
+            aso_df = aso_df[aso_df['Empresa'].isin(companies)]
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Status dos ASOs
-            if 'Status' in aso_df.columns:
-                status_counts = aso_df['Status'].value_counts()
-                
-                colors = {'Válido': '#2ecc71', 'Vencido': '#e74c3c', 'Pendente': '#f39c12'}
-                
-                fig = px.pie(
-                    values=status_counts.values,
-                    names=status_counts.index,
-                    title="Status dos ASOs",
-                    color=status_counts.index,
-                    color_discrete_map=colors
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            # Status dos ASOs a partir das validades
+            st.plotly_chart(chart_budget.measure('Status dos ASOs', graficos.aso_status_chart(kpis, aso_horizon)),
+                            use_container_width=True)
         
         with col2:
-            # ASOs por unidade
-            if 'Unidade' in aso_df.columns:
-                unit_counts = aso_df['Unidade'].value_counts().head(10)
-                
-                fig = px.bar(
-                    x=unit_counts.values,
-                    y=unit_counts.index,
-                    orientation='h',
-                    title="ASOs por Unidade",
-                    labels={'x': 'Quantidade', 'y': 'Unidade'}
-                )
-                fig.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-    
-    # Tabelas de dados detalhados
+            fig = graficos.aso_units_chart(aso_df)
+            if fig is not None:
+                st.plotly_chart(chart_budget.measure('ASOs por Unidade', fig), use_container_width=True)
+        
+        # Calendário semanal de vencimentos
+        fig = graficos.expiry_calendar_chart(aso_index.calendar(weeks=12, companies=companies))
+        if fig is not None:
+            st.plotly_chart(chart_budget.measure('Calendário de Vencimentos', fig), use_container_width=True)
+        else:
+            st.info("Nenhum ASO vence nas próximas 12 semanas")
+    
+    # Comparativo entre empresas (todas as empresas numa única passada agrupada)
+    st.header("🏢 Comparativo entre Empresas")
+    
+    company_table = get_company_kpis(snapshot.version, days_filter, aso_horizon)
+    if not company_table.empty:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            ranking_kpi = st.selectbox(
+                "Indicador:",
+                options=list(RANKING_KPIS),
+                format_func=RANKING_KPIS.get
+            )
+        with col2:
+            top_n = st.number_input(
+                "Piores N empresas:",
+                min_value=1,
+                max_value=len(company_table),
+                value=min(10, len(company_table))
+            )
+        
+        worst = worst_companies(company_table, ranking_kpi, int(top_n)).reset_index()
+        st.plotly_chart(chart_budget.measure('Ranking de Empresas', graficos.ranking_chart(worst, ranking_kpi, RANKING_KPIS[ranking_kpi])),
+                        use_container_width=True)
+        
+        with st.expander("Tabela comparativa (todas as empresas)"):
+            st.dataframe(company_table, use_container_width=True)
+    else:
+        st.info("Nenhum dado disponível para comparação entre empresas")
+    
+    # Consulta individual por funcionário
+    st.header("👤 Consulta por Funcionário")
+    
+    employee_index = snapshot.indexes['employees']
+    selected_employee = st.selectbox(
+        "Selecione o Funcionário:",
+        options=[''] + employee_index.labels(),
+        format_func=lambda x: x or "Digite para buscar..."
+    )
+    
+    if selected_employee:
+        employee_rows = employee_index.rows(data, label=selected_employee)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**Afastamentos**")
+            emp_abs = employee_rows.get('absenteismo', pd.DataFrame())
+            if not emp_abs.empty:
+                st.dataframe(emp_abs[['Empresa', 'Início', 'Fim', 'Dias Perdidos', 'Descrição do Cid Principal']], use_container_width=True)
+            else:
+                st.info("Nenhum afastamento registrado")
+            
+            st.markdown("**Status do ASO**")
+            emp_aso = employee_rows.get('aso_validos', pd.DataFrame())
+            if not emp_aso.empty:
+                st.dataframe(emp_aso[['Empresa', 'Unidade', 'Cargo', 'Data Último Exame', 'Validade', 'Status']], use_container_width=True)
+            else:
+                st.info("Nenhum ASO encontrado")
+        
+        with col2:
+            st.markdown("**Exames Alterados**")
+            emp_exams = employee_rows.get('exames_alterados', pd.DataFrame())
+            if not emp_exams.empty:
+                emp_exams = emp_exams[emp_exams['Alterados'] == 'Sim']
+            if not emp_exams.empty:
+                st.dataframe(emp_exams[['Exames', 'Tipo', 'Data do Exame', 'Alterados Ocupacionais', 'Parecer do ASO']], use_container_width=True)
+            else:
+                st.info("Nenhum exame alterado")
+            
+            st.markdown("**Fichas Clínicas**")
+            emp_fichas = employee_rows.get('perfil_epidemiologico', pd.DataFrame())
+            if not emp_fichas.empty:
+                st.dataframe(emp_fichas[['Nome Unidade', 'Data Ficha Clínica', 'Tipo Ficha Clínica', 'CID']], use_container_width=True)
+            else:
+                st.info("Nenhuma ficha clínica encontrada")
+    
+    # Tabelas de dados detalhados (empresas e período selecionados, paginadas no servidor)
     st.header("📋 Dados Detalhados")
     
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Absenteísmo", "🔬 Exames", "📋 ASO", "🏥 Visitas"])
+    detail_tables = snapshot.indexes['detail_tables']
     
     with tab1:
-        if not abs_df.empty:
-            abs_display = abs_df[['Empresa', 'Funcionário', 'Início', 'Fim', 'Dias Afastados', 
-                                'Descrição do Cid Principal', 'Especialidade']].head(20)
-            st.dataframe(abs_display, use_container_width=True)
+        if len(detail_tables['absenteismo']):
+            render_detail_table(detail_tables['absenteismo'], 'detalhe_absenteismo', selected_companies, days_filter)
         else:
             st.info("Dados de absenteísmo não disponíveis")
     
     with tab2:
-        if not data['exames_alterados'].empty:
-            exam_display = data['exames_alterados'][['Empresa', 'Funcionário', 'Tipo', 'Data do Exame',
-                                                   'Alterados', 'Alterados Ocupacionais', 'Parecer do ASO']].head(20)
-            st.dataframe(exam_display, use_container_width=True)
+        if len(detail_tables['exames']):
+            render_detail_table(detail_tables['exames'], 'detalhe_exames', selected_companies, days_filter)
         else:
             st.info("Dados de exames não disponíveis")
     
     with tab3:
-        if not data['aso_validos'].empty:
-            aso_display = data['aso_validos'][['Empresa', 'Nome', 'Unidade', 'Cargo', 
-                                             'Data Último Exame', 'Status', 'Validade']].head(20)
-            st.dataframe(aso_display, use_container_width=True)
+        if len(detail_tables['aso']):
+            st.caption("Situação atual dos ASOs (sem filtro de período)")
+            render_detail_table(detail_tables['aso'], 'detalhe_aso', selected_companies, days_filter)
         else:
             st.info("Dados de ASO não disponíveis")
     
     with tab4:
-        if not data['visitas_medicas'].empty:
-            st.dataframe(data['visitas_medicas'].head(20), use_container_width=True)
+        if len(detail_tables['visitas']):
+            render_detail_table(detail_tables['visitas'], 'detalhe_visitas', selected_companies, days_filter)
         else:
             st.info("Dados de visitas não disponíveis")
     
     # Footer
     st.markdown("---")
     st.markdown("**Dashboard Saúde Ocupacional - Syngenta** | Análise baseada em dados recebidos")
+    timer.mark('complete')
+    st.caption(timer.summary())
+    st.caption(chart_budget.summary())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
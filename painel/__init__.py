@@ -0,0 +1,6 @@
+"""Componentes compartilhados dos dashboards de Saúde Ocupacional."""
+from painel.aso import AsoExpiryIndex
+from painel.funcionarios import EmployeeIndex
+from painel.intervalos import DaysLostIndex
+
+__all__ = ['AsoExpiryIndex', 'DaysLostIndex', 'EmployeeIndex']
@@ -0,0 +1,94 @@
+"""Agregações por trás dos gráficos do dashboard.
+
+Separadas da montagem das figuras (``painel.graficos``) para que o serviço
+JSON e os relatórios usem exatamente os mesmos números sem carregar o Plotly.
+Todas recebem os dados já filtrados por empresa e período.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from painel.dados import absences
+from painel.kpis import filter_by_date_range
+
+
+def top_diagnoses(abs_window, top=10):
+    """Diagnósticos mais frequentes (casos por descrição do CID)."""
+    return abs_window['Descrição do Cid Principal'].value_counts().head(top)
+
+
+def specialty_counts(abs_window):
+    """Afastamentos por especialidade médica."""
+    return abs_window['Especialidade'].value_counts()
+
+
+def monthly_absences(abs_window, days_index, start, end, companies=None):
+    """Casos (pelo início) e dias perdidos (recortados pelo índice de intervalos) por mês."""
+    months = abs_window['Início'].dt.to_period('M').astype(str).rename('Mês')
+    monthly_data = abs_window.groupby(months)['Funcionário'].count().reset_index()
+
+    monthly_days = days_index.monthly(start, end)
+    if companies is not None:
+        monthly_days = monthly_days[monthly_days['Empresa'].isin(companies)]
+    monthly_days = monthly_days.groupby('Mês')['Dias Perdidos'].sum().reset_index()
+    monthly_days['Mês'] = monthly_days['Mês'].dt.to_period('M').astype(str)
+    return monthly_data.merge(monthly_days, on='Mês', how='outer').fillna(0).sort_values('Mês')
+
+
+def exam_status_counts(exam_window):
+    """Exames normais x alterados."""
+    altered = int((exam_window['Alterados'] == 'Sim').sum())
+    return pd.Series({'Normal': len(exam_window) - altered, 'Alterado': altered})
+
+
+def exam_type_counts(exam_window):
+    """Exames por tipo."""
+    return exam_window['Tipo'].value_counts()
+
+
+def aso_status_counts(kpis, aso_horizon):
+    """ASOs válidos, a vencer no horizonte, vencidos e pendentes (a partir dos KPIs)."""
+    return pd.Series({
+        'Válido': kpis.get('asos_validos', 0),
+        f'A vencer ({aso_horizon}d)': kpis.get('asos_a_vencer', 0),
+        'Vencido': kpis.get('asos_vencidos', 0),
+        'Pendente': kpis.get('asos_pendentes', 0)
+    })
+
+
+def aso_unit_counts(aso_df, top=10):
+    """Unidades com mais ASOs."""
+    return aso_df['Unidade'].value_counts().head(top)
+
+
+def _filter_companies(df, companies):
+    if companies is None or df.empty or 'Empresa' not in df.columns:
+        return df
+    return df[df['Empresa'].isin(companies)]
+
+
+def dashboard_aggregates(data, indexes, companies, days_filter, aso_horizon, kpis):
+    """Todas as agregações dos gráficos do dashboard para uma seleção (nome -> DataFrame)."""
+    abs_window = filter_by_date_range(_filter_companies(absences(data), companies), 'Início', days_filter)
+    exam_window = filter_by_date_range(_filter_companies(data['exames_alterados'], companies), 'Data do Exame', days_filter)
+    aso_df = _filter_companies(data['aso_validos'], companies)
+
+    result = {}
+    if not abs_window.empty:
+        if 'Descrição do Cid Principal' in abs_window.columns:
+            result['diagnosticos'] = top_diagnoses(abs_window).rename_axis('Diagnóstico').reset_index(name='Casos')
+        if 'Especialidade' in abs_window.columns:
+            result['especialidades'] = specialty_counts(abs_window).rename_axis('Especialidade').reset_index(name='Casos')
+        end_date = datetime.now()
+        result['mensal'] = monthly_absences(abs_window, indexes['days_lost'], end_date - timedelta(days=days_filter),
+                                            end_date, companies).rename(columns={'Funcionário': 'Casos'})
+    if not exam_window.empty:
+        result['exames_status'] = exam_status_counts(exam_window).rename_axis('Status').reset_index(name='Exames')
+        if 'Tipo' in exam_window.columns:
+            result['exames_tipos'] = exam_type_counts(exam_window).rename_axis('Tipo').reset_index(name='Exames')
+    if not aso_df.empty:
+        result['asos_status'] = aso_status_counts(kpis, aso_horizon).rename_axis('Status').reset_index(name='ASOs')
+        if 'Unidade' in aso_df.columns:
+            result['asos_unidades'] = aso_unit_counts(aso_df).rename_axis('Unidade').reset_index(name='ASOs')
+        result['asos_calendario'] = indexes['aso_expiry'].calendar(weeks=12, companies=companies)
+    return result
@@ -0,0 +1,212 @@
+"""Avaliação incremental de alertas para todas as empresas e janelas padrão.
+
+Os limites de ``generate_health_insights`` (absenteísmo, duração média dos
+afastamentos, exames ocupacionais alterados, ASOs vencidos e participação de
+saúde mental e musculoesqueléticos) são avaliados sem sessão para cada empresa
+e cada janela de ``STANDARD_WINDOWS``. O resultado é uma tabela de alertas
+persistida em disco, que os dashboards apenas leem.
+
+Cada empresa tem uma impressão digital das suas linhas nas bases de
+afastamentos, exames e ASO. A cada nova versão dos dados só as empresas cuja
+impressão digital mudou são recalculadas. A avaliação completa acontece
+quando muda o dia (as janelas se deslocam) ou mudam as regras.
+
+Uso sem interface: ``python -m painel.alertas``.
+"""
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from painel.dados import CACHE_DIR, absences
+from painel.kpis import company_kpis
+
+# Janelas (em dias) oferecidas no filtro de período do dashboard
+STANDARD_WINDOWS = (30, 60, 90, 180, 365)
+
+# (indicador, limite de atenção, limite crítico, descrição, unidade)
+ALERT_RULES = (
+    ('taxa_absenteismo', 3, 5, 'Taxa de absenteísmo', '%'),
+    ('media_dias_afastamento', 10, 20, 'Duração média de afastamentos', ' dias'),
+    ('taxa_ocupacionais_alterados', 5, 10, 'Taxa de exames ocupacionais alterados', '%'),
+    ('taxa_asos_vencidos', 10, 20, 'Taxa de ASOs vencidos', '%'),
+    ('taxa_saude_mental', 30, None, 'Afastamentos por saúde mental', '%'),
+    ('taxa_musculoesqueletico', 40, None, 'Afastamentos musculoesqueléticos', '%'),
+)
+
+ALERT_COLUMNS = ['Empresa', 'Janela', 'Indicador', 'Valor', 'Nível', 'Mensagem']
+ALERTS_PATH = os.path.join(CACHE_DIR, 'alertas.pkl')
+
+logger = logging.getLogger('painel.alertas')
+
+
+def _fingerprint_datasets(data):
+    """Bases cujas linhas determinam os alertas de cada empresa."""
+    return {
+        'absenteismo': absences(data),
+        'exames_alterados': data.get('exames_alterados', pd.DataFrame()),
+        'aso_validos': data.get('aso_validos', pd.DataFrame()),
+    }
+
+
+def company_fingerprints(data):
+    """Impressão digital (texto) das linhas de cada empresa nas bases monitoradas."""
+    parts = {}
+    for name, df in _fingerprint_datasets(data).items():
+        if df.empty or 'Empresa' not in df.columns:
+            continue
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        # Soma com estouro (módulo 2^64): independe da ordem das linhas
+        parts[name] = pd.Series(row_hashes, index=df['Empresa'].to_numpy()).groupby(level=0).sum()
+    if not parts:
+        return pd.Series(dtype=object)
+    table = pd.DataFrame(parts).fillna(0).astype(np.uint64)
+    return table.apply(lambda row: '-'.join(f'{value:016x}' for value in row), axis=1)
+
+
+def diagnosis_shares(abs_df, start, end):
+    """Percentual de afastamentos por saúde mental e musculoesqueléticos por empresa na janela."""
+    if abs_df.empty or 'Saúde Mental' not in abs_df.columns:
+        return pd.DataFrame(columns=['taxa_saude_mental', 'taxa_musculoesqueletico'])
+    window = abs_df[(abs_df['Início'] >= start) & (abs_df['Início'] <= end)]
+    shares = window.groupby('Empresa')[['Saúde Mental', 'Musculoesquelético']].mean() * 100
+    return shares.rename(columns={'Saúde Mental': 'taxa_saude_mental', 'Musculoesquelético': 'taxa_musculoesqueletico'})
+
+
+def _alert_rows(values, window):
+    """Linhas de alerta de uma janela a partir da tabela de indicadores por empresa."""
+    rows = []
+    for kpi, warning, critical, label, unit in ALERT_RULES:
+        if kpi not in values.columns:
+            continue
+        series = values[kpi].fillna(0)
+        conditions = [series > critical] if critical is not None else []
+        levels = ['Crítico'] if critical is not None else []
+        level = pd.Series(np.select(conditions + [series > warning], levels + ['Atenção'], ''), index=series.index)
+        hit = series[level != '']
+        if hit.empty:
+            continue
+        icons = np.where(level[hit.index] == 'Crítico', '🚨', '⚠️')
+        rows.append(pd.DataFrame({
+            'Empresa': hit.index,
+            'Janela': window,
+            'Indicador': kpi,
+            'Valor': hit.to_numpy(),
+            'Nível': level[hit.index].to_numpy(),
+            'Mensagem': [f"{icon} {label}: {value:.1f}{unit}" for icon, value in zip(icons, hit)],
+        }))
+    return rows
+
+
+def evaluate_alerts(data, indexes, companies=None, windows=STANDARD_WINDOWS, today=None):
+    """Tabela de alertas (empresa x janela x indicador), opcionalmente só para ``companies``."""
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+    if companies is not None:
+        companies = list(companies)
+        data = dict(data)
+        for name in ('absenteismo', 'taxa_absenteismo', 'exames_alterados', 'aso_validos'):
+            df = data.get(name)
+            if df is not None and 'Empresa' in df.columns:
+                data[name] = df[df['Empresa'].isin(companies)]
+
+    abs_df = absences(data)
+    rows = []
+    for window in windows:
+        values = company_kpis(data, window, indexes.get('days_lost'), indexes.get('aso_expiry'), today=today,
+                              distinct_index=indexes.get('distinct_employees'))
+        values = values.join(diagnosis_shares(abs_df, today - pd.Timedelta(days=window), today), how='left')
+        if companies is not None:
+            values = values[values.index.isin(companies)]
+        rows.extend(_alert_rows(values, window))
+
+    if not rows:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    return pd.concat(rows, ignore_index=True)[ALERT_COLUMNS]
+
+
+class AlertTable:
+    """Tabela de alertas persistida e atualizada apenas para as empresas alteradas."""
+
+    def __init__(self, path=None, windows=STANDARD_WINDOWS):
+        self.path = path or ALERTS_PATH
+        self.windows = tuple(windows)
+        self.last_recomputed = []
+
+    def load(self):
+        """Estado salvo (alertas, impressões digitais e data da avaliação) ou None."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            logger.warning("Tabela de alertas ilegível (%s); será recalculada", self.path, exc_info=True)
+            return None
+
+    def read(self):
+        """Alertas persistidos, sem recalcular nada."""
+        state = self.load()
+        return state['alerts'] if state else pd.DataFrame(columns=ALERT_COLUMNS)
+
+    def current(self, data, indexes, today=None):
+        """Alertas persistidos; só reavalia quando a tabela salva é de outro dia."""
+        state = self.load()
+        if state is None or state['date'] != pd.Timestamp(today or pd.Timestamp.now()).normalize():
+            return self.update(data, indexes, today)
+        return state['alerts']
+
+    def _save(self, state):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def update(self, data, indexes, today=None, full=False):
+        """Recalcula os alertas das empresas cujas linhas mudaram (todas, com ``full``) e salva a tabela."""
+        today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+        fingerprints = company_fingerprints(data)
+        previous = None if full else self.load()
+
+        full = (previous is None or previous['date'] != today or previous['rules'] != ALERT_RULES
+                or previous['windows'] != self.windows)
+        if full:
+            changed = list(fingerprints.index)
+            kept = pd.DataFrame(columns=ALERT_COLUMNS)
+        else:
+            old = previous['fingerprints']
+            companies = fingerprints.index.union(old.index)
+            differs = fingerprints.reindex(companies) != old.reindex(companies)
+            changed = list(companies[differs.to_numpy()])
+            kept = previous['alerts'][~previous['alerts']['Empresa'].isin(changed)]
+
+        if changed:
+            fresh = evaluate_alerts(data, indexes, companies=changed, windows=self.windows, today=today)
+            alerts = pd.concat([df for df in (kept, fresh) if not df.empty] or [kept], ignore_index=True)
+            alerts = alerts.sort_values(['Empresa', 'Janela', 'Indicador'], ignore_index=True)
+        else:
+            alerts = previous['alerts']
+
+        self._save({'date': today, 'rules': ALERT_RULES, 'windows': self.windows,
+                    'fingerprints': fingerprints, 'alerts': alerts})
+        self.last_recomputed = changed
+        return alerts
+
+
+def main():
+    """Atualiza a tabela de alertas a partir das planilhas (sem interface)."""
+    from painel.dados import build_indexes, load_datasets
+
+    errors = []
+    data = load_datasets(errors)
+    for error in errors:
+        print(error)
+    table = AlertTable()
+    alerts = table.update(data, build_indexes(data))
+    print(f"{len(table.last_recomputed)} empresa(s) recalculada(s); {len(alerts)} alerta(s) em {table.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Índice de vencimento de ASOs por empresa e unidade.
+
+A conformidade deixa de depender do texto da coluna 'Status' e passa a ser
+derivada de 'Validade'. As validades são ordenadas uma vez por grupo
+(Empresa, Unidade) e codificadas numa única chave crescente, de modo que as
+contagens de vencidos, a vencer em N dias e válidos para todos os grupos saem
+de buscas binárias (``np.searchsorted``) para qualquer horizonte. Um calendário
+semanal de vencimentos é pré-calculado na construção.
+"""
+import numpy as np
+import pandas as pd
+
+
+class AsoExpiryIndex:
+    """Validades ordenadas por grupo e calendário semanal de vencimentos."""
+
+    def __init__(self, df, date_col='Validade', exam_col='Data Último Exame', group_cols=('Empresa', 'Unidade')):
+        self.group_cols = [col for col in group_cols if col in df.columns]
+        if not self.group_cols or date_col not in df.columns:
+            df = pd.DataFrame({'Empresa': pd.Series(dtype=object), date_col: pd.Series(dtype='datetime64[ns]')})
+            self.group_cols = ['Empresa']
+
+        grouped = df[self.group_cols].fillna('Não informado').groupby(self.group_cols, sort=False)
+        codes = grouped.ngroup().to_numpy()
+        self.groups = grouped.size().index
+        n_groups = len(self.groups)
+
+        validade = pd.to_datetime(df[date_col], errors='coerce')
+        # Funcionários sem exame realizado ficam como pendentes, fora do índice de validades
+        if exam_col in df.columns:
+            pending = pd.to_datetime(df[exam_col], errors='coerce').isna().to_numpy()
+        else:
+            pending = validade.isna().to_numpy()
+        self.pendentes = np.bincount(codes[pending], minlength=n_groups)
+
+        days = validade.to_numpy(dtype='datetime64[D]')[~pending]
+        codes = codes[~pending]
+        # Validade ausente com exame realizado é tratada como vencida
+        days = np.where(np.isnat(days), np.datetime64('1900-01-01'), days).astype(np.int64)
+
+        self.dmin = int(days.min()) if len(days) else 0
+        self.span = (int(days.max()) - self.dmin + 2) if len(days) else 1
+        self.keys = np.sort(codes.astype(np.int64) * self.span + (days - self.dmin))
+        self.group_start = np.searchsorted(self.keys, np.arange(n_groups) * self.span)
+        self.group_size = np.bincount(codes, minlength=n_groups)
+
+        # Calendário semanal (semanas iniciando na segunda-feira) pré-calculado
+        week = pd.to_datetime(days.astype('datetime64[D]')).to_period('W-SUN').start_time
+        calendar = pd.DataFrame({'code': codes, 'Semana': week}).value_counts().rename('ASOs').reset_index()
+        calendar = pd.concat([self.groups[calendar['code']].to_frame(index=False), calendar[['Semana', 'ASOs']]], axis=1)
+        self.calendar_table = calendar.sort_values('Semana', ignore_index=True)
+
+    def _count_before(self, day):
+        """Quantidade de validades anteriores a ``day`` em cada grupo (busca binária)."""
+        rel = np.clip((pd.Timestamp(day).normalize() - pd.Timestamp(0)).days - self.dmin, 0, self.span - 1)
+        bounds = np.arange(len(self.groups), dtype=np.int64) * self.span + rel
+        return np.searchsorted(self.keys, bounds) - self.group_start
+
+    def counts_by_group(self, horizon_days=30, today=None):
+        """Pendentes, vencidos, a vencer no horizonte e válidos por grupo."""
+        today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+        vencidos = self._count_before(today)
+        ate_horizonte = self._count_before(today + pd.Timedelta(days=horizon_days))
+        return pd.DataFrame({
+            'total': self.group_size + self.pendentes,
+            'pendentes': self.pendentes,
+            'vencidos': vencidos,
+            'a_vencer': ate_horizonte - vencidos,
+            'validos': self.group_size - ate_horizonte,
+        }, index=self.groups)
+
+    def counts(self, horizon_days=30, today=None, companies=None):
+        """Contagens agregadas, opcionalmente restritas a um conjunto de empresas."""
+        per_group = self.counts_by_group(horizon_days, today)
+        if companies is not None:
+            per_group = per_group[self.groups.get_level_values('Empresa').isin(companies)]
+        return {key: int(value) for key, value in per_group.sum().items()}
+
+    def calendar(self, weeks=12, today=None, companies=None):
+        """Vencimentos por semana nas próximas ``weeks`` semanas."""
+        today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+        first_week = today - pd.Timedelta(days=today.weekday())
+        table = self.calendar_table
+        mask = (table['Semana'] >= first_week) & (table['Semana'] < first_week + pd.Timedelta(weeks=weeks))
+        if companies is not None:
+            mask &= table['Empresa'].isin(companies)
+        return table[mask].groupby('Semana', as_index=False)['ASOs'].sum()
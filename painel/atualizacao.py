@@ -0,0 +1,215 @@
+"""Atualização em segundo plano dos dados (stale-while-revalidate).
+
+O ``DatasetStore`` mantém o último snapshot válido (dados + índices derivados)
+e uma thread em segundo plano que verifica periodicamente a assinatura dos
+arquivos (mtime e tamanho). Quando um arquivo muda, os dados são relidos e os
+índices reconstruídos fora das requisições; o novo snapshot substitui o antigo
+numa única atribuição. Uma base que falha na leitura mantém o DataFrame da
+versão anterior, sem impedir a troca das demais; a assinatura é registrada,
+de modo que a falha só é tentada de novo quando algum arquivo mudar. O
+snapshot também é salvo em disco, de modo que um processo recém-iniciado serve
+a última versão conhecida sem ler Excel; ao salvar, snapshots de outras versões
+e temporários deixados por processos encerrados são removidos.
+
+Falhas da atualização são registradas no log e nos erros do snapshot servido.
+Se a primeira leitura falhar sem nenhuma versão disponível, ``get`` levanta
+``LoadError`` em vez de aguardar indefinidamente.
+"""
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+
+logger = logging.getLogger('painel.atualizacao')
+
+
+class LoadError(RuntimeError):
+    """Nenhuma versão dos dados disponível: a primeira leitura falhou."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Versão imutável dos dados servida às sessões."""
+    version: str
+    loaded_at: datetime
+    data: dict
+    indexes: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+    signature: tuple = ()
+
+
+def files_signature(paths):
+    """Assinatura (caminho, mtime, tamanho) dos arquivos monitorados."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def _pid_alive(pid):
+    """Indica se o processo ainda existe (no Windows, sempre considerado ativo)."""
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_stale_files(pattern, keep=()):
+    """Remove os arquivos do padrão, exceto ``keep`` e temporários (``*.<pid>.tmp``) de processos ativos."""
+    for path in glob.glob(pattern):
+        if path in keep:
+            continue
+        if path.endswith('.tmp'):
+            pid = path.rsplit('.', 2)[-2]
+            if not pid.isdigit() or _pid_alive(int(pid)):
+                continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class DatasetStore:
+    """Último snapshot válido + thread que relê os arquivos quando mudam.
+
+    ``loader(errors, failed)`` devolve as bases por nome, acrescenta mensagens
+    em ``errors`` e os nomes das bases que não puderam ser lidas em ``failed``;
+    ``derive(data, errors)`` devolve os índices derivados e também pode
+    acrescentar mensagens em ``errors``.
+    ``stale_pattern`` (glob) indica os snapshots de outras versões a remover.
+    """
+
+    def __init__(self, loader, paths, derive=None, interval=30, cache_path=None, stale_pattern=None):
+        self.loader = loader
+        self.paths = list(paths)
+        self.derive = derive
+        self.interval = interval
+        self.cache_path = cache_path
+        self.stale_pattern = stale_pattern
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self.last_errors = []
+        self.last_error = None
+        self._load_cached()
+
+    def _load_cached(self):
+        """Carrega o snapshot salvo em disco, se existir (pode estar desatualizado)."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            logger.warning("Snapshot em disco ilegível (%s); os dados serão relidos", self.cache_path, exc_info=True)
+            return
+        if isinstance(snapshot, Snapshot):
+            self._snapshot = snapshot
+            self._ready.set()
+
+    def _save_cached(self, snapshot):
+        """Salva o snapshot em disco de forma atômica (arquivo temporário + rename)."""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except Exception:
+            logger.warning("Não foi possível salvar o snapshot em %s", self.cache_path, exc_info=True)
+            return
+        if self.stale_pattern:
+            remove_stale_files(self.stale_pattern, keep=(self.cache_path,))
+
+    def refresh(self, force=False):
+        """Relê os dados se a assinatura dos arquivos mudou. Retorna True se houve troca."""
+        with self._refresh_lock:
+            signature = files_signature(self.paths)
+            current = self._snapshot
+            if not force and current is not None and current.signature == signature:
+                return False
+
+            try:
+                errors, failed = [], set()
+                data = self.loader(errors, failed)
+                kept = sorted(name for name in failed if current is not None and name in current.data)
+                if kept:
+                    # Leitura incompleta: as bases com falha continuam com a última versão válida
+                    data.update({name: current.data[name] for name in kept})
+                    errors.append(f"Mantida a versão anterior de: {', '.join(kept)}")
+                indexes = self.derive(data, errors) if self.derive else {}
+            except Exception as e:
+                self._record_failure(e)
+                raise
+            finally:
+                # Mesmo com falha, quem aguarda em ``get`` deixa de esperar e recebe o erro
+                self._ready.set()
+            version = hashlib.sha1(repr(signature).encode()).hexdigest()[:8]
+            # Troca atômica: as sessões passam a ver o novo snapshot completo de uma vez
+            self._snapshot = Snapshot(version, datetime.now(), data, indexes, errors, signature)
+            self.last_errors = errors
+            self.last_error = None
+            self._save_cached(self._snapshot)
+            return True
+
+    def _record_failure(self, error):
+        """Guarda a falha e a acrescenta aos erros do snapshot servido (que continua o mesmo)."""
+        message = f"Falha ao atualizar os dados: {error}"
+        self.last_error = error
+        self.last_errors = [message]
+        current = self._snapshot
+        if current is not None and message not in current.errors:
+            self._snapshot = replace(current, errors=[*current.errors, message])
+
+    def _run(self):
+        # O snapshot vindo do disco é servido de imediato, mas revalidado por completo
+        force = self._snapshot is not None
+        while True:
+            try:
+                self.refresh(force=force)
+                force = False
+            except Exception:
+                # Mantém o último snapshot válido; nova tentativa no próximo ciclo
+                logger.exception("Falha ao atualizar os dados; nova tentativa em %s s", self.interval)
+            time.sleep(self.interval)
+
+    def start(self):
+        """Inicia a thread de atualização (idempotente)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='painel-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def get(self, timeout=None):
+        """Snapshot atual; só aguarda quando ainda não existe nenhuma versão carregada.
+
+        Devolve None se ``timeout`` se esgotar antes da primeira versão e levanta
+        ``LoadError`` se a primeira leitura falhou.
+        """
+        if self._snapshot is None:
+            self._ready.wait(timeout)
+        snapshot = self._snapshot
+        if snapshot is None and self.last_error is not None:
+            raise LoadError(f"Falha ao carregar os dados: {self.last_error}") from self.last_error
+        return snapshot
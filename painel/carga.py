@@ -0,0 +1,331 @@
+"""Teste de carga com várias sessões simultâneas nos dois apps Streamlit.
+
+Um único servidor ``streamlit run`` é iniciado por rodada e as sessões
+simuladas se conectam a ele pelo mesmo websocket usado pelo navegador
+(``/_stcore/stream``), trocando as mensagens protobuf do Streamlit. Assim as
+sessões disputam o mesmo processo, as mesmas threads de script e o mesmo
+snapshot de ``painel.dados``, como usuários reais num servidor compartilhado.
+Cada sessão faz a primeira execução do app e, depois que todas terminam,
+repete mudanças de filtro sorteadas entre os widgets exibidos (período,
+empresas, horizonte de ASO, área...), medindo o tempo entre o envio do novo
+estado dos widgets e o fim da execução do script.
+
+Para cada quantidade de sessões o relatório traz os percentis de latência das
+execuções, a vazão (execuções/s) e a memória residente do processo do
+servidor: depois de uma execução de aquecimento (dados já carregados) e o pico
+durante a rodada, amostrado em segundo plano.
+
+Uso: ``python -m painel.carga --app dashboard --sessoes 1 5 10 --passos 10``
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import date, timedelta
+
+import numpy as np
+import psutil
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from painel.dados import ROOT_DIR
+
+# Script, pasta de trabalho e filtros alterados em cada app: (tipo do widget, início do rótulo)
+APPS = {
+    'dashboard': {
+        'script': 'dashboard.py',
+        'cwd': '.',
+        'filtros': [
+            ('selectbox', 'Período de Análise'),
+            ('selectbox', 'Horizonte de Vencimento ASO'),
+            ('multiselect', 'Selecione as Empresas'),
+            ('selectbox', 'Indicador'),
+            ('selectbox', 'Selecione o Funcionário'),
+        ],
+    },
+    'parte2': {
+        'script': 'parte2/app.py',
+        'cwd': 'parte2',
+        'filtros': [
+            ('selectbox', 'Selecione a área'),
+            ('date_input', 'Período'),
+            ('selectbox', 'Empresa'),
+        ],
+    },
+}
+
+DEFAULT_SESSIONS = (1, 5, 10)
+DEFAULT_STEPS = 10
+RUN_TIMEOUT = 300
+# Intervalo de amostragem da memória do servidor, em segundos
+MEMORY_SAMPLE_INTERVAL = 0.1
+# Faixa de datas sorteada para o filtro de período do parte2
+PERIOD_START, PERIOD_END = date(2024, 1, 1), date(2026, 7, 31)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port):
+    """Inicia ``streamlit run`` do app e espera o servidor responder; devolve o processo."""
+    config = APPS[app]
+    command = [sys.executable, '-m', 'streamlit', 'run', os.path.join(ROOT_DIR, config['script']),
+               '--server.headless=true', f'--server.port={port}', '--server.address=127.0.0.1',
+               '--server.fileWatcherType=none', '--browser.gatherUsageStats=false', '--logger.level=error']
+    process = subprocess.Popen(command, cwd=os.path.join(ROOT_DIR, config['cwd']),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + RUN_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"O servidor do app {app} terminou ao iniciar (código {process.returncode})")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise TimeoutError(f"O servidor do app {app} não respondeu em {RUN_TIMEOUT} s")
+
+
+class MemorySampler:
+    """Amostra a memória residente de um processo em segundo plano e guarda o pico."""
+
+    def __init__(self, pid, interval=MEMORY_SAMPLE_INTERVAL):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.peak = self.current()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='painel-carga-memoria', daemon=True)
+
+    def current(self):
+        return self.process.memory_info().rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.peak = max(self.peak, self.current())
+            except psutil.Error:
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class Session:
+    """Cliente websocket de uma sessão do app: envia estados de widget e espera o fim da execução."""
+
+    def __init__(self, url):
+        self.url = url
+        self.connection = None
+        self.widgets = {}
+        self.states = {}
+        self.page_script_hash = ''
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url, subprotocols=['streamlit'])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    async def run(self):
+        """Executa o script com o estado atual dos widgets; devolve (ms, exceções exibidas)."""
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.page_script_hash = self.page_script_hash
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        started = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        errors = 0
+        widgets = {}
+        while True:
+            raw = await asyncio.wait_for(self.connection.read_message(), RUN_TIMEOUT)
+            if raw is None:
+                raise ConnectionError("O servidor fechou a conexão")
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof('type')
+                if element_kind == 'exception':
+                    errors += 1
+                elif element_kind in ('selectbox', 'multiselect', 'date_input'):
+                    widget = getattr(element, element_kind)
+                    widgets[widget.id] = (element_kind, widget.label, list(getattr(widget, 'options', [])))
+            elif kind == 'script_finished' and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.widgets = widgets
+        # Estados de widgets que não aparecem mais são descartados, como no navegador
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in widgets}
+        return (time.perf_counter() - started) * 1000, errors
+
+    def change_filter(self, rng, filters):
+        """Sorteia uma mudança de filtro entre os widgets exibidos; devolve False se não houver nenhum."""
+        available = [(widget_id, kind, options) for widget_id, (kind, label, options) in self.widgets.items()
+                     if any(kind == f_kind and label.startswith(f_label) for f_kind, f_label in filters)
+                     and (options or kind == 'date_input')]
+        if not available:
+            return False
+        widget_id, kind, options = rng.choice(available)
+        state = WidgetState(id=widget_id)
+        if kind == 'selectbox':
+            state.string_value = rng.choice(options)
+        elif kind == 'multiselect':
+            choices = [option for option in options if option != 'Todas']
+            selected = (['Todas'] if not choices or rng.random() < 0.3
+                        else rng.sample(choices, rng.randint(1, min(3, len(choices)))))
+            state.string_array_value.data.extend(selected)
+        else:
+            start = PERIOD_START + timedelta(days=rng.randrange((PERIOD_END - PERIOD_START).days))
+            end = min(PERIOD_END, start + timedelta(days=rng.randint(30, 365)))
+            state.string_array_value.data.extend([start.strftime('%Y/%m/%d'), end.strftime('%Y/%m/%d')])
+        self.states[widget_id] = state
+        return True
+
+
+async def _session(url, filters, steps, seed, think_time, first_runs_done, all_ready):
+    """Uma sessão simulada: primeira execução, espera as demais e ``steps`` mudanças de filtro."""
+    result = {'primeira': None, 'latencias': [], 'erros': 0, 'inicio': None, 'fim': None, 'falha': None}
+    session = Session(url)
+    try:
+        await session.connect()
+        rng = random.Random(seed)
+        result['primeira'], result['erros'] = await session.run()
+        first_runs_done()
+        await all_ready.wait()
+        result['inicio'] = time.time()
+        for _ in range(steps):
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * think_time))
+            session.change_filter(rng, filters)
+            latency, errors = await session.run()
+            result['latencias'].append(latency)
+            result['erros'] += errors
+        result['fim'] = time.time()
+    except Exception as e:
+        result['falha'] = f"{type(e).__name__}: {e}"
+        # Não segura as demais sessões caso esta falhe antes da primeira execução
+        if result['primeira'] is None:
+            first_runs_done()
+    finally:
+        session.close()
+    return result
+
+
+async def _run_sessions(url, filters, sessions, steps, seed, think_time):
+    all_ready = asyncio.Event()
+    pending = [sessions]
+
+    def first_runs_done():
+        pending[0] -= 1
+        if pending[0] == 0:
+            all_ready.set()
+
+    return await asyncio.gather(*(_session(url, filters, steps, seed * 1000 + i, think_time, first_runs_done, all_ready)
+                                  for i in range(sessions)))
+
+
+def run_load(app, sessions, steps=DEFAULT_STEPS, seed=0, think_time=0.0):
+    """Executa ``sessions`` sessões simultâneas de ``app`` num único servidor; devolve o resumo das medições."""
+    if app not in APPS:
+        raise ValueError(f"App desconhecido: {app}; opções: {', '.join(APPS)}")
+    port = _free_port()
+    url = f'ws://127.0.0.1:{port}/_stcore/stream'
+    server = start_server(app, port)
+    try:
+        # Aquecimento: uma execução para carregar os dados antes de medir a memória de base
+        warmup = asyncio.run(_run_sessions(url, APPS[app]['filtros'], 1, 0, seed, 0.0))[0]
+        if warmup['falha']:
+            raise RuntimeError(f"Falha no aquecimento: {warmup['falha']}")
+        with MemorySampler(server.pid) as memory:
+            baseline = memory.current()
+            results = asyncio.run(_run_sessions(url, APPS[app]['filtros'], sessions, steps, seed, think_time))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    done = [r for r in results if r['falha'] is None]
+    latencies = np.array([latency for r in done for latency in r['latencias']])
+    first_runs = [r['primeira'] for r in results if r['primeira'] is not None]
+    elapsed = (max(r['fim'] for r in done) - min(r['inicio'] for r in done)) if done else 0
+    summary = {
+        'app': app,
+        'sessoes': sessions,
+        'execucoes': int(latencies.size),
+        'primeira_ms': float(np.median(first_runs)) if first_runs else None,
+        'vazao': latencies.size / elapsed if elapsed else 0.0,
+        'memoria_base_mb': baseline / 2 ** 20,
+        'memoria_pico_mb': memory.peak / 2 ** 20,
+        'erros': sum(r['erros'] for r in results),
+        'falhas': [r['falha'] for r in results if r['falha'] is not None],
+    }
+    for p in (50, 90, 99):
+        summary[f'p{p}_ms'] = float(np.percentile(latencies, p)) if latencies.size else None
+    summary['max_ms'] = float(latencies.max()) if latencies.size else None
+    return summary
+
+
+def _ms(value):
+    return f"{value:8.0f}" if value is not None else f"{'-':>8}"
+
+
+HEADER = (f"{'Sessões':>7} {'Execuções':>9} {'1ª (ms)':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'máx':>8} "
+          f"{'exec/s':>7} {'base MB':>8} {'pico MB':>8} {'erros':>5}")
+
+
+def format_row(s):
+    """Linha do relatório para uma quantidade de sessões (colunas de ``HEADER``)."""
+    line = (f"{s['sessoes']:>7} {s['execucoes']:>9} {_ms(s['primeira_ms'])} {_ms(s['p50_ms'])} "
+            f"{_ms(s['p90_ms'])} {_ms(s['p99_ms'])} {_ms(s['max_ms'])} {s['vazao']:7.2f} "
+            f"{s['memoria_base_mb']:8.0f} {s['memoria_pico_mb']:8.0f} {s['erros']:>5}")
+    return '\n'.join([line] + [f"        falha: {failure}" for failure in s['falhas']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com sessões simultâneas nos apps Streamlit.')
+    parser.add_argument('--app', choices=list(APPS), default='dashboard')
+    parser.add_argument('--sessoes', type=int, nargs='+', default=list(DEFAULT_SESSIONS),
+                        help='quantidades de sessões simultâneas a testar')
+    parser.add_argument('--passos', type=int, default=DEFAULT_STEPS, help='mudanças de filtro por sessão')
+    parser.add_argument('--pausa', type=float, default=0.0, help='tempo médio (s) entre mudanças de filtro')
+    parser.add_argument('--semente', type=int, default=0, help='semente dos filtros sorteados')
+    parser.add_argument('--json', help='arquivo para gravar os resultados')
+    args = parser.parse_args()
+
+    print(f"App {args.app}: {args.passos} mudanças de filtro por sessão, um servidor por rodada")
+    print(HEADER, flush=True)
+    summaries = []
+    for sessions in args.sessoes:
+        summaries.append(run_load(args.app, sessions, args.passos, args.semente, args.pausa))
+        print(format_row(summaries[-1]), flush=True)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Conversão vetorizada de datas, meses abreviados e números no padrão pt-BR.
+
+Todas as conversões usam formatos declarados (nada de inferência elemento a
+elemento) e operações vetorizadas do pandas, sem ``apply`` por linha:
+
+- datas ``dd/mm/aaaa`` (com ou sem hora), ISO e datas seriais do Excel;
+- rótulos de mês como ``jan/25`` ou ``março/2025``;
+- números com vírgula decimal e ponto de milhar (``1.234,5``).
+"""
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+# Formatos aceitos, na ordem de tentativa (padrão brasileiro primeiro)
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%y')
+
+# Datas seriais do Excel contam dias a partir de 30/12/1899
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_SERIAL_RANGE = (1, 2958465)
+
+MONTHS_PT = {'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+             'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12}
+
+
+def excel_serial_to_datetime(numbers):
+    """Converte números seriais do Excel em datas (fora do intervalo válido vira NaT)."""
+    numbers = pd.to_numeric(numbers, errors='coerce')
+    numbers = numbers.where(numbers.between(*EXCEL_SERIAL_RANGE))
+    return EXCEL_EPOCH + pd.to_timedelta(numbers, unit='D')
+
+
+def parse_dates(series, formats=DATE_FORMATS):
+    """Converte uma coluna em datas usando formatos declarados e seriais do Excel."""
+    if is_datetime64_any_dtype(series):
+        return series
+    if is_numeric_dtype(series):
+        return excel_serial_to_datetime(series)
+
+    # Caminho rápido: formato principal direto sobre os valores brutos
+    result = pd.to_datetime(series, format=formats[0], errors='coerce')
+    pending = result.isna() & series.notna()
+    if not pending.any():
+        return result
+
+    # Restante (seriais do Excel, outros formatos, espaços extras) tratado só nas linhas pendentes
+    text = series[pending].astype('string').str.strip()
+    parsed = excel_serial_to_datetime(text.where(text.str.fullmatch(r'\d+(\.\d+)?', na=False)))
+    for fmt in formats:
+        missing = parsed.isna() & text.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=fmt, errors='coerce')
+    result[pending] = parsed
+    return result
+
+
+def parse_month_labels(series):
+    """Converte rótulos de mês ('jan/25', 'março/2025') ou datas no 1º dia do mês."""
+    dates = parse_dates(series)
+
+    text = series.astype('string').str.strip().str.lower()
+    parts = text.str.extract(r'^([a-zç]{3})[a-zç]*[/\-\s]+(\d{2}|\d{4})$')
+    month = parts[0].map(MONTHS_PT).astype('Int64').astype('string').str.zfill(2)
+    year = pd.to_numeric(parts[1], errors='coerce').astype('Int64')
+    year = year.where(year >= 100, year + 2000).astype('string')
+    labels = pd.to_datetime(year + '-' + month + '-01', format='%Y-%m-%d', errors='coerce')
+
+    return dates.fillna(labels).dt.to_period('M').dt.to_timestamp()
+
+
+def parse_ptbr_numbers(series):
+    """Converte números no formato pt-BR ('1.234,56') em float; já numéricos passam direto."""
+    if is_numeric_dtype(series):
+        return series.astype(float)
+    # Só as células de texto passam pela leitura pt-BR; números já lidos pelo Excel (colunas mistas) ficam como estão
+    is_text = series.map(lambda value: isinstance(value, str)).astype(bool)
+    result = pd.to_numeric(series.where(~is_text), errors='coerce').astype(float)
+    if not is_text.any():
+        return result
+
+    text = series[is_text].astype('string').str.strip().str.replace(r'\s', '', regex=True)
+    has_comma = text.str.contains(',', regex=False, na=False)
+    # Sem vírgula, pontos em grupos de três dígitos ('1.234', '12.345.678') também são separadores de milhar
+    grouped = text.str.fullmatch(r'-?[1-9]\d{0,2}(\.\d{3})+', na=False)
+    # Com vírgula, o ponto é separador de milhar; nos demais casos, o ponto é decimal
+    thousands = has_comma | grouped
+    normalized = text.where(~thousands, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    result[is_text] = pd.to_numeric(normalized, errors='coerce').astype(float)
+    return result
+
+
+def convert_columns(df, dates=(), numbers=(), months=()):
+    """Aplica as conversões declaradas às colunas existentes do DataFrame."""
+    for col in dates:
+        if col in df.columns:
+            df[col] = parse_dates(df[col])
+    for col in numbers:
+        if col in df.columns:
+            df[col] = parse_ptbr_numbers(df[col])
+    for col in months:
+        if col in df.columns:
+            df[col] = parse_month_labels(df[col])
+    return df
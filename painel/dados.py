@@ -0,0 +1,457 @@
+"""Camada única de acesso aos dados usada por dashboard.py e parte2/app.py.
+
+Cada base tem uma única origem e um esquema canônico (``DATASETS``): colunas
+de data, números pt-BR, rótulos de mês e colunas derivadas são convertidos da
+mesma forma para os dois apps. Os DataFrames já convertidos ficam em cache no
+disco (``.cache/datasets``), identificados pela assinatura do arquivo de
+origem, de modo que cada planilha é lida uma vez por máquina, não uma vez por
+app. Exportações repetidas (mesmo conteúdo em arquivos diferentes) são
+detectadas por uma impressão digital do conteúdo, que ignora a ordem das
+linhas e colunas e espaços nas pontas dos textos, e compartilham um único
+DataFrame; uma base cujas linhas estão todas em outra é guardada como as
+posições dessas linhas no DataFrame maior. Gravação, absorção de subconjuntos
+e limpeza do cache acontecem sob uma trava exclusiva do cache inteiro; a
+leitura de uma base já convertida usa a mesma trava compartilhada, de modo que
+nenhum processo remove um DataFrame entre a leitura da referência e a do
+arquivo. ``get_store`` devolve o armazém compartilhado (snapshot + índices) do
+processo.
+"""
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from painel.aso import AsoExpiryIndex
+from painel.atualizacao import DatasetStore, files_signature, remove_stale_files
+from painel.conversao import convert_columns
+from painel.distintos import MODE_TAG, DistinctCountIndex
+from painel.funcionarios import EmployeeIndex
+from painel.intervalos import DaysLostIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+logger = logging.getLogger('painel.dados')
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache')
+DATASET_CACHE_DIR = os.path.join(CACHE_DIR, 'datasets')
+FRAME_CACHE_DIR = os.path.join(DATASET_CACHE_DIR, 'frames')
+
+# Versão do esquema canônico: alterar ao mudar conversões ou colunas derivadas (invalida o cache das planilhas)
+SCHEMA_VERSION = 7
+# Versão dos índices derivados (``build_indexes``): alterar ao mudar os índices; invalida só o snapshot
+INDEX_VERSION = 1
+
+# Grupos patológicos pela letra do CID principal
+CID_GROUPS = {'F': 'Transtornos Mentais', 'A': 'Doenças Infecciosas', 'K': 'Doenças Digestivas'}
+
+# Termos da descrição do CID que marcam afastamentos por saúde mental e musculoesqueléticos
+MENTAL_HEALTH_TERMS = ['depressivo', 'ansiedade', 'stress', 'psiquiátric']
+MUSCULOSKELETAL_TERMS = ['coluna', 'lombar', 'cervical', 'articular', 'muscular']
+
+
+def _prepare_absences(df):
+    """Colunas canônicas de afastamento: 'Dias Perdidos' (fracionado), 'Categoria' e grupos de diagnóstico."""
+    if 'Dias' in df.columns:
+        df['Dias Perdidos'] = df['Dias'].fillna(0)
+    elif 'Dias Afastados' in df.columns:
+        df['Dias Perdidos'] = df['Dias Afastados'].astype(float)
+    if 'Cid Principal' in df.columns:
+        df['Categoria'] = df['Cid Principal'].astype('string').str[0].map(CID_GROUPS).fillna('Outros')
+    if 'Descrição do Cid Principal' in df.columns:
+        # Busca textual feita uma vez na carga, não a cada renderização
+        description = df['Descrição do Cid Principal']
+        df['Saúde Mental'] = description.str.contains('|'.join(MENTAL_HEALTH_TERMS), case=False, na=False)
+        df['Musculoesquelético'] = description.str.contains('|'.join(MUSCULOSKELETAL_TERMS), case=False, na=False)
+    return df
+
+
+def _prepare_exams(df):
+    """Remove as linhas de rodapé do relatório ('Total de Exames Realizados: 24514') gravadas em 'Empresa'."""
+    if 'Empresa' in df.columns:
+        footer = (df['Empresa'].astype('string').str.fullmatch(r'[^:]+:\s*[\d.,]+', na=False)
+                  & df.drop(columns='Empresa').isna().all(axis=1))
+        df = df[~footer].reset_index(drop=True)
+    return df
+
+
+def _prepare_consults(df):
+    """Remove linhas de observação ('Média de visita') das consultas técnicas."""
+    if 'DATA' in df.columns:
+        df = df[~df['DATA'].astype(str).str.contains('Média', case=False, na=False)].reset_index(drop=True)
+    return df
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Origem e esquema canônico de uma base."""
+    path: str
+    sheet: object = 0
+    dates: tuple = ()
+    numbers: tuple = ()
+    months: tuple = ()
+    read_options: dict = field(default_factory=dict)
+    prepare: object = None
+
+    @property
+    def full_path(self):
+        return os.path.join(ROOT_DIR, self.path)
+
+
+ABSENCE_DATES = ('Data de Nascimento', 'Data de Criação', 'Data da Ficha', 'Início', 'Fim', 'Retorno')
+
+DATASETS = {
+    'absenteismo': DatasetSpec('data/Absenteísmo 2025.xlsx', dates=ABSENCE_DATES, numbers=('Dias',), prepare=_prepare_absences),
+    'absenteismo_doenca': DatasetSpec('data/Absenteísmo por Doença.xlsx', dates=ABSENCE_DATES, numbers=('Dias',), prepare=_prepare_absences),
+    'taxa_absenteismo': DatasetSpec('data/Taxa Absenteismo.xlsx', dates=ABSENCE_DATES, numbers=('Dias',), prepare=_prepare_absences),
+    'exames_alterados': DatasetSpec('data/Exames Alterados 2025.xlsx', dates=('Data do Exame',), prepare=_prepare_exams),
+    'aso_validos': DatasetSpec('data/ASO Válidos.xlsx', dates=('Dt.Nascimento', 'Data Último Exame', 'Dt.Demissão', 'Validade')),
+    'perfil_epidemiologico': DatasetSpec('data/Perfil Epidemiológico 2025.xlsx', dates=('Data de Nascimento', 'Data de Admissão', 'Data de Demissão', 'Data Ficha Clínica')),
+    'visitas_medicas': DatasetSpec('data/Visitas Médicas - Dr. Antonio 2025.xlsx', dates=('DATA',)),
+    'consultas_tecnicas': DatasetSpec('data/Consultas Técnicas.xlsx', months=('DATA',), prepare=_prepare_consults),
+    'controle_documentos': DatasetSpec('data/Controle Documentos.xlsx', dates=('Vencimento PCMSO ',)),
+    'seguranca_visitas': DatasetSpec('parte2/exportados/DASHBOAR SYNGENTA.xlsx', sheet='VISITAS'),
+    'seguranca_programas': DatasetSpec('parte2/exportados/DASHBOAR SYNGENTA.xlsx', sheet='PROGRAMAS'),
+    'seguranca_medicoes': DatasetSpec('parte2/exportados/DASHBOAR SYNGENTA.xlsx', sheet='MEDIÇÕES'),
+    'ppp': DatasetSpec('parte2/exportados/PPP SYNGENTA - 01-05-2025 - 21-07-2025.xlsx',
+                       read_options={'header': None, 'names': ['ID', 'Descrição', 'Status']}),
+}
+
+
+def dataset_paths(names=None):
+    """Caminhos dos arquivos de origem (sem repetição) das bases informadas."""
+    names = names or DATASETS.keys()
+    return list(dict.fromkeys(DATASETS[name].full_path for name in names))
+
+
+def _convert(df, spec):
+    """Aplica o esquema canônico à planilha lida."""
+    df = convert_columns(df, dates=spec.dates, numbers=spec.numbers, months=spec.months)
+    if spec.prepare is not None:
+        df = spec.prepare(df)
+    return df
+
+
+def _ref_file(name, spec):
+    """Arquivo que associa a versão atual da planilha à impressão digital do conteúdo."""
+    signature = files_signature([spec.full_path])
+    digest = hashlib.sha1(repr((SCHEMA_VERSION, signature, spec.sheet)).encode()).hexdigest()[:12]
+    return os.path.join(DATASET_CACHE_DIR, f"{name}-{digest}.ref")
+
+
+def _strip_text(series):
+    """Textos sem espaços nas pontas; demais valores inalterados."""
+    try:
+        stripped = series.str.strip()
+    except AttributeError:
+        return series
+    return series.where(stripped.isna(), stripped)
+
+
+def row_hashes(df, spec):
+    """(assinatura do esquema, hash de cada linha) com colunas ordenadas e textos sem espaços nas pontas."""
+    columns = sorted(df.columns, key=str)
+    normalized = pd.DataFrame({str(col): _strip_text(df[col]) if df[col].dtype == object or
+                               pd.api.types.is_string_dtype(df[col]) else df[col] for col in columns})
+    schema = (SCHEMA_VERSION, [str(col) for col in columns], [str(df[col].dtype) for col in columns], spec.dates,
+              spec.numbers, spec.months, getattr(spec.prepare, '__name__', None))
+    schema = hashlib.sha1(repr(schema).encode()).hexdigest()
+    return schema, pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _fingerprint(schema, hashes):
+    digest = hashlib.sha1(schema.encode())
+    # Multiconjunto das linhas: hashes ordenados
+    digest.update(np.sort(hashes).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def content_fingerprint(df, spec):
+    """Impressão digital do conteúdo da planilha e do esquema aplicado, independente da ordem de linhas e colunas."""
+    return _fingerprint(*row_hashes(df, spec))
+
+
+def _frame_file(fingerprint):
+    return os.path.join(FRAME_CACHE_DIR, f"{fingerprint}.pkl")
+
+
+def _subset_file(fingerprint):
+    """Base guardada como (impressão digital do DataFrame maior, posições das linhas)."""
+    return os.path.join(FRAME_CACHE_DIR, f"{fingerprint}.sub")
+
+
+def _rows_file(fingerprint):
+    """(assinatura do esquema, hashes das linhas na ordem do DataFrame) de um DataFrame completo."""
+    return os.path.join(FRAME_CACHE_DIR, f"{fingerprint}.rows")
+
+
+def _frame_exists(fingerprint):
+    return os.path.exists(_frame_file(fingerprint)) or os.path.exists(_subset_file(fingerprint))
+
+
+def _read_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _dump(obj):
+    return lambda f: pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _positions(hashes, within):
+    """Posições em ``within`` de cada hash de ``hashes`` (None se algum não estiver lá)."""
+    order = np.argsort(within, kind='stable')
+    found = np.searchsorted(within, hashes, sorter=order)
+    found = np.minimum(found, len(within) - 1) if len(within) else found
+    if not len(within) or not np.array_equal(within[order[found]], hashes):
+        return None
+    return order[found]
+
+
+def _find_superset(fingerprint, schema, hashes):
+    """DataFrame completo do mesmo esquema que contém todas as linhas: (impressão digital, posições)."""
+    for rows_file in glob.glob(os.path.join(FRAME_CACHE_DIR, '*.rows')):
+        other = os.path.basename(rows_file)[:-5]
+        try:
+            other_schema, other_hashes = _read_pickle(rows_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            continue
+        if other != fingerprint and other_schema == schema and len(other_hashes) >= len(hashes):
+            positions = _positions(hashes, other_hashes)
+            if positions is not None:
+                return other, positions
+    return None
+
+
+def _absorb_subsets(fingerprint, schema, hashes):
+    """Troca os DataFrames completos contidos no novo DataFrame por posições de linha nele."""
+    for rows_file in glob.glob(os.path.join(FRAME_CACHE_DIR, '*.rows')):
+        other = os.path.basename(rows_file)[:-5]
+        try:
+            other_schema, other_hashes = _read_pickle(rows_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            continue
+        if other == fingerprint or other_schema != schema or len(other_hashes) > len(hashes):
+            continue
+        positions = _positions(other_hashes, hashes)
+        if positions is not None:
+            _write_atomic(_subset_file(other), _dump((fingerprint, positions)))
+            for path in (rows_file, _frame_file(other)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _cache_lock(shared=False):
+    """Trava do cache inteiro entre processos (exclusiva para gravar e limpar, compartilhada para ler)."""
+    os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(DATASET_CACHE_DIR, 'cache.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+
+
+def _prune_frames():
+    """Remove DataFrames convertidos (e posições de linha) que nenhuma base referencia mais."""
+    pending = set()
+    for ref in glob.glob(os.path.join(DATASET_CACHE_DIR, '*.ref')):
+        with open(ref) as f:
+            pending.add(f.read().strip())
+    # Bases guardadas como posições de linha mantêm o DataFrame maior referenciado
+    referenced = set()
+    while pending:
+        fingerprint = pending.pop()
+        referenced.add(fingerprint)
+        if os.path.exists(_subset_file(fingerprint)):
+            source, _ = _read_pickle(_subset_file(fingerprint))
+            if source not in referenced:
+                pending.add(source)
+    for pattern in ('*.pkl', '*.sub', '*.rows'):
+        for path in glob.glob(os.path.join(FRAME_CACHE_DIR, pattern)):
+            if os.path.splitext(os.path.basename(path))[0] not in referenced:
+                os.remove(path)
+    # Temporários de gravações interrompidas
+    for directory in (DATASET_CACHE_DIR, FRAME_CACHE_DIR):
+        remove_stale_files(os.path.join(directory, '*.tmp'))
+
+
+def _load_frame(fingerprint, frames):
+    """DataFrame de uma impressão digital; bases com o mesmo conteúdo recebem o mesmo objeto."""
+    if fingerprint not in frames:
+        try:
+            frames[fingerprint] = _read_pickle(_frame_file(fingerprint))
+        except FileNotFoundError:
+            # Contida em outro DataFrame: as linhas dela, na ordem da planilha
+            source, positions = _read_pickle(_subset_file(fingerprint))
+            frames[fingerprint] = _load_frame(source, frames).iloc[positions].reset_index(drop=True)
+    return frames[fingerprint]
+
+
+def _read_fingerprint(ref_file):
+    """Impressão digital registrada para a planilha, se o DataFrame convertido ainda existir."""
+    if not os.path.exists(ref_file):
+        return None
+    with open(ref_file) as f:
+        fingerprint = f.read().strip()
+    return fingerprint if _frame_exists(fingerprint) else None
+
+
+def load_dataset(name, frames=None):
+    """Base convertida, lida do cache da máquina ou da planilha (uma vez por versão do arquivo).
+
+    Planilhas diferentes com o mesmo conteúdo (exportações repetidas) são
+    convertidas e guardadas uma única vez; ``frames`` (impressão digital ->
+    DataFrame) faz as bases equivalentes apontarem para o mesmo objeto. Uma
+    planilha contida em outra do mesmo esquema não é convertida: é guardada
+    como as posições das suas linhas no DataFrame maior.
+    """
+    frames = frames if frames is not None else {}
+    spec = DATASETS[name]
+    ref_file = _ref_file(name, spec)
+    with _cache_lock(shared=True):
+        fingerprint = _read_fingerprint(ref_file)
+        if fingerprint is not None:
+            return _load_frame(fingerprint, frames)
+
+    with open(os.path.join(DATASET_CACHE_DIR, f"{name}.lock"), 'w') as lock:
+        # Outro processo pode estar lendo a mesma planilha: espera e reaproveita o resultado
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        with _cache_lock(shared=True):
+            fingerprint = _read_fingerprint(ref_file)
+            if fingerprint is not None:
+                return _load_frame(fingerprint, frames)
+
+        # Leitura da planilha sem a trava do cache: as demais bases continuam disponíveis
+        raw = pd.read_excel(spec.full_path, sheet_name=spec.sheet, **spec.read_options)
+        schema, hashes = row_hashes(raw, spec)
+        fingerprint = _fingerprint(schema, hashes)
+        with _cache_lock():
+            if fingerprint not in frames and not _frame_exists(fingerprint):
+                superset = _find_superset(fingerprint, schema, hashes)
+                if superset is not None:
+                    _write_atomic(_subset_file(fingerprint), _dump(superset))
+                else:
+                    df = _convert(raw, spec)
+                    _write_atomic(_frame_file(fingerprint), _dump(df))
+                    frames[fingerprint] = df
+                    # Posições de linha só valem se a conversão não remove linhas
+                    if len(df) == len(raw):
+                        _write_atomic(_rows_file(fingerprint), _dump((schema, hashes)))
+                        _absorb_subsets(fingerprint, schema, hashes)
+            _write_atomic(ref_file, lambda f: f.write(fingerprint.encode()))
+            for old in glob.glob(os.path.join(DATASET_CACHE_DIR, f"{name}-*.ref")):
+                if old != ref_file:
+                    os.remove(old)
+            _prune_frames()
+            return _load_frame(fingerprint, frames)
+
+
+def load_datasets(errors=None, failed=None, names=None):
+    """Todas as bases (ou as informadas); falhas viram DataFrame vazio, mensagem em ``errors`` e nome em ``failed``."""
+    errors = errors if errors is not None else []
+    failed = failed if failed is not None else set()
+    data = {}
+    frames = {}
+    for name in names or DATASETS:
+        spec = DATASETS[name]
+        if not os.path.exists(spec.full_path):
+            errors.append(f"Arquivo não encontrado: {spec.path}")
+            failed.add(name)
+            data[name] = pd.DataFrame()
+            continue
+        try:
+            data[name] = load_dataset(name, frames)
+        except Exception as e:
+            errors.append(f"Erro ao carregar {spec.path}: {str(e)}")
+            failed.add(name)
+            data[name] = pd.DataFrame()
+    return data
+
+
+def shared_datasets(data):
+    """Grupos de bases que apontam para o mesmo DataFrame (conteúdo idêntico)."""
+    groups = {}
+    for name, df in data.items():
+        if not df.empty:
+            groups.setdefault(id(df), []).append(name)
+    return [names for names in groups.values() if len(names) > 1]
+
+
+def absences(data):
+    """Base de afastamentos de referência (com alternativa se a principal estiver vazia)."""
+    return data['absenteismo'] if not data['absenteismo'].empty else data['taxa_absenteismo']
+
+
+def build_indexes(data):
+    """Índices derivados, reconstruídos junto com cada nova versão dos dados."""
+    from painel.tabelas import build_detail_tables
+
+    return {
+        'days_lost': DaysLostIndex(absences(data), start_col='Início', end_col='Fim', value_col='Dias Perdidos', group_cols=['Empresa', 'Categoria']),
+        'aso_expiry': AsoExpiryIndex(data['aso_validos']),
+        'employees': EmployeeIndex(data),
+        'distinct_employees': DistinctCountIndex(absences(data), key_col='Funcionário', date_col='Início'),
+        'detail_tables': build_detail_tables(data),
+    }
+
+
+def _derive(data, errors):
+    """Índices da nova versão e atualização incremental da tabela de alertas.
+
+    Falhas nos alertas não impedem a troca do snapshot: ficam no log e em
+    ``errors``; se a atualização incremental falhar, a tabela é recalculada por
+    completo.
+    """
+    from painel.alertas import AlertTable
+
+    indexes = build_indexes(data)
+    table = AlertTable()
+    try:
+        table.update(data, indexes)
+    except Exception as e:
+        logger.exception("Falha na atualização incremental dos alertas; recalculando a tabela completa")
+        try:
+            table.update(data, indexes, full=True)
+            errors.append(f"Alertas recalculados por completo após falha na atualização incremental: {e}")
+        except Exception as e:
+            logger.exception("Falha ao recalcular os alertas")
+            errors.append(f"Alertas desatualizados: {e}")
+    return indexes
+
+
+_store = None
+_store_lock = threading.Lock()
+# Espera máxima (s) das páginas pela primeira versão dos dados
+LOAD_TIMEOUT = float(os.environ.get('PAINEL_LOAD_TIMEOUT', 300))
+
+
+def get_store():
+    """Armazém compartilhado do processo (iniciado na primeira chamada)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            # Snapshot identificado pelas versões do esquema e dos índices e pelo modo das contagens distintas
+            snapshot = f'snapshot-v{SCHEMA_VERSION}.{INDEX_VERSION}-{MODE_TAG}.pkl'
+            _store = DatasetStore(load_datasets, dataset_paths(), derive=_derive, interval=30,
+                                  cache_path=os.path.join(CACHE_DIR, snapshot),
+                                  stale_pattern=os.path.join(CACHE_DIR, 'snapshot-*'))
+            _store.start()
+    return _store
@@ -0,0 +1,45 @@
+"""Medição do tempo até a primeira renderização útil (first paint) de cada execução.
+
+O cronômetro começa no topo do script, antes dos imports pesados (o script
+passa o instante inicial em ``started``), de modo que a execução a frio inclui
+o custo de importação; ``mark`` registra o tempo decorrido em
+pontos nomeados (por exemplo, após os KPIs). O orçamento de first paint pode
+ser ajustado pela variável de ambiente ``PAINEL_FIRST_PAINT_BUDGET_MS``.
+"""
+import logging
+import os
+import time
+
+FIRST_PAINT_BUDGET_MS = float(os.environ.get('PAINEL_FIRST_PAINT_BUDGET_MS', 1000))
+
+logger = logging.getLogger('painel.desempenho')
+
+
+class RenderTimer:
+    """Cronômetro de uma execução do script com marcos nomeados (em ms)."""
+
+    def __init__(self, budget_ms=FIRST_PAINT_BUDGET_MS, started=None):
+        self.budget_ms = budget_ms
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        """Registra o tempo decorrido desde o início até este ponto."""
+        elapsed = (time.perf_counter() - self.started) * 1000
+        self.marks[name] = elapsed
+        if name == 'first_paint' and elapsed > self.budget_ms:
+            logger.warning("First paint em %.0f ms acima do orçamento de %.0f ms", elapsed, self.budget_ms)
+        return elapsed
+
+    @property
+    def within_budget(self):
+        return self.marks.get('first_paint', 0) <= self.budget_ms
+
+    def summary(self):
+        """Texto curto com first paint, orçamento e tempo total da página."""
+        first_paint = self.marks.get('first_paint')
+        total = self.marks.get('complete', (time.perf_counter() - self.started) * 1000)
+        status = '✅' if self.within_budget else '⚠️'
+        if first_paint is None:
+            return f"⏱️ Página completa em {total:.0f} ms"
+        return f"⏱️ {status} Primeira renderização em {first_paint:.0f} ms (orçamento {self.budget_ms:.0f} ms) · página completa em {total:.0f} ms"
@@ -0,0 +1,130 @@
+"""Índice de funcionários entre bases (afastamentos, exames, ASO e fichas clínicas).
+
+As bases descrevem os mesmos trabalhadores com colunas diferentes ('Funcionário',
+'Nome', 'Nome Funcionário'). O índice é construído uma vez na carga: chaves
+normalizadas de nome e CPF apontam para as posições das linhas em cada base, de
+modo que a consulta de um funcionário é um acesso a dicionário seguido de
+``iloc``, sem varrer as tabelas. Homônimos (mesmo nome, CPFs diferentes) são
+opções separadas na busca e consultados pelo CPF.
+"""
+import re
+import unicodedata
+
+# Coluna de nome de cada base indexada
+NAME_COLUMNS = {
+    'absenteismo': 'Funcionário',
+    'exames_alterados': 'Funcionário',
+    'aso_validos': 'Nome',
+    'perfil_epidemiologico': 'Nome Funcionário',
+}
+CPF_COLUMN = 'CPF'
+
+
+def normalize_names(series):
+    """Normaliza nomes: sem acentos, minúsculos e com espaços simples."""
+    return (series.astype('string')
+            .str.normalize('NFKD')
+            .str.encode('ascii', 'ignore')
+            .str.decode('ascii')
+            .str.lower()
+            .str.split()
+            .str.join(' '))
+
+
+def normalize_cpf(series):
+    """Normaliza CPF para 11 dígitos (aceita texto formatado ou número do Excel)."""
+    digits = (series.astype('string')
+              .str.replace(r'\.0$', '', regex=True)
+              .str.replace(r'\D', '', regex=True))
+    digits = digits.where(digits.str.len() > 0)
+    return digits.str.zfill(11)
+
+
+def _name_key(name):
+    """Versão escalar de ``normalize_names`` usada nas consultas."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().split())
+
+
+def _cpf_key(cpf):
+    """Versão escalar de ``normalize_cpf`` usada nas consultas."""
+    digits = re.sub(r'\D', '', re.sub(r'\.0$', '', str(cpf)))
+    return digits.zfill(11) if digits else None
+
+
+def format_cpf(cpf):
+    """CPF de 11 dígitos no formato 000.000.000-00."""
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+
+
+def _positions_by_key(keys):
+    """Mapeia cada chave não nula para as posições (0..n-1) das linhas correspondentes."""
+    keys = keys.reset_index(drop=True)
+    return keys.groupby(keys, sort=False, dropna=True).indices
+
+
+class EmployeeIndex:
+    """Chaves normalizadas de funcionário -> posições de linha em cada base."""
+
+    def __init__(self, data, name_columns=None):
+        name_columns = name_columns or NAME_COLUMNS
+        self.by_name = {}
+        self.by_cpf = {}
+        self.display_names = {}
+        # Nome normalizado -> CPFs encontrados com esse nome (mais de um = homônimos)
+        self.cpfs_by_name = {}
+
+        for dataset, name_col in name_columns.items():
+            df = data.get(dataset)
+            if df is None or df.empty or name_col not in df.columns:
+                continue
+
+            names = normalize_names(df[name_col])
+            for key, positions in _positions_by_key(names).items():
+                self.by_name.setdefault(key, {})[dataset] = positions
+                if key not in self.display_names:
+                    self.display_names[key] = ' '.join(str(df[name_col].iat[positions[0]]).split())
+
+            if CPF_COLUMN in df.columns:
+                cpfs = normalize_cpf(df[CPF_COLUMN])
+                for key, positions in _positions_by_key(cpfs).items():
+                    self.by_cpf.setdefault(key, {})[dataset] = positions
+                known = names.notna() & cpfs.notna()
+                for name_key, cpf in set(zip(names[known], cpfs[known])):
+                    self.cpfs_by_name.setdefault(name_key, set()).add(cpf)
+
+        # Opções da busca: nome + CPF para cada pessoa com CPF conhecido, só o nome nos demais casos
+        self.choices = {}
+        for key, name in self.display_names.items():
+            for cpf in sorted(self.cpfs_by_name.get(key, ())) or [None]:
+                label = f"{name} · CPF {format_cpf(cpf)}" if cpf else name
+                self.choices[label] = (name, cpf)
+        self._sorted_labels = sorted(self.choices)
+
+    def labels(self):
+        """Rótulos de busca (nome e CPF) de todos os funcionários indexados, em ordem alfabética."""
+        return self._sorted_labels
+
+    def lookup(self, name=None, cpf=None):
+        """Posições de linha por base para um funcionário (pelo CPF, quando informado, ou pelo nome).
+
+        Com CPF, as bases sem CPF (ou sem linhas para ele) são completadas pelo
+        nome apenas se o nome não pertencer a mais de um CPF, para não misturar
+        homônimos.
+        """
+        by_name = self.by_name.get(_name_key(name), {}) if name is not None else {}
+        if cpf is None:
+            return by_name
+        cpf_key = _cpf_key(cpf)
+        found = dict(self.by_cpf.get(cpf_key, {}))
+        if name is not None and self.cpfs_by_name.get(_name_key(name), set()) <= {cpf_key}:
+            for dataset, positions in by_name.items():
+                found.setdefault(dataset, positions)
+        return found
+
+    def rows(self, data, name=None, cpf=None, label=None):
+        """Linhas de cada base referentes a um funcionário (por nome, CPF ou rótulo de ``labels``)."""
+        if label is not None:
+            name, cpf = self.choices.get(label, (label, None))
+        return {dataset: data[dataset].iloc[positions]
+                for dataset, positions in self.lookup(name=name, cpf=cpf).items()}
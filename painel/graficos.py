@@ -0,0 +1,183 @@
+"""Gráficos (Plotly) do dashboard de Saúde Ocupacional.
+
+As funções recebem os dados já filtrados e devolvem figuras Plotly, sem
+depender do Streamlit, de modo que o dashboard e os relatórios em lote montam
+os mesmos gráficos. Os números vêm de ``painel.agregados``. ``None`` indica
+que não há dados para o gráfico.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from painel import agregados
+
+ASO_STATUS_COLORS = {'Válido': '#2ecc71', 'Vencido': '#e74c3c', 'Pendente': '#f39c12'}
+
+
+def diagnoses_chart(abs_window, top=10):
+    """Barras horizontais com os diagnósticos mais frequentes."""
+    if abs_window.empty or 'Descrição do Cid Principal' not in abs_window.columns:
+        return None
+    diagnoses = agregados.top_diagnoses(abs_window, top)
+    fig = px.bar(
+        y=diagnoses.index,
+        x=diagnoses.values,
+        orientation='h',
+        title=f"Top {top} Diagnósticos mais Frequentes",
+        labels={'x': 'Número de Casos', 'y': 'Diagnóstico'}
+    )
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        height=400,
+        template="plotly_white"
+    )
+    return fig
+
+
+def specialties_chart(abs_window):
+    """Pizza com a distribuição dos afastamentos por especialidade médica."""
+    if abs_window.empty or 'Especialidade' not in abs_window.columns:
+        return None
+    especialidades = agregados.specialty_counts(abs_window)
+    fig = px.pie(
+        values=especialidades.values,
+        names=especialidades.index,
+        title="Distribuição por Especialidade"
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+def monthly_absences_chart(monthly_data):
+    """Linha de casos e barras de dias perdidos por mês, lado a lado."""
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('Número de Casos por Mês', 'Dias Perdidos por Mês'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=monthly_data['Mês'],
+            y=monthly_data['Funcionário'],
+            mode='lines+markers',
+            name='Casos',
+            line=dict(color='#2E8B57', width=3)
+        ),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=monthly_data['Mês'],
+            y=monthly_data['Dias Perdidos'],
+            name='Dias Perdidos',
+            marker_color='#32CD32'
+        ),
+        row=1, col=2
+    )
+    fig.update_layout(
+        height=400,
+        template="plotly_white",
+        showlegend=False
+    )
+    return fig
+
+
+def exam_status_chart(exam_window):
+    """Barras de exames normais x alterados."""
+    if exam_window.empty:
+        return None
+    counts = agregados.exam_status_counts(exam_window)
+    normal, altered = counts['Normal'], counts['Alterado']
+    total_exams = normal + altered
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=['Normal', 'Alterado'],
+        y=[normal, altered],
+        marker_color=['#2ecc71', '#e74c3c'],
+        text=[f'{normal}<br>({normal/total_exams*100:.1f}%)',
+              f'{altered}<br>({altered/total_exams*100:.1f}%)'],
+        textposition='inside'
+    ))
+    fig.update_layout(
+        title="Status dos Exames Realizados",
+        yaxis_title="Número de Exames",
+        template="plotly_white",
+        height=300
+    )
+    return fig
+
+
+def exam_types_chart(exam_window):
+    """Pizza com a distribuição por tipo de exame."""
+    if exam_window.empty or 'Tipo' not in exam_window.columns:
+        return None
+    exam_types = agregados.exam_type_counts(exam_window)
+    fig = px.pie(
+        values=exam_types.values,
+        names=exam_types.index,
+        title="Distribuição por Tipo de Exame"
+    )
+    fig.update_layout(height=300)
+    return fig
+
+
+def aso_status_chart(kpis, aso_horizon):
+    """Pizza de ASOs válidos, a vencer no horizonte, vencidos e pendentes."""
+    due_label = f'A vencer ({aso_horizon}d)'
+    status_counts = agregados.aso_status_counts(kpis, aso_horizon)
+    return px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        title="Status dos ASOs",
+        color=status_counts.index,
+        color_discrete_map={**ASO_STATUS_COLORS, due_label: '#f1c40f'}
+    )
+
+
+def aso_units_chart(aso_df, top=10):
+    """Barras horizontais com as unidades com mais ASOs."""
+    if aso_df.empty or 'Unidade' not in aso_df.columns:
+        return None
+    unit_counts = agregados.aso_unit_counts(aso_df, top)
+    fig = px.bar(
+        x=unit_counts.values,
+        y=unit_counts.index,
+        orientation='h',
+        title="ASOs por Unidade",
+        labels={'x': 'Quantidade', 'y': 'Unidade'}
+    )
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        template="plotly_white"
+    )
+    return fig
+
+
+def expiry_calendar_chart(calendar, weeks=12):
+    """Barras de ASOs a vencer por semana."""
+    if calendar.empty:
+        return None
+    fig = px.bar(
+        calendar,
+        x='Semana',
+        y='ASOs',
+        title=f"Calendário de Vencimentos (próximas {weeks} semanas)",
+        labels={'Semana': 'Semana', 'ASOs': 'ASOs a vencer'}
+    )
+    fig.update_layout(template="plotly_white", height=300)
+    return fig
+
+
+def ranking_chart(worst, kpi, label):
+    """Barras horizontais das piores empresas num indicador."""
+    fig = px.bar(
+        worst,
+        x=kpi,
+        y='Empresa',
+        orientation='h',
+        title=f"Piores {len(worst)} Empresas - {label}",
+        labels={kpi: label, 'Empresa': 'Empresa'}
+    )
+    fig.update_layout(template="plotly_white", height=max(300, 30 * len(worst)), yaxis={'categoryorder': 'total ascending'})
+    return fig
@@ -0,0 +1,133 @@
+"""Motor de sobreposição de intervalos para contabilizar dias perdidos por janela.
+
+Cada afastamento é um intervalo [Início, Fim] com uma taxa diária (valor
+dividido pelos dias do intervalo). Em vez de comparar linha a linha com a
+janela consultada, o índice guarda os extremos ordenados por (grupo, dia) com
+somas de prefixo de ``taxa`` e ``taxa × dia``. Os dias perdidos acumulados
+antes do dia k são ``k·Σtaxa - Σtaxa·início`` dos intervalos iniciados antes de
+k menos o mesmo termo dos encerrados antes de k; cada janela sai de duas buscas
+binárias por grupo, já recortada aos limites. A memória é proporcional ao
+número de afastamentos, não ao intervalo de datas (uma data digitada errada,
+como 1900, não cria dezenas de milhares de dias por grupo).
+"""
+import numpy as np
+import pandas as pd
+
+
+class _Endpoints:
+    """Extremos ordenados pela chave (grupo * span + dia) com somas de prefixo de taxa e taxa × dia."""
+
+    def __init__(self, keys, rate, span):
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.span = span
+        days = (self.keys % span).astype(float)
+        self.rate = np.concatenate([[0.0], np.cumsum(rate[order])])
+        self.weighted = np.concatenate([[0.0], np.cumsum(rate[order] * days)])
+
+    def before(self, codes, days):
+        """Σ taxa × (dia - extremo) dos extremos anteriores a ``days`` em cada grupo de ``codes``."""
+        codes = np.asarray(codes, dtype=np.int64).reshape(-1, *([1] * np.ndim(days)))
+        days = np.clip(days, 0, self.span - 1)
+        first = np.searchsorted(self.keys, codes * self.span)
+        last = np.searchsorted(self.keys, codes * self.span + days)
+        return days * (self.rate[last] - self.rate[first]) - (self.weighted[last] - self.weighted[first])
+
+
+class DaysLostIndex:
+    """Índice de dias perdidos por grupo (ex.: Empresa) construído uma única vez."""
+
+    def __init__(self, df, start_col='Início', end_col='Fim', value_col='Dias Afastados', group_cols='Empresa'):
+        if isinstance(group_cols, str):
+            group_cols = [group_cols]
+        self.group_cols = list(group_cols)
+
+        starts = pd.to_datetime(df[start_col], errors='coerce').dt.normalize() if start_col in df.columns else pd.Series(dtype='datetime64[ns]')
+        ends = pd.to_datetime(df[end_col], errors='coerce').dt.normalize() if end_col in df.columns else pd.Series(dtype='datetime64[ns]')
+        # Afastamentos sem fim informado são tratados como de um único dia
+        ends = ends.fillna(starts)
+        valid = starts.notna() & (ends >= starts)
+        for col in self.group_cols:
+            valid &= df[col].notna() if col in df.columns else False
+
+        starts = starts[valid]
+        ends = ends[valid]
+        keys = df.loc[valid, self.group_cols] if valid.any() else pd.DataFrame(columns=self.group_cols)
+
+        if starts.empty:
+            self.origin = pd.Timestamp.now().normalize()
+            self.groups = pd.MultiIndex.from_arrays([[]] * len(self.group_cols), names=self.group_cols) if len(self.group_cols) > 1 else pd.Index([], name=self.group_cols[0])
+            self.n_days = 0
+            self._starts = self._ends = _Endpoints(np.zeros(0, dtype=np.int64), np.zeros(0), 1)
+            return
+
+        self.origin = starts.min()
+        start_off = ((starts - self.origin).dt.days).to_numpy(dtype=np.int64)
+        end_off = ((ends - self.origin).dt.days).to_numpy(dtype=np.int64)
+        self.n_days = int(end_off.max()) + 1
+
+        # Taxa diária: distribui o valor do afastamento ao longo dos dias do intervalo
+        length = end_off - start_off + 1
+        if value_col in df.columns:
+            values = pd.to_numeric(df.loc[valid, value_col], errors='coerce').fillna(0).to_numpy(dtype=float)
+        else:
+            values = length.astype(float)
+        rate = values / length
+
+        if len(self.group_cols) > 1:
+            codes, uniques = pd.MultiIndex.from_frame(keys).factorize()
+            self.groups = pd.MultiIndex.from_tuples(uniques, names=self.group_cols)
+        else:
+            codes, uniques = pd.factorize(keys[self.group_cols[0]])
+            self.groups = pd.Index(uniques, name=self.group_cols[0])
+
+        # +taxa a partir do início, -taxa a partir do dia seguinte ao fim
+        span = self.n_days + 1
+        codes = codes.astype(np.int64)
+        self._starts = _Endpoints(codes * span + start_off, rate, span)
+        self._ends = _Endpoints(codes * span + end_off + 1, rate, span)
+
+    def _cum(self, days):
+        """Dias perdidos acumulados antes de cada dia (posições relativas), por grupo."""
+        codes = np.arange(len(self.groups), dtype=np.int64)
+        return self._starts.before(codes, days) - self._ends.before(codes, days)
+
+    def _offsets(self, start, end):
+        """Converte uma janela de datas (inclusiva) em posições recortadas do índice."""
+        n_days = self.n_days
+        lo = (pd.Timestamp(start).normalize() - self.origin).days
+        hi = (pd.Timestamp(end).normalize() - self.origin).days + 1
+        return min(max(lo, 0), n_days), min(max(hi, 0), n_days)
+
+    def by_group(self, start, end):
+        """Dias perdidos dentro da janela [start, end] por grupo."""
+        lo, hi = self._offsets(start, end)
+        hi = max(hi, lo)
+        return pd.Series(self._cum(hi) - self._cum(lo), index=self.groups, name='Dias Perdidos')
+
+    def total(self, start, end, companies=None):
+        """Dias perdidos na janela, opcionalmente restritos a um conjunto de empresas."""
+        per_group = self.by_group(start, end)
+        if companies is not None:
+            per_group = per_group[self.groups.get_level_values(self.group_cols[0]).isin(companies)]
+        return float(per_group.sum())
+
+    def monthly(self, start, end):
+        """Dias perdidos por mês e por grupo dentro da janela [start, end]."""
+        lo, hi = self._offsets(start, end)
+        if hi <= lo or len(self.groups) == 0:
+            empty = {col: pd.Series(dtype=object) for col in self.group_cols}
+            empty.update({'Mês': pd.Series(dtype='datetime64[ns]'), 'Dias Perdidos': pd.Series(dtype=float)})
+            return pd.DataFrame(empty)
+
+        # Limites de mês dentro da janela, em posições do índice
+        first = self.origin + pd.Timedelta(days=lo)
+        last = self.origin + pd.Timedelta(days=hi - 1)
+        months = pd.period_range(first, last, freq='M')
+        bounds = [(m.start_time - self.origin).days for m in months[1:]]
+        edges = np.array([lo] + bounds + [hi])
+
+        per_month = np.diff(self._cum(edges), axis=1)
+        result = pd.DataFrame(per_month, index=self.groups, columns=months.to_timestamp()).stack()
+        result.index.names = self.group_cols + ['Mês']
+        return result.rename('Dias Perdidos').reset_index()
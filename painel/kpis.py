@@ -0,0 +1,273 @@
+"""KPIs e insights de saúde ocupacional.
+
+``calculate_kpis`` e ``generate_health_insights`` calculam os indicadores de
+uma seleção de empresas (usados pelo dashboard e pelos relatórios em lote).
+``company_kpis`` calcula os mesmos indicadores para todas as empresas de uma
+vez: cada base é filtrada pela janela uma única vez e agregada com um
+``groupby('Empresa')``; dias perdidos, ASOs e funcionários distintos vêm dos índices
+pré-calculados. O resultado é uma tabela com uma linha por
+empresa e uma coluna por KPI, base para comparações e rankings.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from painel.dados import absences
+
+# Colunas da tabela, na mesma nomenclatura das chaves de ``calculate_kpis``
+KPI_COLUMNS = [
+    'total_funcionarios', 'funcionarios_afastados', 'total_afastamentos', 'dias_perdidos', 'media_dias_afastamento', 'taxa_absenteismo',
+    'total_exames', 'exames_alterados', 'exames_ocupacionais_alterados', 'taxa_exames_alterados', 'taxa_ocupacionais_alterados',
+    'total_asos', 'asos_vencidos', 'asos_pendentes', 'asos_a_vencer', 'asos_validos', 'taxa_asos_vencidos',
+]
+
+# Dias úteis por mês usados na taxa de absenteísmo
+WORKDAYS_PER_MONTH = 22
+
+
+def _in_window(df, date_col, start, end):
+    """Linhas com data dentro da janela [start, end]."""
+    return df[(df[date_col] >= start) & (df[date_col] <= end)]
+
+
+def _rate(numerator, denominator):
+    """Percentual vetorizado (0 quando o denominador é zero)."""
+    return (numerator / denominator.where(denominator > 0) * 100).fillna(0)
+
+
+def _absence_kpis(abs_df, start, end, days_filter, days_index, distinct_index):
+    if abs_df.empty:
+        return pd.DataFrame()
+    window = _in_window(abs_df, 'Início', start, end)
+    grouped = window.groupby('Empresa')['Dias Perdidos']
+    if distinct_index is not None:
+        # Funcionários distintos pela união dos conjuntos (Empresa, dia), sem varrer os nomes
+        employees, affected = distinct_index.by_group(), distinct_index.by_group(start, end)
+    else:
+        employees = abs_df.groupby('Empresa')['Funcionário'].nunique()
+        affected = window.groupby('Empresa')['Funcionário'].nunique()
+    table = pd.DataFrame({
+        'total_funcionarios': employees,
+        'funcionarios_afastados': affected,
+        'total_afastamentos': grouped.size(),
+        'media_dias_afastamento': grouped.mean(),
+    })
+    if days_index is not None:
+        # Dias perdidos recortados à janela, incluindo afastamentos iniciados antes dela
+        by_group = days_index.by_group(start, end)
+        table['dias_perdidos'] = by_group.groupby(level='Empresa').sum()
+    else:
+        table['dias_perdidos'] = grouped.sum()
+    table = table.fillna({'funcionarios_afastados': 0, 'total_afastamentos': 0, 'media_dias_afastamento': 0, 'dias_perdidos': 0})
+    workdays = days_filter * WORKDAYS_PER_MONTH / 30
+    table['taxa_absenteismo'] = _rate(table['dias_perdidos'], table['total_funcionarios'] * workdays)
+    return table
+
+
+def _exam_kpis(exam_df, start, end):
+    if exam_df.empty:
+        return pd.DataFrame()
+    window = _in_window(exam_df, 'Data do Exame', start, end)
+    flags = pd.DataFrame({
+        'Empresa': window['Empresa'],
+        'exames_alterados': window['Alterados'].eq('Sim') if 'Alterados' in window.columns else False,
+        'exames_ocupacionais_alterados': (window['Alterados Ocupacionais'].eq('Sim')
+                                          if 'Alterados Ocupacionais' in window.columns else False),
+    })
+    table = flags.groupby('Empresa').agg(total_exames=('Empresa', 'size'),
+                                         exames_alterados=('exames_alterados', 'sum'),
+                                         exames_ocupacionais_alterados=('exames_ocupacionais_alterados', 'sum'))
+    table['taxa_exames_alterados'] = _rate(table['exames_alterados'], table['total_exames'])
+    table['taxa_ocupacionais_alterados'] = _rate(table['exames_ocupacionais_alterados'], table['total_exames'])
+    return table
+
+
+def _aso_kpis(aso_df, aso_index, aso_horizon, today):
+    if aso_df.empty:
+        return pd.DataFrame()
+    if aso_index is not None:
+        counts = aso_index.counts_by_group(aso_horizon, today).groupby(level='Empresa').sum()
+        table = counts.rename(columns={'total': 'total_asos', 'pendentes': 'asos_pendentes', 'vencidos': 'asos_vencidos',
+                                       'a_vencer': 'asos_a_vencer', 'validos': 'asos_validos'})
+    else:
+        status = aso_df['Status'] if 'Status' in aso_df.columns else pd.Series(np.nan, index=aso_df.index)
+        flags = pd.DataFrame({'Empresa': aso_df['Empresa'],
+                              'asos_vencidos': status.eq('Vencido'), 'asos_pendentes': status.eq('Pendente')})
+        table = flags.groupby('Empresa').agg(total_asos=('Empresa', 'size'),
+                                             asos_vencidos=('asos_vencidos', 'sum'),
+                                             asos_pendentes=('asos_pendentes', 'sum'))
+    table['taxa_asos_vencidos'] = _rate(table['asos_vencidos'], table['total_asos'])
+    return table
+
+
+def company_kpis(data, days_filter, days_index=None, aso_index=None, aso_horizon=30, today=None, distinct_index=None):
+    """Tabela de KPIs (uma linha por empresa) para a janela dos últimos ``days_filter`` dias."""
+    end = pd.Timestamp(today) if today is not None else pd.Timestamp(datetime.now())
+    start = end - timedelta(days=days_filter)
+
+    parts = [
+        _absence_kpis(absences(data), start, end, days_filter, days_index, distinct_index),
+        _exam_kpis(data.get('exames_alterados', pd.DataFrame()), start, end),
+        _aso_kpis(data.get('aso_validos', pd.DataFrame()), aso_index, aso_horizon, end),
+    ]
+    parts = [part for part in parts if not part.empty]
+    table = pd.concat(parts, axis=1) if parts else pd.DataFrame()
+    table = table.reindex(columns=KPI_COLUMNS).fillna(0)
+    counts = [col for col in KPI_COLUMNS if not col.startswith(('taxa_', 'media_', 'dias_'))]
+    table[counts] = table[counts].astype(int)
+    table.index.name = 'Empresa'
+    return table.sort_index()
+
+
+def worst_companies(table, kpi, n=10, ascending=False):
+    """As ``n`` empresas com os piores valores de um KPI (maiores, por padrão)."""
+    if ascending:
+        return table.nsmallest(n, kpi)
+    return table.nlargest(n, kpi)
+
+
+def filter_by_date_range(df, date_col, days):
+    """Filtra DataFrame por intervalo de dias"""
+    if df.empty or date_col not in df.columns:
+        return df
+    
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    
+    # Filtrar apenas registros válidos
+    df_filtered = df[df[date_col].notna()].copy()
+    mask = (df_filtered[date_col] >= start_date) & (df_filtered[date_col] <= end_date)
+    return df_filtered[mask]
+
+
+def calculate_kpis(data, selected_companies, days_filter, days_index=None, aso_index=None, aso_horizon=30,
+                   distinct_index=None):
+    """Calcula KPIs principais baseados nos dados reais"""
+    kpis = {}
+    companies = selected_companies if selected_companies and 'Todas' not in selected_companies else None
+    
+    # Dados de absenteísmo
+    abs_df = absences(data)
+    
+    if not abs_df.empty:
+        # Filtrar por empresa
+        if selected_companies and 'Todas' not in selected_companies:
+            abs_df = abs_df[abs_df['Empresa'].isin(selected_companies)]
+        
+        # Filtrar por período
+        abs_df_filtered = filter_by_date_range(abs_df, 'Início', days_filter)
+        
+        # KPIs de Absenteísmo
+        if distinct_index is not None:
+            # Funcionários distintos a partir dos conjuntos por (Empresa, dia) pré-calculados
+            end_date = datetime.now()
+            kpis['total_funcionarios'] = distinct_index.count(companies)
+            kpis['funcionarios_afastados'] = distinct_index.count(companies, end_date - timedelta(days=days_filter), end_date)
+        else:
+            kpis['total_funcionarios'] = abs_df['Funcionário'].nunique() if 'Funcionário' in abs_df.columns else 0
+            kpis['funcionarios_afastados'] = abs_df_filtered['Funcionário'].nunique() if 'Funcionário' in abs_df_filtered.columns else 0
+        kpis['total_afastamentos'] = len(abs_df_filtered)
+        if days_index is not None:
+            # Dias perdidos recortados à janela, incluindo afastamentos iniciados antes dela
+            end_date = datetime.now()
+            kpis['dias_perdidos'] = days_index.total(end_date - timedelta(days=days_filter), end_date, companies)
+        else:
+            kpis['dias_perdidos'] = abs_df_filtered['Dias Perdidos'].sum() if 'Dias Perdidos' in abs_df_filtered.columns else 0
+        kpis['media_dias_afastamento'] = abs_df_filtered['Dias Perdidos'].mean() if 'Dias Perdidos' in abs_df_filtered.columns and len(abs_df_filtered) > 0 else 0
+        
+        # Taxa de absenteísmo (%)
+        if kpis['total_funcionarios'] > 0:
+            # Assumindo 22 dias úteis por mês
+            dias_uteis_periodo = (days_filter * 22) / 30
+            kpis['taxa_absenteismo'] = (kpis['dias_perdidos'] / (kpis['total_funcionarios'] * dias_uteis_periodo)) * 100
+        else:
+            kpis['taxa_absenteismo'] = 0
+    
+    # Dados de exames
+    exam_df = data['exames_alterados']
+    if not exam_df.empty:
+        if selected_companies and 'Todas' not in selected_companies:
+            exam_df = exam_df[exam_df['Empresa'].isin(selected_companies)]
+        
+        exam_df_filtered = filter_by_date_range(exam_df, 'Data do Exame', days_filter)
+        
+        kpis['total_exames'] = len(exam_df_filtered)
+        kpis['exames_alterados'] = len(exam_df_filtered[exam_df_filtered['Alterados'] == 'Sim']) if 'Alterados' in exam_df_filtered.columns else 0
+        kpis['exames_ocupacionais_alterados'] = len(exam_df_filtered[exam_df_filtered['Alterados Ocupacionais'] == 'Sim']) if 'Alterados Ocupacionais' in exam_df_filtered.columns else 0
+        
+        # Taxas
+        kpis['taxa_exames_alterados'] = (kpis['exames_alterados'] / kpis['total_exames'] * 100) if kpis['total_exames'] > 0 else 0
+        kpis['taxa_ocupacionais_alterados'] = (kpis['exames_ocupacionais_alterados'] / kpis['total_exames'] * 100) if kpis['total_exames'] > 0 else 0
+    
+    # Dados de ASO
+    aso_df = data['aso_validos']
+    if not aso_df.empty:
+        if selected_companies and 'Todas' not in selected_companies:
+            aso_df = aso_df[aso_df['Empresa'].isin(selected_companies)]
+        
+        if aso_index is not None:
+            # Contagens por validade via busca binária no índice de vencimentos
+            aso_counts = aso_index.counts(aso_horizon, companies=companies)
+            kpis['total_asos'] = aso_counts['total']
+            kpis['asos_vencidos'] = aso_counts['vencidos']
+            kpis['asos_pendentes'] = aso_counts['pendentes']
+            kpis['asos_a_vencer'] = aso_counts['a_vencer']
+            kpis['asos_validos'] = aso_counts['validos']
+        else:
+            kpis['total_asos'] = len(aso_df)
+            kpis['asos_vencidos'] = len(aso_df[aso_df['Status'] == 'Vencido']) if 'Status' in aso_df.columns else 0
+            kpis['asos_pendentes'] = len(aso_df[aso_df['Status'] == 'Pendente']) if 'Status' in aso_df.columns else 0
+        
+        # Taxa de ASOs vencidos
+        kpis['taxa_asos_vencidos'] = (kpis['asos_vencidos'] / kpis['total_asos'] * 100) if kpis['total_asos'] > 0 else 0
+    
+    return kpis
+
+
+def generate_health_insights(data, kpis):
+    """Gera insights inteligentes de saúde ocupacional"""
+    insights = []
+    warnings = []
+    critical = []
+    
+    # Análise de Absenteísmo
+    if kpis.get('taxa_absenteismo', 0) > 5:
+        critical.append(f"🚨 Taxa de absenteísmo crítica: {kpis['taxa_absenteismo']:.1f}% (Meta: <3%)")
+    elif kpis.get('taxa_absenteismo', 0) > 3:
+        warnings.append(f"⚠️ Taxa de absenteísmo elevada: {kpis['taxa_absenteismo']:.1f}% (Meta: <3%)")
+    else:
+        insights.append(f"✅ Taxa de absenteísmo controlada: {kpis.get('taxa_absenteismo', 0):.1f}%")
+    
+    # Análise de duração de afastamentos
+    if kpis.get('media_dias_afastamento', 0) > 20:
+        critical.append(f"🚨 Duração média de afastamentos crítica: {kpis['media_dias_afastamento']:.1f} dias")
+    elif kpis.get('media_dias_afastamento', 0) > 10:
+        warnings.append(f"⚠️ Duração média de afastamentos elevada: {kpis['media_dias_afastamento']:.1f} dias")
+    
+    # Análise de exames alterados
+    if kpis.get('taxa_ocupacionais_alterados', 0) > 10:
+        critical.append(f"🚨 Taxa de exames ocupacionais alterados: {kpis['taxa_ocupacionais_alterados']:.1f}%")
+    elif kpis.get('taxa_ocupacionais_alterados', 0) > 5:
+        warnings.append(f"⚠️ Taxa de exames ocupacionais alterados: {kpis['taxa_ocupacionais_alterados']:.1f}%")
+    
+    # Análise de ASOs
+    if kpis.get('taxa_asos_vencidos', 0) > 20:
+        critical.append(f"🚨 Taxa de ASOs vencidos crítica: {kpis['taxa_asos_vencidos']:.1f}%")
+    elif kpis.get('taxa_asos_vencidos', 0) > 10:
+        warnings.append(f"⚠️ Taxa de ASOs vencidos: {kpis['taxa_asos_vencidos']:.1f}%")
+    
+    # Análise dos principais diagnósticos
+    abs_df = absences(data)
+    if not abs_df.empty and 'Descrição do Cid Principal' in abs_df.columns:
+        # Alertas específicos por tipo de diagnóstico (marcados na carga dos dados)
+        mental_cases = int(abs_df['Saúde Mental'].sum())
+        musculo_cases = int(abs_df['Musculoesquelético'].sum())
+        
+        if mental_cases / len(abs_df) > 0.3:
+            warnings.append(f"⚠️ Alto índice de problemas de saúde mental: {mental_cases} casos ({mental_cases/len(abs_df)*100:.1f}%)")
+        
+        if musculo_cases / len(abs_df) > 0.4:
+            warnings.append(f"⚠️ Alto índice de problemas musculoesqueléticos: {musculo_cases} casos ({musculo_cases/len(abs_df)*100:.1f}%)")
+    
+    return insights, warnings, critical
@@ -0,0 +1,156 @@
+"""Orçamento de tamanho dos dados enviados ao navegador pelos gráficos.
+
+Plotly e Altair embutem os dados na especificação do gráfico. ``ChartBudget``
+mede o tamanho serializado (JSON) de cada gráfico de uma execução e, para os
+gráficos alimentados por tabelas, reduz os dados no servidor antes de montar o
+gráfico quando passam do orçamento:
+
+- categorias: mantém as N maiores pelo valor e junta o resto em "Outros";
+- séries temporais: agrega em períodos maiores (semana, mês, trimestre, ano),
+  somando contagens ou, em séries acumuladas e de nível, mantendo o último
+  valor (ou a média) de cada período;
+- em último caso, corta no limite de linhas do Altair (5000).
+
+O orçamento por gráfico pode ser ajustado pela variável de ambiente
+``PAINEL_CHART_BUDGET_KB``. ``summary`` e ``table`` trazem os bytes medidos para
+acompanhar o custo de transferência.
+"""
+import logging
+import os
+
+import pandas as pd
+
+CHART_BUDGET_KB = float(os.environ.get('PAINEL_CHART_BUDGET_KB', 100))
+ALTAIR_MAX_ROWS = 5000
+OTHERS_LABEL = 'Outros'
+# Períodos usados para agregar séries temporais, do mais fino ao mais grosso
+TIME_BINS = (('W-SUN', 'semanal'), ('M', 'mensal'), ('Q', 'trimestral'), ('Y', 'anual'))
+# Agregação dos valores dentro de cada período: soma (contagens), último valor (acumulados, níveis) ou média
+AGGREGATIONS = {'sum': 'soma', 'last': 'último valor', 'mean': 'média'}
+
+logger = logging.getLogger('painel.orcamento')
+
+
+def frame_size(df):
+    """Bytes dos dados de um gráfico serializados como registros JSON (como no Vega-Lite e no Plotly)."""
+    return len(df.to_json(orient='records', date_format='iso', force_ascii=False).encode('utf-8'))
+
+
+def figure_size(fig):
+    """Bytes da especificação serializada de uma figura Plotly."""
+    return len(fig.to_json().encode('utf-8'))
+
+
+def _points(trace):
+    for attr in ('x', 'values', 'y'):
+        values = getattr(trace, attr, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def top_categories(df, category, value, n):
+    """Mantém as ``n`` categorias com maior ``value`` total e soma as demais em "Outros"."""
+    totals = df.groupby(category, dropna=False)[value].sum().sort_values(ascending=False)
+    keep = totals.index[:n]
+    if len(keep) == len(totals):
+        return df
+    others = df[~df[category].isin(keep)]
+    group_cols = [col for col in df.columns if col not in (category, value)]
+    rest = (others.groupby(group_cols, dropna=False)[value].sum().reset_index() if group_cols
+            else pd.DataFrame({value: [others[value].sum()]}))
+    rest[category] = OTHERS_LABEL
+    return pd.concat([df[df[category].isin(keep)], rest[df.columns]], ignore_index=True)
+
+
+def bin_time(df, time_col, value, freq, how='sum'):
+    """Agrega ``value`` por período ``freq`` (início do período), mantendo as demais colunas como grupos.
+
+    ``how`` é 'sum' (contagens), 'last' (séries acumuladas ou de nível: valor no
+    fim do período) ou 'mean'.
+    """
+    if how not in AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {how}; opções: {', '.join(AGGREGATIONS)}")
+    group_cols = [col for col in df.columns if col not in (time_col, value)]
+    # Ordem cronológica dentro de cada período, para 'last' pegar o valor mais recente
+    df = df.sort_values(time_col, kind='stable')
+    periods = pd.to_datetime(df[time_col]).dt.to_period(freq).dt.start_time
+    grouped = df.assign(**{time_col: periods}).groupby([time_col] + group_cols, dropna=False)[value]
+    return grouped.agg(how).reset_index()
+
+
+class ChartBudget:
+    """Mede e limita os dados dos gráficos de uma execução (bytes por gráfico)."""
+
+    def __init__(self, budget_kb=CHART_BUDGET_KB, max_rows=ALTAIR_MAX_ROWS):
+        self.budget = int(budget_kb * 1024)
+        self.max_rows = max_rows
+        self.records = []
+
+    def _record(self, name, original, final, rows_before, rows_after, reduction=None):
+        self.records.append({'Gráfico': name, 'Linhas': rows_after, 'Bytes': final, 'Linhas originais': rows_before,
+                             'Bytes originais': original, 'Redução': reduction or '-'})
+        if final > self.budget:
+            logger.warning("Gráfico '%s' com %.0f KB acima do orçamento de %.0f KB", name, final / 1024, self.budget / 1024)
+
+    def fit(self, name, df, value, category=None, time=None, how='sum'):
+        """Dados de ``df`` dentro do orçamento: top-N em ``category`` ou agregação temporal em ``time``.
+
+        ``how`` é a agregação no tempo (ver ``bin_time``): 'last' para séries acumuladas.
+        """
+        size = original = frame_size(df)
+        rows = len(df)
+        reductions = []
+        if time is not None and size > self.budget:
+            source = df
+            for freq, label in TIME_BINS:
+                # Sempre a partir dos dados originais, para os períodos não se deslocarem
+                df = bin_time(source, time, value, freq, how)
+                size = frame_size(df)
+                if size <= self.budget:
+                    break
+            reductions.append(f'agregado {label}' + (f' ({AGGREGATIONS[how]})' if how != 'sum' else ''))
+        if category is not None and (size > self.budget or len(df) > self.max_rows):
+            source = df
+            n = n_categories = source[category].nunique(dropna=False)
+            while n > 1 and (size > self.budget or len(df) > self.max_rows):
+                # Categorias que cabem no orçamento, pelo tamanho médio das linhas de cada uma
+                n = max(1, min(n - 1, int(n * min(self.budget / size, self.max_rows / len(df)))))
+                df = top_categories(source, category, value, n)
+                size = frame_size(df)
+            if n < n_categories:
+                reductions.append(f'top {n} + {OTHERS_LABEL}')
+        if len(df) > self.max_rows:
+            df = df.nlargest(self.max_rows, value)
+            size = frame_size(df)
+            reductions.append(f'{self.max_rows} maiores')
+        self._record(name, original, size, rows, len(df), ', '.join(reductions))
+        return df
+
+    def measure(self, name, chart):
+        """Registra o tamanho de um gráfico já montado (figura Plotly ou tabela) e o devolve."""
+        if isinstance(chart, pd.DataFrame):
+            size, rows = frame_size(chart), len(chart)
+        else:
+            size, rows = figure_size(chart), sum(_points(trace) for trace in chart.data)
+        self._record(name, size, size, rows, rows)
+        return chart
+
+    @property
+    def total(self):
+        return sum(record['Bytes'] for record in self.records)
+
+    def table(self):
+        """Bytes e linhas por gráfico, antes e depois da redução."""
+        return pd.DataFrame(self.records, columns=['Gráfico', 'Linhas', 'Bytes', 'Linhas originais',
+                                                   'Bytes originais', 'Redução'])
+
+    def summary(self):
+        """Texto curto com o total enviado, o maior gráfico e quantos foram reduzidos."""
+        if not self.records:
+            return "📦 Nenhum gráfico nesta página"
+        largest = max(self.records, key=lambda record: record['Bytes'])
+        reduced = sum(record['Redução'] != '-' for record in self.records)
+        return (f"📦 {len(self.records)} gráfico(s) com {self.total / 1024:.1f} KB de dados · maior: "
+                f"{largest['Gráfico']} ({largest['Bytes'] / 1024:.1f} KB) · orçamento {self.budget / 1024:g} KB por gráfico"
+                + (f" · {reduced} reduzido(s) no servidor" if reduced else ""))
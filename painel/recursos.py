@@ -0,0 +1,56 @@
+"""Recursos estáticos (logos) servidos a partir de cópia local.
+
+Recursos remotos são baixados uma única vez para ``.cache/assets`` (na raiz do
+repositório) e, a partir daí, lidos do disco; sem rede, a função devolve ``None`` rapidamente e o
+chamador usa o texto alternativo em vez de travar a renderização.
+"""
+import hashlib
+import os
+import urllib.request
+from urllib.parse import urlparse
+
+from painel.dados import CACHE_DIR, ROOT_DIR
+
+ASSET_CACHE_DIR = os.path.join(CACHE_DIR, 'assets')
+
+
+def load_asset(source, cache_dir=ASSET_CACHE_DIR, timeout=2.0):
+    """Conteúdo (bytes) de um arquivo local (relativo à raiz do repositório) ou URL, com cópia local para URLs."""
+    if not source.startswith(('http://', 'https://')):
+        source = os.path.join(ROOT_DIR, source)
+        if not os.path.exists(source):
+            return None
+        with open(source, 'rb') as f:
+            return f.read()
+
+    extension = os.path.splitext(urlparse(source).path)[1]
+    path = os.path.join(cache_dir, hashlib.sha1(source.encode()).hexdigest()[:12] + extension)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    try:
+        with urllib.request.urlopen(source, timeout=timeout) as response:
+            content = response.read()
+    except Exception:
+        return None
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return content
+
+
+def image_source(content):
+    """Converte o conteúdo para o formato aceito por ``st.image`` (SVG como texto)."""
+    if content is None:
+        return None
+    head = content[:256].lstrip()
+    if head.startswith(b'<svg') or head.startswith(b'<?xml'):
+        return content.decode('utf-8', errors='replace')
+    return content
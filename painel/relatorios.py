@@ -0,0 +1,224 @@
+"""Relatórios HTML estáticos por empresa e período, gerados em lote e em paralelo.
+
+Os dados são carregados uma única vez no processo principal (cache de
+``painel.dados``) e compartilhados com os processos de trabalho: por herança
+de memória (``fork``) quando disponível ou, nos demais sistemas, uma cópia por
+processo no inicializador. Cada relatório reutiliza ``calculate_kpis``,
+``generate_health_insights`` e os gráficos de ``painel.graficos``.
+
+Uso: ``python -m painel.relatorios --saida relatorios --periodos 30 90 365``
+"""
+import argparse
+import hashlib
+import html
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from painel import agregados, graficos
+from painel.atualizacao import files_signature
+from painel.dados import absences, build_indexes, dataset_paths, load_datasets
+from painel.kpis import calculate_kpis, filter_by_date_range, generate_health_insights
+
+DEFAULT_PERIODS = (30, 90, 365)
+DEFAULT_OUTPUT = 'relatorios'
+
+# Dados compartilhados com os processos de trabalho (definidos antes do fork ou no inicializador)
+_shared = {}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="plotly.min.js"></script>
+<style>
+  body {{ font-family: sans-serif; margin: 2rem; color: #222; }}
+  h1 {{ color: #2E8B57; }}
+  .cards {{ display: flex; gap: 1rem; flex-wrap: wrap; }}
+  .metric-card {{ background: linear-gradient(135deg, #2E8B57, #32CD32); color: white; border-radius: 15px;
+                  padding: 1rem 1.5rem; min-width: 150px; text-align: center; }}
+  .metric-number {{ font-size: 2rem; font-weight: bold; margin: 0; }}
+  .metric-label {{ margin: 0; opacity: 0.9; }}
+  .critical-alert {{ background: #e74c3c; color: white; padding: 0.6rem 1rem; border-radius: 8px; margin: 0.4rem 0; }}
+  .warning-alert {{ background: #f39c12; color: white; padding: 0.6rem 1rem; border-radius: 8px; margin: 0.4rem 0; }}
+  .success-alert {{ background: #27ae60; color: white; padding: 0.6rem 1rem; border-radius: 8px; margin: 0.4rem 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Últimos {days} dias · gerado em {generated:%d/%m/%Y %H:%M} · dados v{version}</p>
+<div class="cards">{cards}</div>
+<h2>Alertas e Insights</h2>
+{alerts}
+<h2>Análises Detalhadas</h2>
+{charts}
+</body>
+</html>
+"""
+
+CARDS = (
+    ('total_funcionarios', 'Funcionários', '{:.0f}'),
+    ('total_afastamentos', 'Afastamentos', '{:.0f}'),
+    ('taxa_absenteismo', 'Taxa Absenteísmo', '{:.1f}%'),
+    ('dias_perdidos', 'Dias Perdidos', '{:.0f}'),
+    ('asos_vencidos', 'ASOs Vencidos', '{:.0f}'),
+    ('taxa_exames_alterados', 'Exames Alterados', '{:.1f}%'),
+)
+
+
+def slugify(text):
+    """Nome de arquivo seguro a partir do nome da empresa."""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'empresa'
+
+
+def report_slugs(companies):
+    """Nome de arquivo de cada empresa; nomes que diferem só em caixa, acentos ou pontuação recebem um sufixo.
+
+    O sufixo é um hash curto do nome original (o mesmo em qualquer lote), em vez
+    de um contador que dependeria da ordem das empresas.
+    """
+    slugs = {company: slugify(company) for company in dict.fromkeys(companies)}
+    counts = {}
+    for slug in slugs.values():
+        counts[slug] = counts.get(slug, 0) + 1
+    return {company: slug if counts[slug] == 1 else f"{slug}-{hashlib.sha1(str(company).encode('utf-8')).hexdigest()[:8]}"
+            for company, slug in slugs.items()}
+
+
+def report_charts(data, indexes, company, days, aso_horizon, kpis):
+    """Figuras do relatório de uma empresa, na ordem do dashboard."""
+    companies = [company]
+    abs_df = absences(data)
+    abs_df = abs_df[abs_df['Empresa'].isin(companies)] if not abs_df.empty else abs_df
+    abs_window = filter_by_date_range(abs_df, 'Início', days)
+    exam_df = data['exames_alterados']
+    exam_df = exam_df[exam_df['Empresa'].isin(companies)] if not exam_df.empty else exam_df
+    exam_window = filter_by_date_range(exam_df, 'Data do Exame', days)
+    aso_df = data['aso_validos']
+    aso_df = aso_df[aso_df['Empresa'].isin(companies)] if not aso_df.empty else aso_df
+
+    figures = [graficos.diagnoses_chart(abs_window), graficos.specialties_chart(abs_window)]
+    if not abs_window.empty:
+        end_date = datetime.now()
+        monthly = agregados.monthly_absences(abs_window, indexes['days_lost'], end_date - timedelta(days=days), end_date, companies)
+        figures.append(graficos.monthly_absences_chart(monthly))
+    figures += [graficos.exam_status_chart(exam_window), graficos.exam_types_chart(exam_window)]
+    if not aso_df.empty:
+        figures += [graficos.aso_status_chart(kpis, aso_horizon), graficos.aso_units_chart(aso_df),
+                    graficos.expiry_calendar_chart(indexes['aso_expiry'].calendar(weeks=12, companies=companies))]
+    return [fig for fig in figures if fig is not None]
+
+
+def render_report(data, indexes, company, days, aso_horizon=30, version=''):
+    """HTML completo do relatório de uma empresa num período."""
+    kpis = calculate_kpis(data, [company], days, indexes['days_lost'], indexes['aso_expiry'], aso_horizon,
+                          indexes.get('distinct_employees'))
+    # Os alertas de diagnóstico usam a base de afastamentos: só as linhas da empresa do relatório
+    company_data = dict(data, **{name: data[name][data[name]['Empresa'] == company]
+                                 for name in ('absenteismo', 'taxa_absenteismo') if 'Empresa' in data[name].columns})
+    insights, warnings, critical = generate_health_insights(company_data, kpis)
+
+    cards = ''.join(
+        f'<div class="metric-card"><p class="metric-number">{fmt.format(kpis.get(key, 0))}</p>'
+        f'<p class="metric-label">{label}</p></div>'
+        for key, label, fmt in CARDS
+    )
+    alerts = ''.join(
+        f'<div class="{css}">{html.escape(message)}</div>'
+        for css, messages in (('critical-alert', critical), ('warning-alert', warnings), ('success-alert', insights))
+        for message in messages
+    )
+    charts = ''.join(fig.to_html(full_html=False, include_plotlyjs=False)
+                     for fig in report_charts(data, indexes, company, days, aso_horizon, kpis))
+    return PAGE_TEMPLATE.format(title=html.escape(f'Saúde Ocupacional - {company}'), days=days,
+                                generated=datetime.now(), version=version, cards=cards,
+                                alerts=alerts or '<p>Sem alertas no período.</p>', charts=charts)
+
+
+def _init_worker(shared):
+    """Inicializador dos processos quando não há fork (recebe os dados uma vez por processo)."""
+    if shared is not None:
+        _shared.update(shared)
+
+
+def _render_job(job):
+    company, days, path = job
+    page = render_report(_shared['data'], _shared['indexes'], company, days,
+                         _shared['aso_horizon'], _shared['version'])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+
+def _write_index(output_dir, jobs):
+    """Página inicial com links para todos os relatórios."""
+    rows = ''.join(
+        f'<li><a href="{html.escape(os.path.basename(path))}">{html.escape(company)} - últimos {days} dias</a></li>'
+        for company, days, path in jobs
+    )
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>Relatórios</title></head>'
+                f'<body><h1>Relatórios de Saúde Ocupacional</h1><ul>{rows}</ul></body></html>')
+
+
+def render_all(output_dir=DEFAULT_OUTPUT, periods=DEFAULT_PERIODS, companies=None, workers=None, aso_horizon=30):
+    """Gera os relatórios de todas as empresas x períodos. Retorna (quantidade, segundos)."""
+    from plotly.offline import get_plotlyjs
+
+    errors = []
+    data = load_datasets(errors)
+    for error in errors:
+        print(error)
+    indexes = build_indexes(data)
+    if not companies:
+        frames = (absences(data), data['exames_alterados'], data['aso_validos'])
+        companies = sorted({company for df in frames if 'Empresa' in df.columns for company in df['Empresa'].dropna().unique()})
+
+    os.makedirs(output_dir, exist_ok=True)
+    # plotly.js gravado uma única vez e referenciado por todos os relatórios
+    with open(os.path.join(output_dir, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+    slugs = report_slugs(companies)
+    jobs = [(company, days, os.path.join(output_dir, f'{slugs[company]}-{days}d.html'))
+            for company in companies for days in periods]
+    shared = {'data': data, 'indexes': indexes, 'aso_horizon': aso_horizon,
+              'version': hashlib.sha1(repr(files_signature(dataset_paths())).encode()).hexdigest()[:8]}
+
+    start = time.perf_counter()
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Os processos herdam os dados já carregados (cópia sob demanda da memória)
+        _shared.update(shared)
+        context, initargs = multiprocessing.get_context('fork'), (None,)
+    else:
+        context, initargs = multiprocessing.get_context(), (shared,)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=initargs) as pool:
+        list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    elapsed = time.perf_counter() - start
+
+    _write_index(output_dir, jobs)
+    return len(jobs), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera relatórios HTML por empresa e período.')
+    parser.add_argument('--saida', default=DEFAULT_OUTPUT, help='pasta de destino dos relatórios')
+    parser.add_argument('--periodos', type=int, nargs='+', default=list(DEFAULT_PERIODS), help='períodos em dias')
+    parser.add_argument('--empresas', nargs='+', help='empresas (padrão: todas)')
+    parser.add_argument('--processos', type=int, default=None, help='processos em paralelo (padrão: núcleos)')
+    parser.add_argument('--horizonte-aso', type=int, default=30, help='horizonte de vencimento dos ASOs em dias')
+    args = parser.parse_args()
+
+    count, elapsed = render_all(args.saida, args.periodos, args.empresas, args.processos, args.horizonte_aso)
+    print(f"{count} relatório(s) em {elapsed:.1f}s ({count / elapsed:.1f} relatórios/s) em {args.saida}/")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Cache de resultados (KPIs, insights e agregações dos gráficos) por versão dos dados.
+
+Cada resultado é identificado pela versão do snapshot, pela seleção de
+empresas e pelos parâmetros da consulta, de modo que uma nova versão dos dados
+nunca serve números antigos. As entradas expiram após ``ttl`` segundos porque
+as janelas terminam no momento do cálculo. O mesmo cache atende o dashboard e
+o serviço JSON (``painel.servico``) dentro do processo.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from painel.agregados import dashboard_aggregates
+from painel.kpis import calculate_kpis, generate_health_insights
+
+
+class ResultCache:
+    """Cache LRU com expiração, seguro para várias threads."""
+
+    def __init__(self, maxsize=512, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Valor em cache para ``key`` ou resultado de ``compute()`` (guardado para as próximas chamadas)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        # Cálculo fora da trava: consultas diferentes não esperam umas pelas outras
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self.misses += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'entradas': len(self._entries), 'acertos': self.hits, 'falhas': self.misses}
+
+
+# Cache compartilhado do processo
+results = ResultCache()
+
+
+def normalize_companies(companies):
+    """Seleção de empresas como tupla ordenada (None = todas)."""
+    if not companies or 'Todas' in companies:
+        return None
+    return tuple(sorted(companies))
+
+
+def kpis_for(snapshot, companies, days_filter, aso_horizon=30):
+    """KPIs de ``calculate_kpis`` para a seleção, calculados uma vez por versão dos dados."""
+    selection = normalize_companies(companies)
+    key = ('kpis', snapshot.version, selection, days_filter, aso_horizon)
+    return results.get_or_compute(key, lambda: calculate_kpis(
+        snapshot.data, list(selection) if selection else ['Todas'], days_filter,
+        snapshot.indexes['days_lost'], snapshot.indexes['aso_expiry'], aso_horizon,
+        snapshot.indexes.get('distinct_employees')))
+
+
+def insights_for(snapshot, companies, days_filter, aso_horizon=30):
+    """(insights, avisos, críticos) de ``generate_health_insights`` para a seleção."""
+    key = ('insights', snapshot.version, normalize_companies(companies), days_filter, aso_horizon)
+    return results.get_or_compute(key, lambda: generate_health_insights(
+        snapshot.data, kpis_for(snapshot, companies, days_filter, aso_horizon)))
+
+
+def aggregates_for(snapshot, companies, days_filter, aso_horizon=30):
+    """Agregações dos gráficos do dashboard para a seleção (nome -> DataFrame)."""
+    selection = normalize_companies(companies)
+    key = ('agregados', snapshot.version, selection, days_filter, aso_horizon)
+    return results.get_or_compute(key, lambda: dashboard_aggregates(
+        snapshot.data, snapshot.indexes, list(selection) if selection else None, days_filter, aso_horizon,
+        kpis_for(snapshot, companies, days_filter, aso_horizon)))
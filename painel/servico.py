@@ -0,0 +1,223 @@
+"""Serviço HTTP/JSON local com os KPIs, insights e agregações do dashboard.
+
+Usa o mesmo armazém de dados (``painel.dados.get_store``) e o mesmo cache de
+resultados (``painel.resultados``) do dashboard. As respostas já serializadas
+também ficam em cache, então consultas periódicas com os mesmos parâmetros
+são atendidas em milissegundos. Cada resposta traz um ``ETag``; com
+``If-None-Match`` o serviço responde 304 sem corpo.
+
+Rotas (GET):
+
+- ``/empresas``: empresas disponíveis;
+- ``/kpis``: saída de ``calculate_kpis``;
+- ``/insights``: saída de ``generate_health_insights``;
+- ``/graficos``: agregações dos gráficos (``?grafico=`` escolhe uma);
+- ``/alertas``: tabela de alertas por empresa e janela;
+- ``/saude``: versão dos dados e estatísticas do cache.
+
+Parâmetros: ``empresas`` (separadas por vírgula ou repetidas), ``dias``
+(padrão 90) e ``horizonte`` (vencimento de ASO, padrão 30).
+
+Uso: ``python -m painel.servico --porta 8502``
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from painel.alertas import AlertTable
+from painel.atualizacao import LoadError
+from painel.dados import get_store
+from painel.resultados import aggregates_for, insights_for, kpis_for, normalize_companies, results
+
+DEFAULT_DAYS = 90
+DEFAULT_HORIZON = 30
+MAX_DAYS = 3650
+ROUTES = ('/empresas', '/kpis', '/insights', '/graficos', '/alertas')
+
+
+class BadRequest(ValueError):
+    """Parâmetro de consulta inválido (resposta 400)."""
+
+
+def _to_json(value):
+    """Converte tipos do pandas/numpy em tipos aceitos pelo ``json``."""
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records', date_format='iso', force_ascii=False))
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _int_param(params, name, default):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[-1])
+    except ValueError:
+        raise BadRequest(f"Parâmetro '{name}' deve ser inteiro")
+    if not 1 <= value <= MAX_DAYS:
+        raise BadRequest(f"Parâmetro '{name}' fora do intervalo 1..{MAX_DAYS}")
+    return value
+
+
+def parse_query(query):
+    """Empresas, janela (dias), horizonte de ASO e gráfico pedidos na URL."""
+    params = parse_qs(query)
+    companies = [name.strip() for value in params.get('empresas', []) for name in value.split(',') if name.strip()]
+    return {
+        'empresas': normalize_companies(companies),
+        'dias': _int_param(params, 'dias', DEFAULT_DAYS),
+        'horizonte': _int_param(params, 'horizonte', DEFAULT_HORIZON),
+        'grafico': (params.get('grafico') or [None])[-1],
+    }
+
+
+def _companies(snapshot):
+    names = set()
+    for df in snapshot.data.values():
+        if not df.empty and 'Empresa' in df.columns:
+            names.update(df['Empresa'].dropna().unique())
+    return sorted(names)
+
+
+def build_payload(route, snapshot, query):
+    """Conteúdo (antes da serialização) de uma rota."""
+    companies, days, horizon = query['empresas'], query['dias'], query['horizonte']
+    meta = {'versao': snapshot.version, 'empresas': list(companies) if companies else 'Todas',
+            'dias': days, 'horizonte': horizon}
+
+    if route == '/empresas':
+        return {'versao': snapshot.version, 'empresas': _companies(snapshot)}
+    if route == '/kpis':
+        return {**meta, 'kpis': kpis_for(snapshot, companies, days, horizon)}
+    if route == '/insights':
+        insights, warnings, critical = insights_for(snapshot, companies, days, horizon)
+        return {**meta, 'insights': insights, 'avisos': warnings, 'criticos': critical}
+    if route == '/graficos':
+        aggregates = aggregates_for(snapshot, companies, days, horizon)
+        chart = query['grafico']
+        if chart is not None:
+            if chart not in aggregates:
+                raise BadRequest(f"Gráfico '{chart}' indisponível; opções: {', '.join(aggregates) or 'nenhuma'}")
+            aggregates = {chart: aggregates[chart]}
+        return {**meta, 'graficos': aggregates}
+    if route == '/alertas':
+        alerts = AlertTable().current(snapshot.data, snapshot.indexes)
+        if companies:
+            alerts = alerts[alerts['Empresa'].isin(companies)]
+        return {'versao': snapshot.version, 'alertas': alerts}
+    raise ValueError(f"Rota desconhecida: {route}")
+
+
+class KpiRequestHandler(BaseHTTPRequestHandler):
+    """Atende as rotas JSON a partir do armazém e do cache de resultados."""
+
+    store = None
+    server_version = 'PainelKPI/1.0'
+
+    def log_message(self, format, *args):
+        # Sem log por requisição no stderr (consultas periódicas)
+        pass
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'erro': message}, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = url.path.rstrip('/') or '/'
+        try:
+            snapshot = self.store.get(timeout=60)
+        except LoadError as e:
+            return self._send_error(503, str(e))
+        if snapshot is None:
+            return self._send_error(503, 'Dados ainda não carregados')
+
+        if route == '/saude':
+            body = json.dumps({'versao': snapshot.version, 'carregado_em': snapshot.loaded_at.isoformat(),
+                               'erros': snapshot.errors, 'cache': results.stats()}, ensure_ascii=False)
+            return self._send(200, body.encode('utf-8'))
+        if route not in ROUTES:
+            return self._send_error(404, f"Rota desconhecida: {route}")
+
+        try:
+            query = parse_query(url.query)
+            key = ('json', route, snapshot.version, query['empresas'], query['dias'], query['horizonte'], query['grafico'])
+
+            def encode():
+                payload = _to_json(build_payload(route, snapshot, query))
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                return body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+            body, etag = results.get_or_compute(key, encode)
+        except BadRequest as e:
+            return self._send_error(400, str(e))
+        except Exception as e:
+            return self._send_error(500, f"Erro ao calcular {route}: {str(e)}")
+
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, etag=etag)
+        self._send(200, body, etag)
+
+
+def make_server(host='127.0.0.1', port=8502, store=None):
+    """Servidor pronto para ``serve_forever`` (porta 0 escolhe uma porta livre, útil em testes)."""
+    handler = type('KpiRequestHandler', (KpiRequestHandler,), {'store': store or get_store()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(host='127.0.0.1', port=0, store=None):
+    """Inicia o servidor numa thread; devolve (servidor, URL base). Encerrar com ``shutdown()``."""
+    server = make_server(host, port, store)
+    threading.Thread(target=server.serve_forever, name='painel-servico', daemon=True).start()
+    return server, f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço JSON com os KPIs do dashboard.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8502)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.porta)
+    print(f"Servindo KPIs em http://{args.host}:{server.server_address[1]} (Ctrl+C para encerrar)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
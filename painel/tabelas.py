@@ -0,0 +1,190 @@
+"""Tabelas detalhadas paginadas, ordenáveis e filtráveis no servidor.
+
+Cada tabela é preparada uma vez por versão dos dados, na construção do
+snapshot (fora das requisições): as linhas ficam ordenadas por (empresa, data),
+as colunas exibidas são codificadas (``pd.factorize`` ordenado) e a ordem
+global das linhas por coluna (crescente e decrescente, vazios no fim) e a ordem
+original da planilha são calculadas. A seleção de empresas e período vira
+fatias contíguas encontradas por busca binária; os filtros de texto comparam só
+os valores distintos da coluna e depois os códigos das linhas selecionadas. Uma
+página percorre a ordem pré-calculada mantendo só as linhas da seleção e para
+ao juntar ``offset + page_size`` linhas (sem ordenar a seleção); na ordem
+original sem seleção, a página é uma fatia direta. Só as linhas da página são
+materializadas com ``iloc``: o navegador recebe no máximo ``page_size`` linhas.
+"""
+import numpy as np
+import pandas as pd
+
+from painel.dados import absences
+
+# Tabela -> (base, colunas exibidas, coluna de data para o filtro de período)
+DETAIL_TABLES = {
+    'absenteismo': (None, ['Empresa', 'Funcionário', 'Início', 'Fim', 'Dias Perdidos',
+                           'Descrição do Cid Principal', 'Especialidade'], 'Início'),
+    'exames': ('exames_alterados', ['Empresa', 'Funcionário', 'Tipo', 'Data do Exame', 'Alterados',
+                                    'Alterados Ocupacionais', 'Parecer do ASO'], 'Data do Exame'),
+    # Situação atual dos ASOs: sem filtro de período, como os KPIs de ASO
+    'aso': ('aso_validos', ['Empresa', 'Nome', 'Unidade', 'Cargo', 'Data Último Exame', 'Status', 'Validade'], None),
+    'visitas': ('visitas_medicas', None, 'DATA'),
+}
+PAGE_SIZES = (25, 50, 100)
+
+# Chave de data vazia: depois de todas as datas válidas
+_NO_DATE = np.iinfo(np.int64).max
+
+
+def _codes(series):
+    """Códigos crescentes pela ordem dos valores (-1 = vazio) e valores distintos."""
+    try:
+        return pd.factorize(series, sort=True)
+    except TypeError:
+        # Colunas com tipos misturados são ordenadas pelo texto
+        return pd.factorize(series.where(series.isna(), series.astype(str)), sort=True)
+
+
+def _order(codes, tiebreak, descending=False):
+    """Posições das linhas na ordem da coluna (empates pela ordem original), com vazios sempre no fim."""
+    keys = codes.astype(np.int64)
+    keys = np.where(codes < 0, np.iinfo(np.int64).max, -keys if descending else keys)
+    order = np.lexsort((tiebreak, keys))
+    return order.astype(np.int32 if len(codes) < 2 ** 31 else np.int64)
+
+
+def _take(order, mask, count):
+    """As primeiras ``count`` posições de ``order`` marcadas em ``mask`` (varredura em blocos crescentes)."""
+    if mask is None:
+        return order[:count]
+    found, n_found, first, step = [], 0, 0, max(count, 1024)
+    while first < len(order) and n_found < count:
+        block = order[first:first + step]
+        hits = block[mask[block]]
+        found.append(hits)
+        n_found += len(hits)
+        first += step
+        # Seleções esparsas: blocos maiores a cada passo
+        step *= 2
+    return np.concatenate(found)[:count] if found else order[:0]
+
+
+class DetailTable:
+    """Linhas de uma base ordenadas por (empresa, data), com códigos e posições por coluna."""
+
+    def __init__(self, df, columns=None, date_col=None, company_col='Empresa'):
+        columns = [col for col in (columns or df.columns) if col in df.columns]
+        frame = df[columns].reset_index(drop=True)
+        self.columns = columns
+        self.date_col = date_col if date_col in frame.columns else None
+        self.company_col = company_col if company_col in frame.columns else None
+
+        if self.date_col:
+            dates = pd.to_datetime(frame[self.date_col], errors='coerce').to_numpy(dtype='datetime64[ns]')
+            date_keys = np.where(np.isnat(dates), _NO_DATE, dates.view(np.int64))
+        else:
+            date_keys = np.zeros(len(frame), dtype=np.int64)
+        if self.company_col:
+            company_codes, self.companies = _codes(frame[self.company_col])
+            # Empresa vazia depois das demais: só aparece sem filtro de empresa
+            company_codes = np.where(company_codes < 0, len(self.companies), company_codes)
+        else:
+            company_codes, self.companies = np.zeros(len(frame), dtype=np.int64), []
+
+        order = np.lexsort((date_keys, company_codes))
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self._date_keys = date_keys[order]
+        # Linhas da empresa i: [_bounds[i], _bounds[i + 1]); a última fatia é a de empresa vazia
+        self._bounds = np.searchsorted(company_codes[order], np.arange(len(self.companies) + 2))
+        # Posição de cada linha na planilha e ordem original ("Ordem original" da exibição)
+        original = order
+        self._original_order = np.argsort(original, kind='stable')
+
+        # Ordens globais por coluna, crescente e decrescente, com empates na ordem da planilha
+        self._codes, self._orders = {}, {}
+        for col in columns:
+            codes, uniques = _codes(frame[col])
+            codes = codes[order]
+            self._codes[col] = (codes, uniques)
+            self._orders[col] = (_order(codes, original), _order(codes, original, descending=True))
+        self._texts = {col: pd.Index(uniques).astype(str).str.lower() for col, (_, uniques) in self._codes.items()}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def codes(self, col):
+        """Códigos e valores distintos de uma coluna."""
+        return self._codes[col]
+
+    def _groups(self, companies):
+        if companies is None or not self.company_col:
+            return range(len(self._bounds) - 1)
+        codes = pd.Index(self.companies).get_indexer(list(companies))
+        return np.unique(codes[codes >= 0])
+
+    def _slices(self, companies, start, end):
+        """Fatias [início, fim) da seleção de empresas e da janela [start, end]."""
+        window = self.date_col and (start is not None or end is not None)
+        # Mesmo critério de ``filter_by_date_range``: datas vazias ficam de fora
+        lo_key = pd.Timestamp(start).value if start is not None else np.iinfo(np.int64).min
+        hi_key = pd.Timestamp(end).value if end is not None else _NO_DATE - 1
+        slices = []
+        for group in self._groups(companies):
+            first, last = self._bounds[group], self._bounds[group + 1]
+            if window:
+                keys = self._date_keys[first:last]
+                first, last = (first + np.searchsorted(keys, lo_key, 'left'),
+                               first + np.searchsorted(keys, hi_key, 'right'))
+            if last > first and slices and slices[-1][1] == first:
+                # Empresas vizinhas sem recorte de data: uma única fatia
+                slices[-1] = (slices[-1][0], last)
+            elif last > first:
+                slices.append((first, last))
+        return slices
+
+    def _matches(self, filters):
+        """Por filtro ativo: códigos da coluna e tabela (por código) dos valores que contêm o texto."""
+        for col, text in (filters or {}).items():
+            if col in self._codes and text:
+                codes, _ = self._codes[col]
+                # Valores distintos que contêm o texto (sem diferenciar maiúsculas); o código -1 (vazio) cai no fim
+                hits = np.append(self._texts[col].str.contains(text.lower(), regex=False), False)
+                yield codes, hits
+
+    def rows(self, companies=None, start=None, end=None, filters=None):
+        """Posições das linhas da seleção de empresas, da janela [start, end] e dos filtros de texto por coluna."""
+        pieces = [np.arange(first, last) for first, last in self._slices(companies, start, end)]
+        positions = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int64)
+        for codes, hits in self._matches(filters):
+            positions = positions[hits[codes[positions]]]
+        return positions
+
+    def _selection(self, companies=None, start=None, end=None, filters=None):
+        """(máscara das linhas selecionadas ou None = todas, total de linhas)."""
+        slices = self._slices(companies, start, end)
+        matches = list(self._matches(filters))
+        if not matches and slices == [(0, len(self))]:
+            return None, len(self)
+        mask = np.zeros(len(self), dtype=bool)
+        for first, last in slices:
+            mask[first:last] = True
+        for codes, hits in matches:
+            mask &= hits[codes]
+        return mask, int(mask.sum())
+
+    def page(self, page=1, page_size=50, sort_by=None, descending=False, **selection):
+        """(linhas da página, total de linhas da seleção); ``selection`` vai para ``rows``."""
+        mask, total = self._selection(**selection)
+        if sort_by in self._orders:
+            order = self._orders[sort_by][1 if descending else 0]
+        else:
+            order = self._original_order
+        first = (max(page, 1) - 1) * page_size
+        positions = _take(order, mask, first + page_size)[first:]
+        return self.frame.iloc[positions], total
+
+
+def build_detail_tables(data):
+    """Tabelas detalhadas do dashboard para uma versão dos dados (preparadas fora das requisições)."""
+    tables = {}
+    for name, (dataset, columns, date_col) in DETAIL_TABLES.items():
+        df = absences(data) if dataset is None else data.get(dataset, pd.DataFrame())
+        tables[name] = DetailTable(df, columns, date_col)
+    return tables
@@ -1,87 +1,79 @@
+import time
+# Início da execução antes dos imports pesados: o first paint inclui a importação a frio
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import altair as alt
 from datetime import datetime
 import io
+import os
+import sys
+
+# Permite importar o pacote compartilhado 'painel' da raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.alertas import AlertTable
+from painel.atualizacao import LoadError
+from painel.dados import LOAD_TIMEOUT, absences, get_store
+from painel.desempenho import RenderTimer
+from painel.orcamento import ChartBudget
+from painel.recursos import image_source, load_asset
+
+render_timer = RenderTimer(started=SCRIPT_STARTED)
+# Bytes dos dados de cada gráfico, reduzidos no servidor quando passam do orçamento
+chart_budget = ChartBudget()
 
 # Configurar página ampla e título
 st.set_page_config(page_title="Dashboard Syngenta", layout="wide")
 
 # Exibir logo no topo (substitua 'logo.svg' por o caminho do arquivo de logo, ou converta para PNG se necessário)
-try:
-    st.image("logo.svg", width=200)
-except Exception:
-    pass
+@st.cache_resource
+def load_logo():
+    """Logo lido uma única vez por processo (None se o arquivo não existir)."""
+    return image_source(load_asset("parte2/logo.svg"))
+
+logo = load_logo()
+if logo is not None:
+    st.image(logo, width=200)
 
 # Título principal do dashboard
 st.title("Lista de Gráficos e KPIs - Dashboard Syngenta")
 
-# Funções de carregamento de dados com cache para melhorar desempenho
-@st.cache_data
-def load_dashboard_data():
-    """Carrega dados do dashboard de Segurança (Visitas, Programas, Medições) do arquivo Excel."""
-    xls = pd.ExcelFile(r"exportados/DASHBOAR SYNGENTA.xlsx")
-    visitas = pd.read_excel(xls, sheet_name="VISITAS")
-    programas = pd.read_excel(xls, sheet_name="PROGRAMAS")
-    medicoes = pd.read_excel(xls, sheet_name="MEDIÇÕES")
-    return visitas, programas, medicoes
-
-@st.cache_data
-def load_absences():
-    """Carrega dados de Absenteísmo."""
-    df = pd.read_excel(r"exportados/Absenteísmo.xlsx")
-    # Converter valores decimais com vírgula em 'Dias' para float
-    if df['Dias'].dtype == object:
-        df['Dias'] = df['Dias'].astype(str).str.replace(',', '.')
-    df['Dias'] = df['Dias'].astype(float)
-    # Converter colunas de data
-    df['Início'] = pd.to_datetime(df['Início'], dayfirst=True, errors='coerce')
-    df['Fim'] = pd.to_datetime(df['Fim'], dayfirst=True, errors='coerce')
-    return df
-
-@st.cache_data
-def load_aso():
-    """Carrega dados de ASO (Atestado de Saúde Ocupacional)."""
-    return pd.read_excel(r"exportados/ASO Válidos.xlsx")
-
-@st.cache_data
-def load_exams():
-    """Carrega dados de Exames Médicos."""
-    df = pd.read_excel(r"exportados/Exames Alterados.xlsx")
-    df['Data do Exame'] = pd.to_datetime(df['Data do Exame'], dayfirst=True, errors='coerce')
-    return df
-
-@st.cache_data
-def load_consults():
-    """Carrega dados de Consultas Técnicas."""
-    df = pd.read_excel(r"exportados/Consultas Técnicas.xlsx")
-    # Remover linhas de observação (por exemplo, "Média de visita") e converter meses para datas
-    df = df[~df['DATA'].astype(str).str.contains('Média', case=False, na=False)]
-    month_map = {"jan":1,"fev":2,"mar":3,"abr":4,"mai":5,"jun":6,
-                 "jul":7,"ago":8,"set":9,"out":10,"nov":11,"dez":12}
-    def parse_date(mmyy):
-        try:
-            mon, yy = mmyy.split('/')
-            year = int('20'+yy)
-            month = month_map.get(mon.lower()[:3], 0)
-            return datetime(year, month, 1)
-        except:
-            return None
-    df['Date'] = df['DATA'].astype(str).apply(parse_date)
-    return df
-
-@st.cache_data
-def load_ppp():
-    """Carrega dados de PPP (solicitações de Perfil Profissiográfico Previdenciário)."""
-    return pd.read_excel(r"exportados/PPP SYNGENTA - 01-05-2025 - 21-07-2025.xlsx", header=None, names=["ID", "Descrição", "Status"])
-
-# Carregar todos os dados
-visitas_df, programas_df, medicoes_df = load_dashboard_data()
-absences_df = load_absences()
-aso_df = load_aso()
-exames_df = load_exams()
-consults_df = load_consults()
-ppp_df = load_ppp()
+@st.cache_resource
+def get_data_store():
+    """Armazém compartilhado pelas sessões (mesma camada de dados do dashboard.py)."""
+    return get_store()
+
+@st.cache_data(show_spinner=False, ttl=600)
+def get_alerts(version, day):
+    """Tabela de alertas persistida (todas as empresas e janelas padrão)."""
+    snapshot = get_data_store().get(timeout=LOAD_TIMEOUT)
+    return AlertTable().current(snapshot.data, snapshot.indexes)
+
+# Carregar todos os dados: sessões recebem o último snapshot válido sem aguardar a leitura dos Excel
+store = get_data_store()
+try:
+    if not store.ready:
+        with st.spinner('Preparando dados pela primeira vez...'):
+            snapshot = store.get(timeout=LOAD_TIMEOUT)
+    else:
+        snapshot = store.get(timeout=LOAD_TIMEOUT)
+except LoadError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+if snapshot is None:
+    st.error("❌ Os dados ainda estão sendo preparados. Recarregue a página em instantes.")
+    st.stop()
+visitas_df = snapshot.data['seguranca_visitas']
+programas_df = snapshot.data['seguranca_programas']
+medicoes_df = snapshot.data['seguranca_medicoes']
+absences_df = absences(snapshot.data)
+aso_df = snapshot.data['aso_validos']
+exames_df = snapshot.data['exames_alterados']
+consults_df = snapshot.data['consultas_tecnicas']
+ppp_df = snapshot.data['ppp']
+days_index = snapshot.indexes['days_lost']
+aso_index = snapshot.indexes['aso_expiry']
+st.sidebar.caption(f"🗂️ Dados v{snapshot.version} · atualizados em {snapshot.loaded_at:%d/%m/%Y %H:%M}")
 
 # Filtros na barra lateral: seleção de área e intervalo de datas
 area_option = st.sidebar.selectbox("Selecione a área", ["Segurança do Trabalho", "Saúde Ocupacional"])
@@ -108,8 +100,8 @@ absences_filtered = absences_df[(absences_df['Início'] >= pd.to_datetime(from_d
                                 (absences_df['Início'] <= pd.to_datetime(to_date))]
 exames_filtered = exames_df[(exames_df['Data do Exame'] >= pd.to_datetime(from_date)) & 
                             (exames_df['Data do Exame'] <= pd.to_datetime(to_date))]
-consults_filtered = consults_df[(consults_df['Date'] >= pd.to_datetime(from_date)) & 
-                                (consults_df['Date'] <= pd.to_datetime(to_date))]
+consults_filtered = consults_df[(consults_df['DATA'] >= pd.to_datetime(from_date)) & 
+                                (consults_df['DATA'] <= pd.to_datetime(to_date))]
 
 if empresa_selecionada != "Todas":
     absences_df = absences_df[absences_df['Empresa'] == empresa_selecionada]
@@ -125,19 +117,14 @@ if empresa_selecionada != "Todas":
         exames_filtered = exames_filtered[exames_filtered['Empresa'] == empresa_selecionada]
 
 
-# Função auxiliar para categorizar CID principal em grupo patológico
-def categorize_cid(cid):
-    if pd.isna(cid):
-        return "Outros"
-    letter = str(cid)[0]
-    if letter == 'F':
-        return "Transtornos Mentais"
-    elif letter == 'A':
-        return "Doenças Infecciosas"
-    elif letter == 'K':
-        return "Doenças Digestivas"
-    else:
-        return "Outros"
+empresas_filtro = None if empresa_selecionada == "Todas" else [empresa_selecionada]
+
+def days_lost_monthly():
+    """Dias perdidos por mês, empresa e categoria recortados ao período selecionado."""
+    monthly = days_index.monthly(pd.to_datetime(from_date), pd.to_datetime(to_date))
+    if empresas_filtro is not None:
+        monthly = monthly[monthly['Empresa'].isin(empresas_filtro)]
+    return monthly.rename(columns={'Dias Perdidos': 'Dias'})
 
 # Preparar dados agregados para gráficos e KPIs
 # 1. Tendência de Visitas (realizado vs meta) - acumulado mensal
@@ -207,24 +194,24 @@ docs_missing = (programas_df[['PGR', 'MAPA DE RISCO', 'PPRS', 'LTCAT', 'L.I', 'L
 docs_compliant = int(total_docs_required - docs_missing)
 
 # 7. Absenteísmo por Doença (dias perdidos por mês por grupo patológico)
-absences_filtered['Categoria'] = absences_filtered['Cid Principal'].apply(categorize_cid)
-abs_monthly = absences_filtered.groupby([absences_filtered['Início'].dt.to_period('M'), 'Categoria'])['Dias'].sum().reset_index()
-abs_monthly['Mês'] = abs_monthly['Início'].dt.to_timestamp()
+abs_days_monthly = days_lost_monthly()
+abs_monthly = abs_days_monthly.groupby(['Mês', 'Categoria'])['Dias'].sum().reset_index()
 
 # 8. Exames Alterados por Unidade (contagem normal vs alterado)
 exames_filtered['Resultado'] = exames_filtered['Alterados'].apply(lambda x: "Alterado" if str(x).strip().lower() == "sim" else "Normal")
 exams_count = exames_filtered.value_counts(["Unidade do Funcionário", "Resultado"]).reset_index(name="Count")
 
 # 9. Conformidade Saúde (colaboradores com ASO válido vs não conforme)
-expired_count = aso_df[aso_df['Status'].astype(str).str.lower().str.contains("vencido")].shape[0]
-pending_count = aso_df[aso_df['Status'].astype(str).str.lower().str.contains("pendente")].shape[0] if 'Status' in aso_df.columns else 0
+aso_counts = aso_index.counts(30, companies=empresas_filtro)
+expired_count = aso_counts['vencidos']
+pending_count = aso_counts['pendentes']
 non_compliant = expired_count + pending_count
-compliant = aso_df.shape[0] - non_compliant
+compliant = aso_counts['validos'] + aso_counts['a_vencer']
 
 # 10. Taxa de Absenteísmo (% de dias perdidos em relação ao total de dias de trabalho)
 if aso_df.shape[0] > 0:
     total_workdays = aso_df.shape[0] * 252  # assumindo 252 dias úteis por ano por funcionário
-    total_absent_days = absences_filtered['Dias'].sum()
+    total_absent_days = days_index.total(pd.to_datetime(from_date), pd.to_datetime(to_date), empresas_filtro)
     abs_rate = (total_absent_days / total_workdays) * 100
 else:
     abs_rate = 0.0
@@ -239,17 +226,20 @@ if area_option == "Segurança do Trabalho":
     col2.metric("Documentos Válidos", docs_compliant)
     col3.metric("PPP Emitidos", ppp_delivered)
     col4.metric("Medições Realizadas", int(medicoes_df['REALIZADAS'].sum()))
+    render_timer.mark('first_paint')
+    # Altair carregado só quando os gráficos são renderizados
+    import altair as alt
     # Gráficos
     st.subheader("Gráficos")
     st.markdown("**Linha**: Tendência de Visitas (realizadas vs meta)")
-    chart_visitas = alt.Chart(visitas_trend_long).mark_line(point=True).encode(
+    chart_visitas = alt.Chart(chart_budget.fit('Tendência de Visitas', visitas_trend_long, 'Visitas', time='Mês', how='last')).mark_line(point=True).encode(
         x=alt.X('Mês:T', title=None),
         y=alt.Y('Visitas:Q', title='Visitas'),
         color=alt.Color('Tipo:N', title='Tipo', scale=alt.Scale(domain=['Planejado', 'Realizado'], range=['#00468B', '#35B779']))
     )
     st.altair_chart(chart_visitas, use_container_width=True)
     st.markdown("**Barras**: Documentos por Unidade (válidos/vencendo/vencidos)")
-    chart_docs = alt.Chart(doc_status_counts).mark_bar().encode(
+    chart_docs = alt.Chart(chart_budget.fit('Documentos por Unidade', doc_status_counts, 'Count', category='Unidade')).mark_bar().encode(
         x=alt.X('Unidade:N', title=None),
         y=alt.Y('Count:Q', title='Documentos'),
         color=alt.Color('Status:N', title='Status', scale=alt.Scale(domain=['Válido', 'Vencendo', 'Vencido'], range=['#2ca02c', '#f0ad4e', '#d62728']))
@@ -258,20 +248,21 @@ if area_option == "Segurança do Trabalho":
     st.markdown("**Barras**: PPP - Perfil Profissiográfico Previdenciário (solicitações vs entregas)")
     ppp_chart_df = pd.DataFrame({"Categoria": ["Solicitações", "Entregas"],
                                  "Total": [total_ppp_requests, ppp_delivered]})
-    chart_ppp = alt.Chart(ppp_chart_df).mark_bar(color='#00468B').encode(
+    chart_ppp = alt.Chart(chart_budget.measure('PPP', ppp_chart_df)).mark_bar(color='#00468B').encode(
         x=alt.X('Categoria:N', title=None),
         y=alt.Y('Total:Q', title='Quantidade de PPP')
     )
     st.altair_chart(chart_ppp, use_container_width=True)
     st.markdown("**Barras**: Medições Ambientais (solicitadas vs realizadas por unidade)")
-    chart_med = alt.Chart(medicoes_melt).mark_bar().encode(
+    chart_med = alt.Chart(chart_budget.fit('Medições Ambientais', medicoes_melt, 'Quantidade', category='EMPRESA')).mark_bar().encode(
         x=alt.X('EMPRESA:N', title=None),
         y=alt.Y('Quantidade:Q', title='Medições'),
         color=alt.Color('Tipo:N', title='Tipo')
     )
     st.altair_chart(chart_med, use_container_width=True)
     st.markdown("**Área**: Avaliações Ambientais (programado/executado/não executado)")
-    chart_area = alt.Chart(plan_exec_long[plan_exec_long['Categoria'] != 'Programado']).mark_area(opacity=0.7).encode(
+    plan_exec_chart = plan_exec_long[plan_exec_long['Categoria'] != 'Programado']
+    chart_area = alt.Chart(chart_budget.fit('Avaliações Ambientais', plan_exec_chart, 'Quantidade', time='Mês', how='last')).mark_area(opacity=0.7).encode(
         x=alt.X('Mês:T', title=None),
         y=alt.Y('Quantidade:Q', title='Tarefas'),
         color=alt.Color('Categoria:N', title='Categoria', scale=alt.Scale(domain=['Executado', 'Não Executado'], range=['#2ca02c', '#d62728']))
@@ -280,7 +271,7 @@ if area_option == "Segurança do Trabalho":
     st.markdown("**Pizza**: Conformidade Segurança (conforme vs não conforme)")
     pie_sec_df = pd.DataFrame({"Status": ["Conforme", "Não Conforme"],
                                "Total": [docs_compliant, docs_missing]})
-    pie_sec_chart = alt.Chart(pie_sec_df).mark_arc(innerRadius=50).encode(
+    pie_sec_chart = alt.Chart(chart_budget.measure('Conformidade Segurança', pie_sec_df)).mark_arc(innerRadius=50).encode(
         theta='Total:Q',
         color=alt.Color('Status:N', scale=alt.Scale(range=['#2ca02c', '#d62728']))
     )
@@ -317,21 +308,33 @@ elif area_option == "Saúde Ocupacional":
     # KPIs principais
     st.subheader("KPIs")
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("ASO Válidos", int(aso_df[~aso_df['Status'].astype(str).str.lower().str.contains("vencido")].shape[0]))
+    col1.metric("ASO Válidos", compliant)
     col2.metric("Exames Alterados", int(exames_filtered[exames_filtered['Alterados'].astype(str).str.lower() == 'sim'].shape[0]))
     col3.metric("Taxa Absenteísmo", f"{abs_rate:.1f}%")
     col4.metric("Consultas Técnicas", consults_filtered.shape[0])
+    # Alertas por empresa e janela (avaliados fora da sessão)
+    health_alerts = get_alerts(snapshot.version, datetime.now().date())
+    if empresas_filtro is not None:
+        health_alerts = health_alerts[health_alerts['Empresa'].isin(empresas_filtro)]
+    with st.expander(f"Alertas por empresa ({len(health_alerts)})"):
+        if health_alerts.empty:
+            st.write("Nenhum alerta nas janelas de 30 a 365 dias.")
+        else:
+            st.dataframe(health_alerts[['Empresa', 'Janela', 'Nível', 'Mensagem']], use_container_width=True, hide_index=True)
+    render_timer.mark('first_paint')
+    # Altair carregado só quando os gráficos são renderizados
+    import altair as alt
     # Gráficos
     st.subheader("Gráficos")
     st.markdown("**Linha**: Absenteísmo por Doença (evolução mensal)")
-    chart_abs = alt.Chart(abs_monthly).mark_line(point=True).encode(
+    chart_abs = alt.Chart(chart_budget.fit('Absenteísmo por Doença', abs_monthly, 'Dias', category='Categoria', time='Mês')).mark_line(point=True).encode(
         x=alt.X('Mês:T', title=None),
         y=alt.Y('Dias:Q', title='Dias perdidos'),
         color=alt.Color('Categoria:N', title='Grupo Patológico')
     )
     st.altair_chart(chart_abs, use_container_width=True)
     st.markdown("**Barras**: Exames Alterados por Unidade (normais vs alterados)")
-    chart_exams = alt.Chart(exams_count).mark_bar().encode(
+    chart_exams = alt.Chart(chart_budget.fit('Exames por Unidade', exams_count, 'Count', category='Unidade do Funcionário')).mark_bar().encode(
         x=alt.X('Unidade do Funcionário:N', title=None),
         y=alt.Y('Count:Q', title='Exames'),
         color=alt.Color('Resultado:N', title='Resultado', scale=alt.Scale(domain=['Normal', 'Alterado'], range=['#2ca02c', '#d62728']))
@@ -340,7 +343,7 @@ elif area_option == "Saúde Ocupacional":
     st.markdown("**Pizza**: Conformidade Saúde (conforme vs não conforme)")
     pie_health_df = pd.DataFrame({"Status": ["Conforme", "Não Conforme"],
                                   "Total": [compliant, non_compliant]})
-    pie_health_chart = alt.Chart(pie_health_df).mark_arc(innerRadius=50).encode(
+    pie_health_chart = alt.Chart(chart_budget.measure('Conformidade Saúde', pie_health_df)).mark_arc(innerRadius=50).encode(
         theta='Total:Q',
         color=alt.Color('Status:N', scale=alt.Scale(range=['#2ca02c', '#d62728']))
     )
@@ -350,8 +353,8 @@ elif area_option == "Saúde Ocupacional":
     colA, colB = st.columns(2)
     with colA:
         # Resumo ASOs
-        valid_aso = aso_df[~aso_df['Status'].astype(str).str.lower().str.contains("vencido")].shape[0]
-        expiring_aso = aso_df[aso_df['Status'].astype(str).str.lower().str.contains("a vencer em 30 dias")].shape[0]
+        valid_aso = compliant
+        expiring_aso = aso_counts['a_vencer']
         st.markdown(f"**ASOs:** {valid_aso} válidos, {pending_count} pendentes, {expiring_aso} vencendo, {expired_count} vencidos")
         # Resumo análises químicas
         total_exams = exames_df.shape[0]
@@ -367,17 +370,16 @@ elif area_option == "Saúde Ocupacional":
         st.markdown("**Absenteísmo:** Evolução mensal e distribuição por unidade")
         m_col1, m_col2 = st.columns(2)
         # Gráfico pequeno: evolução mensal de dias perdidos (todos motivos)
-        total_monthly_abs = absences_filtered.groupby(absences_filtered['Início'].dt.to_period('M'))['Dias'].sum().reset_index()
-        total_monthly_abs['Mês'] = total_monthly_abs['Início'].dt.to_timestamp()
-        monthly_chart = alt.Chart(total_monthly_abs).mark_line(point=True).encode(
+        total_monthly_abs = abs_days_monthly.groupby('Mês')['Dias'].sum().reset_index()
+        monthly_chart = alt.Chart(chart_budget.fit('Dias Perdidos por Mês', total_monthly_abs, 'Dias', time='Mês')).mark_line(point=True).encode(
             x=alt.X('Mês:T', title=None),
             y=alt.Y('Dias:Q', title='Dias perdidos')
         ).properties(width=250, height=150)
         m_col1.altair_chart(monthly_chart, use_container_width=False)
         # Gráfico pequeno: top 3 unidades com mais dias perdidos
-        unit_absences = absences_filtered.groupby('Empresa')['Dias'].sum().reset_index().rename(columns={'Empresa': 'Empresa', 'Dias': 'Dias Perdidos'})
+        unit_absences = abs_days_monthly.groupby('Empresa')['Dias'].sum().reset_index().rename(columns={'Empresa': 'Empresa', 'Dias': 'Dias Perdidos'})
         top_units = unit_absences.sort_values('Dias Perdidos', ascending=False).head(3)
-        unit_chart = alt.Chart(top_units).mark_bar().encode(
+        unit_chart = alt.Chart(chart_budget.measure('Top Unidades', top_units)).mark_bar().encode(
             x=alt.X('Dias Perdidos:Q', title='Dias perdidos'),
             y=alt.Y('Empresa:N', title=None, sort='-x')
         ).properties(width=250, height=150)
@@ -391,4 +393,8 @@ elif area_option == "Saúde Ocupacional":
         consults_filtered.to_excel(writer, index=False, sheet_name="Consultas")
     st.sidebar.download_button("📥 Baixar dados (Saúde)", data=health_output.getvalue(), file_name="dados_saude.xlsx")
 
-
+render_timer.mark('complete')
+st.caption(render_timer.summary())
+st.caption(chart_budget.summary())
+with st.expander("Dados enviados por gráfico"):
+    st.dataframe(chart_budget.table(), use_container_width=True, hide_index=True)
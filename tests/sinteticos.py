@@ -0,0 +1,50 @@
+"""Dados sintéticos (semente fixa) no esquema canônico de ``painel.dados``."""
+import numpy as np
+import pandas as pd
+
+from painel.dados import DATASETS
+
+COMPANIES = ['ALFA LTDA', 'BETA S.A.', 'GAMA AGRO']
+
+
+def synthetic_data(seed=7, n=400):
+    """Bases de afastamentos, exames e ASOs com datas relativas a hoje (demais bases vazias)."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now().normalize()
+    starts = today - pd.to_timedelta(rng.integers(0, 500, n), unit='D')
+    length = rng.integers(0, 40, n)
+    absences = pd.DataFrame({
+        'Empresa': rng.choice(COMPANIES + [None], n, p=[0.3, 0.3, 0.3, 0.1]),
+        'Funcionário': rng.choice([f'Funcionário {i}' for i in range(60)] + [None], n),
+        'Início': starts,
+        'Fim': starts + pd.to_timedelta(length, unit='D'),
+        'Dias Perdidos': (length + 1).astype(float),
+        'Categoria': rng.choice(['Osteomuscular', 'Respiratório', 'Outros'], n),
+        'Saúde Mental': rng.random(n) < 0.3,
+        'Musculoesquelético': rng.random(n) < 0.4,
+    })
+    # Datas ausentes, fim ausente e fim anterior ao início
+    absences.loc[::37, 'Início'] = pd.NaT
+    absences.loc[5::41, 'Fim'] = pd.NaT
+    absences.loc[11::53, 'Fim'] = absences.loc[11::53, 'Início'] - pd.Timedelta(days=3)
+
+    exams = pd.DataFrame({
+        'Empresa': rng.choice(COMPANIES, n // 2),
+        'Funcionário': rng.choice([f'Funcionário {i}' for i in range(60)], n // 2),
+        'Data do Exame': today - pd.to_timedelta(rng.integers(0, 400, n // 2), unit='D'),
+        'Alterados': rng.choice(['Sim', 'Não'], n // 2),
+        'Alterados Ocupacionais': rng.choice(['Sim', 'Não'], n // 2, p=[0.2, 0.8]),
+    })
+    last_exam = today - pd.to_timedelta(rng.integers(0, 700, 120), unit='D')
+    asos = pd.DataFrame({
+        'Empresa': rng.choice(COMPANIES, 120),
+        'Unidade': rng.choice(['Matriz', 'Filial'], 120),
+        'Nome': [f'Funcionário {i}' for i in range(120)],
+        'Data Último Exame': last_exam,
+        'Validade': last_exam + pd.Timedelta(days=365),
+    })
+    asos.loc[::17, 'Data Último Exame'] = pd.NaT
+
+    data = {name: pd.DataFrame() for name in DATASETS}
+    data.update({'absenteismo': absences, 'exames_alterados': exams, 'aso_validos': asos})
+    return data
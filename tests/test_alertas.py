@@ -0,0 +1,88 @@
+"""Tabela de alertas: atualização incremental equivalente à avaliação completa."""
+import logging
+
+import pandas as pd
+import pytest
+
+from painel import dados
+from painel.alertas import AlertTable, evaluate_alerts
+from painel.dados import build_indexes
+from tests.sinteticos import synthetic_data
+
+TODAY = pd.Timestamp.now().normalize()
+
+
+def _sorted(alerts):
+    return alerts.sort_values(['Empresa', 'Janela', 'Indicador'], ignore_index=True)
+
+
+def _append_absences(data, company, n=25):
+    """Nova versão dos dados com afastamentos recentes (longos e de saúde mental) de uma empresa."""
+    absences = data['absenteismo']
+    new = pd.DataFrame({
+        'Empresa': company, 'Funcionário': [f'Novo {i}' for i in range(n)],
+        'Início': TODAY - pd.Timedelta(days=5), 'Fim': TODAY + pd.Timedelta(days=30), 'Dias Perdidos': 36.0,
+        'Categoria': 'Transtornos Mentais', 'Saúde Mental': True, 'Musculoesquelético': False,
+    })
+    return dict(data, absenteismo=pd.concat([absences, new], ignore_index=True))
+
+
+@pytest.fixture
+def table(tmp_path):
+    return AlertTable(path=str(tmp_path / 'alertas.pkl'))
+
+
+def test_incremental_update_matches_full_recompute(table):
+    data = synthetic_data()
+    first = table.update(data, build_indexes(data), today=TODAY)
+    assert set(table.last_recomputed) >= {'ALFA LTDA', 'BETA S.A.', 'GAMA AGRO'}
+    pd.testing.assert_frame_equal(_sorted(first), _sorted(evaluate_alerts(data, build_indexes(data), today=TODAY)))
+
+    appended = _append_absences(data, 'BETA S.A.')
+    indexes = build_indexes(appended)
+    incremental = table.update(appended, indexes, today=TODAY)
+    assert table.last_recomputed == ['BETA S.A.']
+    full = evaluate_alerts(appended, indexes, today=TODAY)
+    pd.testing.assert_frame_equal(_sorted(incremental), _sorted(full))
+    # A nova versão de fato muda os alertas da empresa alterada
+    assert not _sorted(first).equals(_sorted(incremental))
+
+    # Sem mudanças: nada é recalculado
+    table.update(appended, indexes, today=TODAY)
+    assert table.last_recomputed == []
+
+
+def test_full_update_ignores_saved_state(table):
+    data = synthetic_data()
+    table.update(data, build_indexes(data), today=TODAY)
+    table.update(data, build_indexes(data), today=TODAY, full=True)
+    assert set(table.last_recomputed) >= {'ALFA LTDA', 'BETA S.A.', 'GAMA AGRO'}
+
+
+def test_derive_falls_back_to_full_rebuild_and_reports(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr('painel.alertas.ALERTS_PATH', str(tmp_path / 'alertas.pkl'))
+    original = AlertTable.update
+
+    def incremental_fails(self, data, indexes, today=None, full=False):
+        if not full:
+            raise KeyError('fingerprints')
+        return original(self, data, indexes, today, full)
+
+    monkeypatch.setattr(AlertTable, 'update', incremental_fails)
+    errors = []
+    with caplog.at_level(logging.ERROR, logger='painel.dados'):
+        indexes = dados._derive(synthetic_data(), errors)
+    assert 'days_lost' in indexes
+    assert len(errors) == 1 and errors[0].startswith('Alertas recalculados por completo')
+    assert any('incremental' in record.message for record in caplog.records)
+    assert not AlertTable().read().empty
+
+
+def test_derive_reports_when_alerts_cannot_be_rebuilt(monkeypatch):
+    def always_fails(self, data, indexes, today=None, full=False):
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(AlertTable, 'update', always_fails)
+    errors = []
+    dados._derive(synthetic_data(), errors)
+    assert errors == ['Alertas desatualizados: disco cheio']
@@ -0,0 +1,68 @@
+"""Índice de vencimento de ASOs comparado com a contagem direta pelas validades."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.aso import AsoExpiryIndex
+
+TODAY = pd.Timestamp('2025-06-15')
+
+
+@pytest.fixture(scope='module')
+def asos():
+    rng = np.random.default_rng(5)
+    n = 500
+    last_exam = TODAY - pd.to_timedelta(rng.integers(0, 800, n), unit='D')
+    df = pd.DataFrame({
+        'Empresa': rng.choice(['ALFA', 'BETA', 'GAMA'], n),
+        'Unidade': rng.choice(['Matriz', 'Filial', None], n),
+        'Data Último Exame': last_exam,
+        'Validade': last_exam + pd.to_timedelta(rng.choice([180, 365, 730], n), unit='D'),
+    })
+    df.loc[::23, 'Data Último Exame'] = pd.NaT
+    # Exame realizado sem validade: conta como vencido
+    df.loc[7::41, 'Validade'] = pd.NaT
+    return df
+
+
+def _naive(df, horizon, today, companies=None):
+    if companies is not None:
+        df = df[df['Empresa'].isin(companies)]
+    pending = df['Data Último Exame'].isna()
+    done = df[~pending]
+    validade = done['Validade']
+    expired = validade.isna() | (validade < today)
+    until = validade < today + pd.Timedelta(days=horizon)
+    return {'total': len(df), 'pendentes': int(pending.sum()), 'vencidos': int(expired.sum()),
+            'a_vencer': int((until & ~expired).sum()), 'validos': int((~until & validade.notna()).sum())}
+
+
+@pytest.mark.parametrize('horizon', [0, 7, 30, 90, 400])
+@pytest.mark.parametrize('companies', [None, ['BETA'], ['ALFA', 'GAMA', 'OUTRA']])
+def test_counts_match_naive(asos, horizon, companies):
+    index = AsoExpiryIndex(asos)
+    assert index.counts(horizon, TODAY, companies) == _naive(asos, horizon, TODAY, companies)
+
+
+def test_counts_by_group_cover_every_unit(asos):
+    per_group = AsoExpiryIndex(asos).counts_by_group(30, TODAY)
+    assert per_group.index.names == ['Empresa', 'Unidade']
+    assert 'Não informado' in per_group.index.get_level_values('Unidade')
+    assert int(per_group['total'].sum()) == len(asos)
+    assert (per_group['pendentes'] + per_group['vencidos'] + per_group['a_vencer'] + per_group['validos']
+            == per_group['total']).all()
+
+
+def test_weekly_calendar(asos):
+    calendar = AsoExpiryIndex(asos).calendar(weeks=8, today=TODAY, companies=['ALFA'])
+    first_week = TODAY - pd.Timedelta(days=TODAY.weekday())
+    assert (calendar['Semana'].dt.weekday == 0).all()
+    assert calendar['Semana'].between(first_week, first_week + pd.Timedelta(weeks=8), inclusive='left').all()
+    done = asos[(asos['Empresa'] == 'ALFA') & asos['Data Último Exame'].notna()]
+    expected = done['Validade'].between(first_week, first_week + pd.Timedelta(weeks=8), inclusive='left').sum()
+    assert calendar['ASOs'].sum() == expected
+
+
+def test_without_validade_column():
+    index = AsoExpiryIndex(pd.DataFrame({'Empresa': ['ALFA'], 'Nome': ['Ana']}))
+    assert index.counts(30, TODAY) == {'total': 0, 'pendentes': 0, 'vencidos': 0, 'a_vencer': 0, 'validos': 0}
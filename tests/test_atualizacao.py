@@ -0,0 +1,132 @@
+"""Armazém stale-while-revalidate: trocas, falhas parciais e totais e snapshot em disco."""
+import logging
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from painel.atualizacao import DatasetStore, LoadError, Snapshot
+
+
+class _Loader:
+    """Loader controlável: bases por nome, bases com falha e falha total."""
+
+    def __init__(self):
+        self.frames = {'a': pd.DataFrame({'x': [1]}), 'b': pd.DataFrame({'y': [2]})}
+        self.failing = set()
+        self.crash = None
+        self.calls = 0
+
+    def __call__(self, errors, failed):
+        self.calls += 1
+        if self.crash:
+            raise self.crash
+        data = {}
+        for name, df in self.frames.items():
+            if name in self.failing:
+                errors.append(f"Erro ao carregar {name}")
+                failed.add(name)
+                data[name] = pd.DataFrame()
+            else:
+                data[name] = df
+        return data
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'base.xlsx'
+    path.write_bytes(b'v1')
+    return path
+
+
+def _touch(path, content):
+    path.write_bytes(content)
+    # mtime diferente mesmo em sistemas de arquivos com resolução grosseira
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_refresh_swaps_only_when_files_change(source):
+    loader = _Loader()
+    store = DatasetStore(loader, [source], derive=lambda data, errors: {'n': len(data)})
+    assert store.refresh() is True
+    first = store.get()
+    assert first.indexes == {'n': 2} and first.errors == []
+    assert store.refresh() is False and loader.calls == 1
+
+    _touch(source, b'v2')
+    assert store.refresh() is True
+    assert store.get().version != first.version
+
+
+def test_failed_dataset_keeps_previous_version(source):
+    loader = _Loader()
+    store = DatasetStore(loader, [source])
+    store.refresh()
+    loader.failing = {'b'}
+    loader.frames['a'] = pd.DataFrame({'x': [10]})
+    _touch(source, b'v2')
+    store.refresh()
+    snapshot = store.get()
+    assert snapshot.data['a']['x'].tolist() == [10]
+    assert snapshot.data['b']['y'].tolist() == [2]
+    assert "Mantida a versão anterior de: b" in snapshot.errors
+    # Assinatura registrada: a falha não é tentada de novo sem mudança nos arquivos
+    assert store.refresh() is False
+
+
+def test_first_load_failure_raises_instead_of_blocking(source, caplog):
+    loader = _Loader()
+    loader.crash = OSError('planilha corrompida')
+    store = DatasetStore(loader, [source], interval=3600).start()
+    started = time.monotonic()
+    with caplog.at_level(logging.ERROR, logger='painel.atualizacao'):
+        with pytest.raises(LoadError, match='planilha corrompida'):
+            store.get(timeout=30)
+    assert time.monotonic() - started < 10
+    assert store.ready
+    assert any('Falha ao atualizar' in record.message for record in caplog.records)
+
+
+def test_failure_after_success_is_reported_on_snapshot(source):
+    loader = _Loader()
+    store = DatasetStore(loader, [source], derive=lambda data, errors: 1 / 0 if loader.calls > 1 else {})
+    store.refresh()
+    version = store.get().version
+    _touch(source, b'v2')
+    with pytest.raises(ZeroDivisionError):
+        store.refresh()
+    snapshot = store.get()
+    assert snapshot.version == version
+    assert any(error.startswith('Falha ao atualizar os dados') for error in snapshot.errors)
+    assert store.last_errors == snapshot.errors[-1:]
+
+
+def test_get_returns_none_after_timeout(source):
+    store = DatasetStore(_Loader(), [source])
+    assert store.get(timeout=0.01) is None
+
+
+def test_snapshot_persisted_and_reloaded(source, tmp_path):
+    cache_path = str(tmp_path / 'cache' / 'snapshot-v1.pkl')
+    stale = tmp_path / 'cache' / 'snapshot-v0.pkl'
+    stale.parent.mkdir()
+    stale.write_bytes(b'antigo')
+    store = DatasetStore(_Loader(), [source], cache_path=cache_path,
+                         stale_pattern=str(tmp_path / 'cache' / 'snapshot-*'))
+    store.refresh()
+    assert os.path.exists(cache_path) and not stale.exists()
+
+    reloaded = DatasetStore(_Loader(), [source], cache_path=cache_path)
+    assert reloaded.ready
+    assert isinstance(reloaded.get(), Snapshot) and reloaded.get().version == store.get().version
+
+
+def test_unreadable_cache_is_logged_and_ignored(source, tmp_path, caplog):
+    cache_path = tmp_path / 'snapshot.pkl'
+    cache_path.write_bytes(b'nao e pickle')
+    with caplog.at_level(logging.WARNING, logger='painel.atualizacao'):
+        store = DatasetStore(_Loader(), [source], cache_path=str(cache_path))
+    assert not store.ready
+    assert any('ilegível' in record.message for record in caplog.records)
@@ -0,0 +1,51 @@
+"""Conversões de números pt-BR, datas e rótulos de mês."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.conversao import parse_dates, parse_month_labels, parse_ptbr_numbers
+
+
+def _values(series):
+    return [None if pd.isna(value) else value for value in series]
+
+
+def test_numeric_columns_pass_through():
+    assert _values(parse_ptbr_numbers(pd.Series([1, 2, 3]))) == [1.0, 2.0, 3.0]
+    assert _values(parse_ptbr_numbers(pd.Series([1.234, np.nan, 12.345]))) == [1.234, None, 12.345]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2,5', 2.5), ('1.234,56', 1234.56), ('12.345.678,9', 12345678.9), ('1.234', 1234.0),
+    ('12.345.678', 12345678.0), ('1.5', 1.5), ('0.234', 0.234), ('42', 42.0), (' 7,0 ', 7.0),
+    ('-3,25', -3.25), ('-1.234,56', -1234.56), ('-1.234', -1234.0), ('1 234,5', 1234.5),
+])
+def test_text_numbers(text, expected):
+    assert parse_ptbr_numbers(pd.Series([text], dtype=object)).iloc[0] == pytest.approx(expected)
+
+
+def test_blanks_and_invalid_text_become_nan():
+    result = parse_ptbr_numbers(pd.Series(['', '  ', None, np.nan, 'n/d'], dtype=object))
+    assert result.isna().all() and result.dtype == float
+
+
+def test_mixed_object_column_keeps_numeric_cells():
+    series = pd.Series([1.234, '2,5', 1.5, 12.345, 7, '1.234', None, '-0,5'], dtype=object)
+    assert _values(parse_ptbr_numbers(series)) == [1.234, 2.5, 1.5, 12.345, 7.0, 1234.0, None, -0.5]
+
+
+def test_string_dtype_column():
+    series = pd.Series(['1.234,56', None, '3'], dtype='string')
+    assert _values(parse_ptbr_numbers(series)) == [1234.56, None, 3.0]
+
+
+def test_dates_in_declared_formats_and_excel_serials():
+    series = pd.Series(['31/01/2025', '2025-02-15', '45700', ' 01/03/2025 ', 'sem data', None], dtype=object)
+    assert _values(parse_dates(series)) == [pd.Timestamp('2025-01-31'), pd.Timestamp('2025-02-15'),
+                                            pd.Timestamp('2025-02-12'), pd.Timestamp('2025-03-01'), None, None]
+
+
+def test_month_labels():
+    series = pd.Series(['jan/25', 'Março/2025', '15/04/2025', 'xyz'], dtype=object)
+    assert _values(parse_month_labels(series)) == [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-03-01'),
+                                                   pd.Timestamp('2025-04-01'), None]
@@ -0,0 +1,133 @@
+"""Camada de dados: preparo das bases e cache de DataFrames convertidos (deduplicação e limpeza)."""
+import glob
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel import dados
+from painel.dados import DatasetSpec, _prepare_exams
+
+
+def test_exam_footer_rows_are_dropped():
+    df = pd.DataFrame({
+        'Empresa': ['ALFA LTDA', 'BETA S.A.', 'Número de Exames Distintos: 68', 'Total de Exames Realizados: 24514'],
+        'Funcionário': ['Ana', 'Bruno', np.nan, np.nan],
+        'Data do Exame': pd.to_datetime(['2025-01-02', '2025-01-03', None, None]),
+    })
+    result = _prepare_exams(df)
+    assert result['Empresa'].tolist() == ['ALFA LTDA', 'BETA S.A.']
+    assert result.index.tolist() == [0, 1]
+
+
+def test_exam_rows_with_data_are_kept_even_if_company_looks_like_footer():
+    df = pd.DataFrame({'Empresa': ['Filial: 12', 'ALFA LTDA'], 'Funcionário': ['Ana', 'Bruno']})
+    assert len(_prepare_exams(df)) == 2
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Cache e bases em diretório temporário; devolve uma função que grava planilhas."""
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(dados, 'DATASET_CACHE_DIR', str(cache_dir))
+    monkeypatch.setattr(dados, 'FRAME_CACHE_DIR', str(cache_dir / 'frames'))
+    monkeypatch.setattr(dados, 'DATASETS', {})
+
+    def write(name, df):
+        path = tmp_path / f'{name}.xlsx'
+        previous = path.stat().st_mtime_ns if path.exists() else 0
+        df.to_excel(path, index=False)
+        # Nova versão do arquivo: assinatura (mtime) diferente mesmo com resolução grosseira
+        mtime = max(path.stat().st_mtime_ns, previous + 10 ** 9)
+        os.utime(path, ns=(mtime, mtime))
+        dados.DATASETS[name] = DatasetSpec(str(path), dates=('Data',))
+        return path
+
+    write.dir = cache_dir
+    return write
+
+
+def _frames(cache, suffix):
+    return sorted(os.path.basename(path) for path in glob.glob(str(cache.dir / 'frames' / f'*.{suffix}')))
+
+
+def _sample(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Empresa': rng.choice(['ALFA', 'BETA'], n), 'Nome': [f'Pessoa {i}' for i in range(n)],
+                         'Data': pd.date_range('2025-01-01', periods=n, freq='D').strftime('%d/%m/%Y')})
+
+
+def test_repeated_exports_share_one_frame(cache):
+    df = _sample()
+    cache('a', df)
+    # Mesma exportação com linhas e colunas em outra ordem e espaços nas pontas
+    shuffled = df.sample(frac=1, random_state=2)[['Data', 'Nome', 'Empresa']]
+    cache('b', shuffled.assign(Nome=' ' + shuffled['Nome'] + ' '))
+    data = dados.load_datasets(names=['a', 'b'])
+    assert data['a'] is data['b']
+    assert dados.shared_datasets(data) == [['a', 'b']]
+    assert len(_frames(cache, 'pkl')) == 1 and _frames(cache, 'sub') == []
+    assert data['a']['Data'].dtype.kind == 'M'
+
+
+def test_subset_is_stored_as_positions_in_either_order(cache):
+    df = _sample()
+    subset = df.iloc[[30, 3, 17, 8]]
+    cache('parcial', subset)
+    cache('completa', df)
+    # O subconjunto foi convertido primeiro; a base completa o absorve
+    first = dados.load_datasets(names=['parcial'])['parcial']
+    data = dados.load_datasets(names=['completa', 'parcial'])
+    assert len(_frames(cache, 'pkl')) == 1 and len(_frames(cache, 'sub')) == 1
+    # Linhas na ordem da planilha, iguais às convertidas diretamente
+    pd.testing.assert_frame_equal(data['parcial'], first)
+    assert data['parcial']['Nome'].tolist() == subset['Nome'].tolist()
+
+    # Processo novo (sem DataFrames em memória): o subconjunto sai do DataFrame maior
+    again = dados.load_dataset('parcial', {})
+    pd.testing.assert_frame_equal(again, first)
+
+
+def test_changed_file_prunes_unreferenced_frames(cache):
+    cache('a', _sample(seed=1))
+    cache('parcial', _sample(seed=1).iloc[:10])
+    dados.load_datasets(names=['a', 'parcial'])
+    assert len(_frames(cache, 'pkl')) == 1 and len(_frames(cache, 'sub')) == 1
+
+    # Nova versão de 'a' sem as linhas de 'parcial': o DataFrame antigo continua referenciado pelo subconjunto
+    cache('a', _sample(n=5, seed=9))
+    dados.load_datasets(names=['a'])
+    assert len(_frames(cache, 'pkl')) == 2
+    assert dados.load_dataset('parcial', {})['Nome'].tolist() == [f'Pessoa {i}' for i in range(10)]
+
+    # Nova versão de 'parcial': o DataFrame antigo deixa de ser referenciado e é removido
+    cache('parcial', _sample(n=3, seed=4).assign(Empresa='GAMA'))
+    dados.load_datasets(names=['parcial'])
+    assert len(_frames(cache, 'pkl')) == 2 and _frames(cache, 'sub') == []
+    assert glob.glob(str(cache.dir / '**' / '*.tmp'), recursive=True) == []
+    assert len(glob.glob(str(cache.dir / '*.ref'))) == 2
+
+
+def test_concurrent_loads_of_different_datasets(cache):
+    base = _sample(n=60)
+    for i in range(4):
+        cache(f'base{i}', base.iloc[: 20 + 10 * i])
+    errors = []
+
+    def worker(name, rounds):
+        try:
+            for round_ in range(rounds):
+                # Cada rodada grava uma nova versão da própria base; a limpeza de uma não afeta as outras
+                cache(name, base.iloc[round_: 40 + round_])
+                assert len(dados.load_dataset(name, {})) == 40
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker, args=(f'base{i}', 5)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
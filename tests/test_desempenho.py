@@ -0,0 +1,18 @@
+"""Cronômetro de renderização."""
+import time
+
+from painel.desempenho import RenderTimer
+
+
+def test_timer_counts_from_script_start():
+    # Início 2 s antes: custo dos imports feitos antes de criar o cronômetro
+    timer = RenderTimer(budget_ms=1000, started=time.perf_counter() - 2)
+    assert timer.mark('first_paint') >= 2000
+    assert not timer.within_budget
+    assert '⚠️' in timer.summary()
+
+
+def test_timer_defaults_to_now():
+    timer = RenderTimer(budget_ms=1000)
+    assert timer.mark('first_paint') < 1000
+    assert timer.within_budget
@@ -0,0 +1,58 @@
+"""Índice de funcionários entre bases: normalização, homônimos e consulta por CPF."""
+import pandas as pd
+
+from painel.funcionarios import EmployeeIndex, normalize_cpf, normalize_names
+
+
+def _data():
+    return {
+        'absenteismo': pd.DataFrame({
+            'Funcionário': ['José da Silva', 'JOSE  DA SILVA', 'Maria Souza', 'José da Silva'],
+            'CPF': ['123.456.789-01', 12345678901.0, '98765432100', '111.222.333-44'],
+            'Dias': [1, 2, 3, 4],
+        }),
+        # Sem CPF: completada pelo nome só quando não há homônimos
+        'exames_alterados': pd.DataFrame({'Funcionário': ['Maria  Souza', 'jose da silva'], 'Exame': ['A', 'B']}),
+        'aso_validos': pd.DataFrame({'Nome': ['Maria Souza'], 'CPF': ['987.654.321-00']}),
+        'perfil_epidemiologico': pd.DataFrame(),
+    }
+
+
+def test_normalization():
+    assert normalize_names(pd.Series(['  José  DA Silva ', None])).tolist()[0] == 'jose da silva'
+    assert normalize_cpf(pd.Series(['123.456.789-01', 12345678901.0, 2345678901, ''])).tolist()[:3] == \
+        ['12345678901', '12345678901', '02345678901']
+    assert pd.isna(normalize_cpf(pd.Series([''])).iloc[0])
+
+
+def test_namesakes_are_separate_choices():
+    index = EmployeeIndex(_data())
+    assert index.labels() == ['José da Silva · CPF 111.222.333-44', 'José da Silva · CPF 123.456.789-01',
+                              'Maria Souza · CPF 987.654.321-00']
+
+
+def test_rows_by_label_use_cpf_and_do_not_mix_namesakes():
+    data = _data()
+    index = EmployeeIndex(data)
+    rows = index.rows(data, label='José da Silva · CPF 123.456.789-01')
+    assert rows['absenteismo']['Dias'].tolist() == [1, 2]
+    # Nome com dois CPFs: a base sem CPF não é completada pelo nome
+    assert 'exames_alterados' not in rows
+
+
+def test_unambiguous_name_fills_datasets_without_cpf():
+    data = _data()
+    index = EmployeeIndex(data)
+    rows = index.rows(data, label='Maria Souza · CPF 987.654.321-00')
+    assert rows['absenteismo']['Dias'].tolist() == [3]
+    assert rows['exames_alterados']['Exame'].tolist() == ['A']
+    assert len(rows['aso_validos']) == 1
+
+
+def test_lookup_by_name_only():
+    data = _data()
+    index = EmployeeIndex(data)
+    rows = index.rows(data, name='jose da silva')
+    assert rows['absenteismo']['Dias'].tolist() == [1, 2, 4]
+    assert rows['exames_alterados']['Exame'].tolist() == ['B']
+    assert index.rows(data, name='Ninguém') == {}
@@ -0,0 +1,75 @@
+"""Redução dos dados dos gráficos: top-N, agregação temporal e orçamento por gráfico."""
+import pandas as pd
+import pytest
+
+from painel.orcamento import OTHERS_LABEL, ChartBudget, bin_time, frame_size, top_categories
+
+
+@pytest.fixture
+def cumulative_plan():
+    months = pd.date_range('2025-01-01', '2025-12-01', freq='MS')
+    plan = pd.DataFrame({'Mês': months, 'Planejado': [100 * (i + 1) / 12 for i in range(12)]})
+    return plan.melt('Mês', var_name='Tipo', value_name='Visitas')
+
+
+def test_bin_time_sums_counts_by_default():
+    df = pd.DataFrame({'Dia': pd.to_datetime(['2025-01-05', '2025-01-20', '2025-02-03']), 'Casos': [2, 3, 4]})
+    result = bin_time(df, 'Dia', 'Casos', 'M')
+    assert result['Casos'].tolist() == [5, 4]
+    assert result['Dia'].tolist() == [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-01')]
+
+
+def test_bin_time_keeps_last_value_of_cumulative_series(cumulative_plan):
+    # Embaralhado: o último valor é o mais recente do período, não o último da tabela
+    shuffled = cumulative_plan.sample(frac=1, random_state=1)
+    result = bin_time(shuffled, 'Mês', 'Visitas', 'Q', how='last')
+    assert result['Visitas'].tolist() == pytest.approx([25, 50, 75, 100])
+    assert bin_time(cumulative_plan, 'Mês', 'Visitas', 'Y', how='last')['Visitas'].tolist() == pytest.approx([100])
+
+
+def test_bin_time_mean_and_groups():
+    df = pd.DataFrame({'Mês': pd.to_datetime(['2025-01-01', '2025-02-01', '2025-01-01', '2025-02-01']),
+                       'Tipo': ['A', 'A', 'B', 'B'], 'Nível': [1.0, 3.0, 10.0, 20.0]})
+    result = bin_time(df, 'Mês', 'Nível', 'Q', how='mean').set_index('Tipo')['Nível']
+    assert result.to_dict() == {'A': 2.0, 'B': 15.0}
+
+
+def test_bin_time_rejects_unknown_aggregation(cumulative_plan):
+    with pytest.raises(ValueError):
+        bin_time(cumulative_plan, 'Mês', 'Visitas', 'Q', how='median')
+
+
+def test_top_categories_groups_the_rest_in_others():
+    df = pd.DataFrame({'Unidade': ['A', 'B', 'C', 'D', 'A', 'D'], 'Status': ['x', 'x', 'x', 'x', 'y', 'y'],
+                       'Count': [10, 1, 2, 8, 5, 1]})
+    result = top_categories(df, 'Unidade', 'Count', 2)
+    assert set(result['Unidade']) == {'A', 'D', OTHERS_LABEL}
+    assert result['Count'].sum() == df['Count'].sum()
+    others = result[result['Unidade'] == OTHERS_LABEL].set_index('Status')['Count']
+    assert others.to_dict() == {'x': 3}
+    assert top_categories(df, 'Unidade', 'Count', 10) is df
+
+
+def test_fit_keeps_small_charts_untouched(cumulative_plan):
+    budget = ChartBudget(budget_kb=100)
+    assert budget.fit('Plano', cumulative_plan, 'Visitas', time='Mês', how='last') is cumulative_plan
+    assert budget.table()['Redução'].tolist() == ['-']
+
+
+def test_fit_bins_cumulative_series_with_last_value(cumulative_plan):
+    budget = ChartBudget(budget_kb=frame_size(cumulative_plan) / 1024 / 2.5)
+    result = budget.fit('Plano', cumulative_plan, 'Visitas', time='Mês', how='last')
+    assert len(result) < len(cumulative_plan)
+    # O fim da série acumulada continua sendo o total planejado
+    assert result['Visitas'].max() == pytest.approx(100)
+    assert budget.records[-1]['Redução'].endswith('(último valor)')
+
+
+def test_fit_reduces_categories_and_caps_rows():
+    df = pd.DataFrame({'Empresa': [f'E{i:03d}' for i in range(300)], 'Qtd': range(300)})
+    budget = ChartBudget(budget_kb=frame_size(df) / 1024 / 10, max_rows=20)
+    result = budget.fit('Empresas', df, 'Qtd', category='Empresa')
+    assert len(result) <= 20 and frame_size(result) <= budget.budget
+    assert OTHERS_LABEL in set(result['Empresa'])
+    assert result['Qtd'].sum() == df['Qtd'].sum()
+    assert '1 reduzido(s) no servidor' in budget.summary()
@@ -0,0 +1,22 @@
+"""Nomes de arquivo dos relatórios por empresa."""
+from painel.relatorios import report_slugs, slugify
+
+
+def test_slugify():
+    assert slugify('Syngenta Proteção de Cultivos LTDA.') == 'syngenta-protecao-de-cultivos-ltda'
+    assert slugify('***') == 'empresa'
+
+
+def test_colliding_names_get_distinct_stable_slugs():
+    companies = ['AGRO SÃO JOÃO LTDA', 'Agro Sao Joao Ltda.', 'agro são joão ltda', 'BETA S.A.']
+    slugs = report_slugs(companies)
+    assert len(set(slugs.values())) == len(companies)
+    assert slugs['BETA S.A.'] == 'beta-s-a'
+    assert all(slugs[name].startswith('agro-sao-joao-ltda-') for name in companies[:3])
+    # O sufixo depende só do nome: a mesma empresa tem o mesmo arquivo em outro lote
+    assert report_slugs(companies[::-1]) == slugs
+    assert report_slugs(companies[:2])['AGRO SÃO JOÃO LTDA'] == slugs['AGRO SÃO JOÃO LTDA']
+
+
+def test_unique_names_keep_plain_slug():
+    assert report_slugs(['ALFA', 'BETA', 'ALFA']) == {'ALFA': 'alfa', 'BETA': 'beta'}
@@ -0,0 +1,164 @@
+"""Serviço JSON de KPIs e equivalência dos índices pré-calculados com o cálculo direto.
+
+Os dados são sintéticos (``tests.sinteticos``), sem depender das planilhas de ``data/``.
+"""
+import http.client
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from painel.atualizacao import LoadError, Snapshot
+from painel.dados import build_indexes
+from painel.distintos import DistinctCountIndex
+from painel.intervalos import DaysLostIndex
+from painel.kpis import calculate_kpis, company_kpis
+from painel.servico import serve_in_background
+from tests.sinteticos import COMPANIES, synthetic_data
+
+@pytest.fixture(scope='module')
+def data():
+    return synthetic_data()
+
+
+@pytest.fixture(scope='module')
+def indexes(data):
+    return build_indexes(data)
+
+
+class _Store:
+    """Armazém fixo com um único snapshot (interface ``get`` do ``DatasetStore``)."""
+
+    def __init__(self, snapshot, error=None):
+        self.snapshot = snapshot
+        self.error = error
+
+    def get(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return self.snapshot
+
+
+@pytest.fixture(scope='module')
+def service(data, indexes):
+    # Versão única: o cache de resultados é compartilhado no processo
+    snapshot = Snapshot(version=f'teste-{uuid.uuid4().hex[:8]}', loaded_at=datetime.now(), data=data, indexes=indexes)
+    server, _ = serve_in_background(port=0, store=_Store(snapshot))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=30)
+    try:
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_kpis_route_returns_json_with_etag(service, data, indexes):
+    status, headers, body = _get(service, '/kpis?empresas=ALFA%20LTDA&dias=90')
+    assert status == 200
+    assert headers['Content-Type'].startswith('application/json')
+    assert headers['ETag']
+    payload = json.loads(body)
+    assert payload['empresas'] == ['ALFA LTDA'] and payload['dias'] == 90
+    expected = calculate_kpis(data, ['ALFA LTDA'], 90, indexes['days_lost'], indexes['aso_expiry'], 30,
+                              indexes['distinct_employees'])
+    assert payload['kpis'] == pytest.approx({key: float(value) for key, value in expected.items()})
+
+
+def test_kpis_route_answers_304_for_matching_etag(service):
+    _, headers, _ = _get(service, '/kpis')
+    status, _, body = _get(service, '/kpis', {'If-None-Match': headers['ETag']})
+    assert status == 304 and body == b''
+    status, _, _ = _get(service, '/kpis', {'If-None-Match': '"outra-versao"'})
+    assert status == 200
+
+
+@pytest.mark.parametrize('path', ['/kpis?dias=abc', '/kpis?dias=0', '/kpis?horizonte=99999', '/graficos?grafico=nenhum'])
+def test_invalid_parameters_return_400(service, path):
+    status, _, body = _get(service, path)
+    assert status == 400
+    assert 'erro' in json.loads(body)
+
+
+def test_companies_route_lists_sorted_companies(service):
+    status, _, body = _get(service, '/empresas')
+    assert status == 200
+    assert json.loads(body)['empresas'] == COMPANIES
+
+
+@pytest.mark.parametrize('store', [_Store(None), _Store(None, LoadError('Falha ao carregar os dados: planilha corrompida'))])
+def test_missing_data_returns_503(store):
+    server, _ = serve_in_background(port=0, store=store)
+    try:
+        status, _, body = _get(server, '/kpis')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert status == 503
+    assert json.loads(body)['erro'].startswith(('Dados ainda não carregados', 'Falha ao carregar'))
+
+
+def test_unknown_route_returns_404(service):
+    status, _, body = _get(service, '/nada')
+    assert status == 404
+    assert 'erro' in json.loads(body)
+
+
+@pytest.mark.parametrize('days', [30, 90, 365])
+def test_company_kpis_match_calculate_kpis(data, indexes, days):
+    index_args = (indexes['days_lost'], indexes['aso_expiry'], 30)
+    table = company_kpis(data, days, *index_args, distinct_index=indexes['distinct_employees'])
+    assert list(table.index) == COMPANIES
+    for company in COMPANIES:
+        expected = calculate_kpis(data, [company], days, *index_args, indexes['distinct_employees'])
+        assert table.loc[company, list(expected)].to_dict() == pytest.approx(expected)
+
+
+def _naive_days_lost(df, start, end, companies=None):
+    """Dias perdidos na janela linha a linha: valor diário × dias de sobreposição."""
+    total = 0.0
+    lo, hi = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    for company, category, first, last, value in zip(df['Empresa'], df['Categoria'], df['Início'], df['Fim'], df['Dias Perdidos']):
+        last = last if pd.notna(last) else first
+        if pd.isna(first) or last < first or pd.isna(company) or pd.isna(category):
+            continue
+        if companies is not None and company not in companies:
+            continue
+        overlap = (min(last, hi) - max(first, lo)).days + 1
+        if overlap > 0:
+            total += value / ((last - first).days + 1) * overlap
+    return total
+
+
+@pytest.mark.parametrize('offsets', [(-30, 0), (-365, -200), (-2000, 100), (-600, -550), (10, 50), (-1, -1)])
+@pytest.mark.parametrize('companies', [None, ['BETA S.A.'], ['ALFA LTDA', 'GAMA AGRO']])
+def test_days_lost_total_matches_naive_overlap(data, offsets, companies):
+    df = data['absenteismo']
+    index = DaysLostIndex(df, value_col='Dias Perdidos', group_cols=['Empresa', 'Categoria'])
+    today = pd.Timestamp.now().normalize()
+    start, end = (today + timedelta(days=offset) for offset in offsets)
+    assert index.total(start, end, companies) == pytest.approx(_naive_days_lost(df, start, end, companies))
+
+
+@pytest.mark.parametrize('window', [None, (30, 0), (120, 60), (800, 0)])
+@pytest.mark.parametrize('companies', [None, ['ALFA LTDA'], ['BETA S.A.', 'GAMA AGRO', 'OUTRA']])
+def test_exact_distinct_count_matches_nunique(data, window, companies):
+    df = data['absenteismo']
+    index = DistinctCountIndex(df, key_col='Funcionário', date_col='Início', mode='exact')
+    selected = df if companies is None else df[df['Empresa'].isin(companies)]
+    if window is None:
+        start = end = None
+    else:
+        # Início com hora, como no ``filter_by_date_range`` (agora - N dias)
+        now = datetime.now()
+        start, end = now - timedelta(days=window[0]), now - timedelta(days=window[1])
+        selected = selected[(selected['Início'] >= start) & (selected['Início'] <= end)]
+    assert index.count(companies, start, end) == selected['Funcionário'].nunique()
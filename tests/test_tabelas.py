@@ -0,0 +1,82 @@
+"""Paginação das tabelas detalhadas comparada com filtros e ``sort_values`` do pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.tabelas import DetailTable
+
+COLUMNS = ['Empresa', 'Funcionário', 'Início', 'Dias Perdidos', 'Especialidade']
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(3)
+    n = 3000
+    df = pd.DataFrame({
+        'Empresa': rng.choice(['ALFA', 'BETA', 'GAMA', None], n, p=[0.4, 0.3, 0.2, 0.1]),
+        'Funcionário': rng.choice([f'Pessoa {i:03d}' for i in range(200)], n),
+        'Início': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+        'Dias Perdidos': rng.integers(1, 15, n).astype(float),
+        'Especialidade': rng.choice(['Ortopedia', 'Clínica Geral', 'Psiquiatria', None], n),
+    })
+    df.loc[::29, 'Início'] = pd.NaT
+    df.loc[::31, 'Dias Perdidos'] = np.nan
+    return df
+
+
+@pytest.fixture(scope='module')
+def table(frame):
+    return DetailTable(frame, COLUMNS, 'Início')
+
+
+def _naive(frame, sort_by, descending, companies=None, start=None, end=None, filters=None):
+    selected = frame
+    if companies is not None:
+        selected = selected[selected['Empresa'].isin(companies)]
+    if start is not None or end is not None:
+        dates = selected['Início']
+        selected = selected[dates.notna() & (dates >= (start or dates.min())) & (dates <= (end or dates.max()))]
+    for col, text in (filters or {}).items():
+        if text:
+            selected = selected[selected[col].astype(str).str.lower().str.contains(text.lower(), regex=False)
+                                & selected[col].notna()]
+    if sort_by is not None:
+        selected = selected.sort_values(sort_by, ascending=not descending, kind='stable', na_position='last')
+    return selected
+
+
+SELECTIONS = [
+    {},
+    {'companies': ('BETA',)},
+    {'companies': ('ALFA', 'GAMA', 'OUTRA'), 'start': pd.Timestamp('2025-03-01'), 'end': pd.Timestamp('2025-06-30')},
+    {'start': pd.Timestamp('2025-11-15 10:30')},
+    {'filters': {'Funcionário': 'pessoa 01'}},
+    {'companies': ('ALFA',), 'filters': {'Especialidade': 'CLÍNICA', 'Funcionário': '5'}},
+    {'filters': {'Especialidade': 'nada disso'}},
+]
+
+
+@pytest.mark.parametrize('selection', SELECTIONS)
+@pytest.mark.parametrize('sort_by, descending', [(None, False), ('Dias Perdidos', False), ('Dias Perdidos', True),
+                                                 ('Funcionário', True), ('Início', False), ('Empresa', True)])
+def test_pages_match_naive_sort(frame, table, selection, sort_by, descending):
+    expected = _naive(frame, sort_by, descending, **selection)
+    for page, page_size in [(1, 25), (3, 50), (40, 25)]:
+        rows, total = table.page(page, page_size, sort_by, descending, **selection)
+        assert total == len(expected)
+        first = (page - 1) * page_size
+        want = expected.iloc[first:first + page_size][COLUMNS].reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows.reset_index(drop=True), want, check_dtype=False)
+
+
+def test_rows_match_selection(frame, table):
+    selection = SELECTIONS[2]
+    positions = table.rows(**selection)
+    assert len(positions) == len(_naive(frame, None, False, **selection))
+    assert set(table.frame.iloc[positions]['Empresa']) <= {'ALFA', 'GAMA'}
+
+
+def test_empty_table():
+    table = DetailTable(pd.DataFrame({'Empresa': pd.Series(dtype=object)}), ['Empresa'])
+    rows, total = table.page(1, 25, 'Empresa', companies=('ALFA',))
+    assert total == 0 and rows.empty